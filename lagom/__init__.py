@@ -1,6 +1,6 @@
 """Lagom, a type based dependency injection container"""
 
-from .container import Container, ExplicitContainer
+from .container import Container, ExplicitContainer, FrozenContainer
 from .context_based import ContextContainer
 from .debug import get_build_info
 from .decorators import (
@@ -22,6 +22,7 @@ __all__ = [
     "UnresolvableTypeDefinition",
     "Container",
     "ExplicitContainer",
+    "FrozenContainer",
     "FunctionCollection",
     "bind_to_container",
     "magic_bind_to_container",
@@ -0,0 +1,239 @@
+"""
+Generates python source code for resolution plans.
+
+A compiled plan still walks a tree of small builder functions every time
+a type is resolved. The code generator flattens a reflection plan into a
+single function that calls every constructor directly. For example:
+
+    def build_AThingIMightNeed(c):
+        _at = 0
+        try:
+            _at = 1
+            v1 = SomeService(other=_instance_0)
+            _at = 2
+            v2 = AThingIMightNeed(service=v1)
+            return v2
+        except Exception as error:
+            raise _failure(_at, error)
+
+Code generation is opt in. See `use_generated_code`.
+"""
+
+import keyword
+import linecache
+import re
+from typing import Any, Dict, List, Tuple, Type
+
+from .container import Container
+from .definitions import PlainInstance, SingletonWrapper
+from .plans import (
+    Builder,
+    DefinitionStep,
+    FailurePosition,
+    MAX_NESTED_DEPTH,
+    PlanNode,
+    ReflectionStep,
+    translate_failure,
+    UNDEFINED_DEPENDENCY_MESSAGE,
+)
+
+
+def use_generated_code(container: Container) -> Container:
+    """
+    Switches the container to building reflected types with generated
+    python code. The switch applies to the container, its parents and
+    all of their clones as they share the same plans.
+
+    >>> from lagom import Container
+    >>> class Engine:
+    ...     pass
+    >>> container = use_generated_code(Container())
+    >>> isinstance(container.resolve(Engine), Engine)
+    True
+    """
+    plan_cache = container._plan_cache
+    plan_cache.backend = generate_builder
+    plan_cache.invalidate()
+    return container
+
+
+def generate_builder(plan: ReflectionStep) -> Builder:
+    """
+    Turns a reflection plan into a single generated function
+    """
+    if plan.depth > MAX_NESTED_DEPTH:
+        # The writer recurses through the plan so very deep plans keep
+        # their flattened builder.
+        return plan.build
+    writer = _FunctionWriter(plan)
+    source = writer.source()
+    filename = f"<lagom generated {writer.function_name}>"
+    # Registering the source means tracebacks can show the generated lines
+    linecache.cache[filename] = (
+        len(source),
+        None,
+        source.splitlines(True),
+        filename,
+    )
+    exec(compile(source, filename, "exec"), writer.namespace)  # nosec
+    return writer.namespace[writer.function_name]
+
+
+def generate_source(container: Container, dep_type: Type) -> str:
+    """
+    Returns the python source that would be generated to build dep_type.
+    Useful when trying to understand how a type is being built.
+
+    >>> from lagom import Container
+    >>> class Engine:
+    ...     pass
+    >>> print(generate_source(Container(), Engine))
+    def build_Engine(c):
+        _at = 0
+        try:
+            _at = 1
+            v1 = Engine()
+            return v1
+        except Exception as error:
+            raise _failure(_at, error)
+    <BLANKLINE>
+    """
+    plan = container._plan_for(dep_type)
+    if not isinstance(plan, ReflectionStep):
+        raise TypeError(f"{dep_type} is not built by reflection")
+    return _FunctionWriter(plan).source()
+
+
+class _FunctionWriter:
+    """
+    Writes the statements for a plan in the order the constructors need
+    calling. Every statement that can fail records a position in _at so
+    a failure can be reported exactly as the reflective plan would.
+    """
+
+    namespace: Dict[str, Any]
+    function_name: str
+    _names: Dict[Tuple[str, int], str]
+    _lines: List[str]
+    _positions: List[FailurePosition]
+    _variables: int
+
+    def __init__(self, plan: ReflectionStep):
+        self.namespace = {"_failure": self._failure}
+        self.function_name = "build_" + _safe_name(plan.dep_type)
+        self._names = {}
+        self._lines = []
+        self._positions = [((), False)]
+        self._variables = 0
+        result, _ = self._write(plan, [])
+        self._lines.append(f"return {result}")
+
+    def source(self) -> str:
+        body = "\n".join(f"        {line}" for line in self._lines)
+        return (
+            f"def {self.function_name}(c):\n"
+            f"    _at = 0\n"
+            f"    try:\n"
+            f"{body}\n"
+            f"    except Exception as error:\n"
+            f"        raise _failure(_at, error)\n"
+        )
+
+    def _write(self, node: PlanNode, building: List[Any]) -> Tuple[str, bool]:
+        """
+        Writes the statements needed to build the node. Returns an
+        expression for the built value and whether that value could be None.
+        """
+        if isinstance(node, ReflectionStep):
+            return self._write_reflection(node, building), False
+        if isinstance(node, DefinitionStep):
+            constant = _known_instance(node)
+            if constant is not None:
+                return self._name_for(constant, "_instance_"), False
+        builder = self._name_for(node.build, "_step_")
+        variable = self._next_variable()
+        self._mark_position(building, constructing=False)
+        self._lines.append(f"{variable} = {builder}(c)")
+        return variable, True
+
+    def _write_reflection(self, node: ReflectionStep, building: List[Any]) -> str:
+        if node.logger is not None:
+            logger = self._name_for(node.logger, "_logger_")
+            dep_type = self._name_for(node.dep_type, "_dep_type_")
+            self._lines.append(
+                f"{logger}.warning({UNDEFINED_DEPENDENCY_MESSAGE!r}, {dep_type}, "
+                f"extra={{'undefined_dependency': {dep_type}}})"
+            )
+        inner_building = building + [node.dep_type]
+        required: List[Tuple[str, str]] = []
+        nullable: List[Tuple[str, str]] = []
+        for key, argument in node.arguments:
+            expression, might_be_none = self._write(argument, inner_building)
+            (nullable if might_be_none else required).append((key, expression))
+
+        constructor = self._name_for(node.dep_type, "")
+        variable = self._next_variable()
+        if nullable:
+            # None values are never passed in so the constructor default is used
+            kwargs = f"{variable}_kwargs"
+            self._lines.append(
+                f"{kwargs} = {{" + ", ".join(f"'{k}': {e}" for k, e in required) + "}"
+            )
+            for key, expression in nullable:
+                self._lines.append(f"if {expression} is not None:")
+                self._lines.append(f"    {kwargs}['{key}'] = {expression}")
+            self._mark_position(inner_building, constructing=True)
+            self._lines.append(f"{variable} = {constructor}(**{kwargs})")
+        else:
+            self._mark_position(inner_building, constructing=True)
+            arguments = ", ".join(f"{k}={e}" for k, e in required)
+            self._lines.append(f"{variable} = {constructor}({arguments})")
+        return variable
+
+    def _mark_position(self, building: List[Any], constructing: bool):
+        self._positions.append((tuple(building), constructing))
+        self._lines.append(f"_at = {len(self._positions) - 1}")
+
+    def _next_variable(self) -> str:
+        self._variables += 1
+        return f"v{self._variables}"
+
+    def _name_for(self, value: Any, prefix: str) -> str:
+        """Makes value available to the generated code and returns its name"""
+        key = (prefix, id(value))
+        if key in self._names:
+            return self._names[key]
+        name = (
+            prefix + _safe_name(value) if not prefix else f"{prefix}{len(self._names)}"
+        )
+        if (
+            not name.isidentifier()
+            or keyword.iskeyword(name)
+            or name in self.namespace
+            or name == self.function_name
+            or (not prefix and name.startswith("_"))
+        ):
+            name = f"{prefix or '_type_'}{len(self.namespace)}"
+        self._names[key] = name
+        self.namespace[name] = value
+        return name
+
+    def _failure(self, position: int, error: Exception) -> Exception:
+        """
+        Translates an error raised at a position in the generated code into
+        the same error the reflective plan would have raised.
+        """
+        return translate_failure(self._positions[position], error)
+
+
+def _safe_name(value: Any) -> str:
+    return re.sub(r"\W", "_", getattr(value, "__name__", "")).strip("_")
+
+
+def _known_instance(step: DefinitionStep) -> Any:
+    definition = step.definition
+    if isinstance(definition, PlainInstance):
+        return definition.value
+    if isinstance(definition, SingletonWrapper) and definition._has_instance:
+        return definition._instance
+    return None
@@ -1,7 +1,9 @@
-import functools
+import inspect
 import io
 import logging
+import time
 import typing
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 
 from .compilaton import mypyc_attr
 
@@ -17,28 +19,38 @@ from typing import (
     Optional,
     cast,
     Union,
+    FrozenSet,
+    Tuple,
+    Iterable,
+    Awaitable,
+    TYPE_CHECKING,
 )
 
 from .definitions import (
     normalise,
     Singleton,
+    SingletonWrapper,
     Alias,
-    ConstructionWithoutContainer,
+    PlainInstance,
+    ConstructionWithContainer,
     UnresolvableTypeDefinition,
+    AsyncConstructionWithContainer,
+    AsyncConstructionWithoutContainer,
 )
 from .exceptions import (
     UnresolvableType,
     DuplicateDefinition,
     InvalidDependencyDefinition,
-    RecursiveDefinitionError,
     DependencyNotDefined,
     TypeOnlyAvailableAsAwaitable,
     CircularDefinitionError,
+    ContainerIsFrozen,
 )
 from .injection_context import TemporaryInjectionContext
 from .interfaces import (
     SpecialDepDefinition,
     WriteableContainer,
+    ReadableContainer,
     TypeResolver,
     DefinitionsSource,
     ExtendableContainer,
@@ -47,16 +59,49 @@ from .interfaces import (
     ContainerBoundFunction,
 )
 from .markers import injectable
+from .plans import (
+    PlanCache,
+    PlanNode,
+    DefinitionStep,
+    LiveStep,
+    ReflectionStep,
+    DefaultStep,
+    UnresolvableStep,
+    OptionalStep,
+    build_async,
+    get_instance_async,
+)
+from .graph import DependencyGraph
+from .metrics import ResolutionMetrics
+from .hooks import (
+    ResolutionHooks,
+    combine_hooks,
+    use_definition,
+    observed_definition_builder,
+    observed_reflection_builder,
+    observed_injection,
+)
 from .updaters import update_container_singletons
 from .util.logging import NullLogger
 from .util.reflection import (
     FunctionSpec,
     CachingReflector,
+    DEFAULT_REFLECTION_CACHE_SIZE,
     remove_optional_type,
     remove_awaitable_type,
 )
 from .wrapping import apply_argument_updater
 
+if TYPE_CHECKING:
+    from .tracing import ResolutionTracer
+
+# The debug info for a container is the container itself. Using the container
+# passed in rather than capturing it means containers don't reference
+# themselves and can be freed without waiting for the garbage collector.
+_THE_RESOLVING_CONTAINER: SpecialDepDefinition = ConstructionWithContainer(
+    lambda container: container
+)
+
 UNRESOLVABLE_TYPES = [
     str,
     int,
@@ -121,30 +166,59 @@ class Container(
     _parent_definitions: DefinitionsSource
     _reflector: CachingReflector
     _undefined_logger: logging.Logger
+    _plan_cache: PlanCache
+    _plans: Dict[Type, PlanNode]
+    _inherited: Dict[Type, SpecialDepDefinition]
+    _inherited_version: int
+    _flat_definitions: Optional[Dict[Type, SpecialDepDefinition]]
+    _flat_version: int
+    _defined_types: Optional[Set[Type]]
+    _defined_types_version: int
+    _added_hooks: Tuple[ResolutionHooks, ...]
+    _hooks: Optional[ResolutionHooks]
+    # Either Container._resolve or Container._observed_resolve once hooks are added.
+    # Explicit containers use _resolve_explicitly.
+    _resolver: Callable[..., Any]
+    _tracer: Optional["ResolutionTracer"]
+    # Types without a definition are never built by reflection
+    _explicit: bool
 
     def __init__(
         self,
         container: Optional["Container"] = None,
         log_undefined_deps: Union[bool, logging.Logger] = False,
+        reflection_cache_size: Optional[int] = DEFAULT_REFLECTION_CACHE_SIZE,
     ):
         """
         :param container: Optional container if provided the existing definitions will be copied
         :param log_undefined_deps indicates if a log message should be emmited when an undefined dep is loaded
+        :param reflection_cache_size how many reflected functions (and resolution plans) to cache. Clones share their parent's caches.
         """
 
         # ContainerDebugInfo is always registered
         # This means consumers can consume an overview of the container
         # without hacking anything custom together.
-        self._registered_types = {
-            ContainerDebugInfo: ConstructionWithoutContainer(lambda: self)
-        }
+        self._registered_types = {ContainerDebugInfo: _THE_RESOLVING_CONTAINER}
+        self._explicit = False
 
         if container:
             self._parent_definitions = container
             self._reflector = container._reflector
+            self._plan_cache = container._plan_cache
+            self._added_hooks = container._added_hooks
+            self._hooks = container._hooks
+            self._resolver = self._pick_resolver()
+            self._tracer = container._tracer
         else:
             self._parent_definitions = EmptyDefinitionSet()
-            self._reflector = CachingReflector()
+            self._reflector = CachingReflector(reflection_cache_size)
+            self._plan_cache = PlanCache(reflection_cache_size)
+            self._added_hooks = ()
+            self._hooks = None
+            self._resolver = Container._resolve
+            self._tracer = None
+            # Every container has its own debug info
+            self._plan_cache.mark_overridden(ContainerDebugInfo)
 
         if not log_undefined_deps:
             self._undefined_logger = NullLogger()
@@ -152,6 +226,19 @@ class Container(
             self._undefined_logger = logging.getLogger(__name__)
         else:
             self._undefined_logger = cast(logging.Logger, log_undefined_deps)
+        if container and container._undefined_logger is self._undefined_logger:
+            self._plans = container._plans
+        else:
+            self._plans = self._plan_cache.plans_for(self._plan_logger(), self._hooks)
+
+        # Lookups use a flattened copy of the parent's definitions so they
+        # cost the same however many times a container has been cloned.
+        self._inherited = {}
+        self._inherited_version = -1
+        self._flat_definitions = None
+        self._flat_version = -1
+        self._defined_types = None
+        self._defined_types_version = -1
 
     def define(self, dep: Type[X], resolver: TypeResolver[X]) -> SpecialDepDefinition:
         """Register how to construct an object of type X
@@ -173,34 +260,49 @@ class Container(
             # This is a special case for things like container[Foo] = Foo
             return self.define(dep, Alias(dep, skip_definitions=True))
         definition = normalise(resolver)
-        self._registered_types[dep] = definition
-        self._registered_types[Optional[dep]] = definition  # type: ignore
+        self._register(dep, definition)
+        self._register(Optional[dep], definition)  # type: ignore
 
         # For awaitables we add a convenience exception to be thrown if code hints on the type
         # without the awaitable.
         awaitable_type = remove_awaitable_type(dep)
         if awaitable_type:
             # Unless there's already a sync version defined.
-            if awaitable_type not in self.defined_types:
-                self._registered_types[awaitable_type] = UnresolvableTypeDefinition(
-                    TypeOnlyAvailableAsAwaitable(awaitable_type), awaitable_type
+            if self.get_definition(awaitable_type) is None:
+                self._register(
+                    awaitable_type,
+                    UnresolvableTypeDefinition(
+                        TypeOnlyAvailableAsAwaitable(awaitable_type), awaitable_type
+                    ),
                 )
         return definition
 
     @property
     def defined_types(self) -> Set[Type]:
-        """The types the container has explicit build instructions for
+        """The types the container has explicit build instructions for.
+        A new set is returned each time so it can be modified.
 
         :return:
         """
-        return self._parent_definitions.defined_types.union(
-            self._registered_types.keys()
-        )
+        version = self._plan_cache.definitions_version
+        if self._defined_types is None or self._defined_types_version != version:
+            self._defined_types = set(self._inherited_definitions()).union(
+                self._registered_types.keys()
+            )
+            self._defined_types_version = version
+        return set(self._defined_types)
 
     @property
-    def reflection_cache_overview(self) -> Dict[str, str]:
+    def reflection_cache_overview(self) -> Dict[str, Optional[int]]:
         return self._reflector.overview_of_cache
 
+    @property
+    def resolution_metrics(self) -> Optional[ResolutionMetrics]:
+        for hooks in self._added_hooks:
+            if isinstance(hooks, ResolutionMetrics):
+                return hooks
+        return None
+
     def temporary_singletons(
         self, singletons: Optional[List[Type]] = None
     ) -> "TemporaryInjectionContext":
@@ -218,12 +320,7 @@ class Container(
         :param singletons: items which should be considered singletons within the context
         :return:
         """
-        updater = (
-            functools.partial(update_container_singletons, singletons=singletons)
-            if singletons
-            else None
-        )
-        return TemporaryInjectionContext(self, updater)
+        return TemporaryInjectionContext(self, _ScopeFactory(singletons or []))
 
     def resolve(
         self, dep_type: Type[X], suppress_error=False, skip_definitions=False
@@ -256,9 +353,7 @@ class Container(
         :param skip_definitions:
         :return:
         """
-        return self._resolve(
-            dep_type, suppress_error, skip_definitions, type_stack=set()
-        )
+        return self._resolver(self, dep_type, suppress_error, skip_definitions)
 
     def _resolve(
         self,
@@ -266,20 +361,175 @@ class Container(
         suppress_error=False,
         skip_definitions=False,
         default: X = Unset,
-        type_stack: Optional[Set[Type]] = None,
     ) -> X:
         if not skip_definitions:
             definition = self.get_definition(dep_type)
             if definition:
                 return definition.get_instance(self)
 
-        optional_dep_type = remove_optional_type(dep_type)
-        if optional_dep_type:
-            return self.resolve(optional_dep_type, suppress_error=True)
+        if default is not Unset and dep_type in UNRESOLVABLE_TYPES:
+            if isinstance(self._undefined_logger, NullLogger):
+                return default
+            return DefaultStep(dep_type, default, self._plan_logger()).build(self)
 
-        return self._reflection_build_with_err_handling(
-            dep_type, suppress_error, default=default, type_stack=type_stack
+        plan = self._plan_for(dep_type)
+        if suppress_error and plan.suppressible:
+            if plan.always_fails:
+                return None  # type: ignore
+            try:
+                return plan.build(self)
+            except UnresolvableType:
+                return None  # type: ignore
+        return plan.build(self)
+
+    def _observed_resolve(
+        self,
+        dep_type: Type[X],
+        suppress_error=False,
+        skip_definitions=False,
+        default: X = Unset,
+    ) -> X:
+        """Used in place of _resolve once hooks have been added"""
+        hooks = cast(ResolutionHooks, self._hooks)
+        hooks.resolve_started(dep_type)
+        started = time.perf_counter()
+        try:
+            definition = None if skip_definitions else self.get_definition(dep_type)
+            if definition:
+                instance = use_definition(hooks, self, dep_type, definition)
+            else:
+                instance = self._resolve(dep_type, suppress_error, True, default)
+        except Exception as error:
+            hooks.resolve_finished(dep_type, time.perf_counter() - started, error)
+            raise
+        hooks.resolve_finished(dep_type, time.perf_counter() - started, None)
+        return instance
+
+    def add_hooks(self, hooks: ResolutionHooks):
+        """Reports what the container does to the hooks. The hooks are
+        also used by anything cloned from this container afterwards.
+        Containers without hooks don't pay anything for them.
+
+        >>> from lagom.hooks import ResolutionHooks
+        >>> c = Container()
+        >>> c.add_hooks(ResolutionHooks())
+
+        :param hooks: the events to report to
+        """
+        self._use_hooks(self._added_hooks + (hooks,))
+
+    def remove_hooks(self, hooks: ResolutionHooks):
+        """Stops reporting to hooks that were added to this container"""
+        self._use_hooks(tuple(h for h in self._added_hooks if h is not hooks))
+
+    def use_tracer(self, tracer: Optional["ResolutionTracer"]):
+        """Samples the calls of functions bound to this container (or to
+        anything cloned from it afterwards) and reports them to the tracer.
+        Passing None stops tracing.
+
+        >>> from lagom.tracing import ResolutionTracer, RingBufferSink
+        >>> c = Container()
+        >>> c.use_tracer(ResolutionTracer(RingBufferSink(), sample_every=100))
+
+        :param tracer: decides which calls to trace and where to send them
+        """
+        self._tracer = tracer
+
+    def _use_hooks(self, added_hooks: Tuple[ResolutionHooks, ...]):
+        self._added_hooks = added_hooks
+        self._hooks = combine_hooks(list(added_hooks))
+        self._resolver = self._pick_resolver()
+        # Observed plans are kept separately so the plans of containers
+        # without hooks never report anything
+        self._plans = self._plan_cache.plans_for(self._plan_logger(), self._hooks)
+
+    def _pick_resolver(self) -> Callable[..., Any]:
+        return _resolve_explicitly if self._explicit else _plain_resolver(self._hooks)
+
+    async def aresolve(
+        self, dep_type: Type[X], suppress_error=False, skip_definitions=False
+    ) -> X:
+        """Constructs an object of type X awaiting anything it needs that is
+        only available as Awaitable[T]. Independent async dependencies are
+        awaited concurrently.
+
+        >>> import asyncio
+        >>> from typing import Awaitable
+        >>> from tests.examples import SomeClass
+        >>> c = Container()
+        >>> async def load() -> SomeClass:
+        ...     return SomeClass()
+        >>> c[Awaitable[SomeClass]] = load
+        >>> asyncio.run(c.aresolve(SomeClass))
+        <tests.examples.SomeClass object at ...>
+
+        :param dep_type: The type of object to construct. Awaitable[T] builds T
+        :param suppress_error: if true returns None on failure
+        :param skip_definitions:
+        :return:
+        """
+        hooks = self._hooks
+        if hooks is None:
+            return await self._aresolve(dep_type, suppress_error, skip_definitions)
+        hooks.resolve_started(dep_type)
+        started = time.perf_counter()
+        try:
+            instance = await self._aresolve(dep_type, suppress_error, skip_definitions)
+        except Exception as error:
+            hooks.resolve_finished(dep_type, time.perf_counter() - started, error)
+            raise
+        hooks.resolve_finished(dep_type, time.perf_counter() - started, None)
+        return instance
+
+    async def _aresolve(
+        self, dep_type: Type[X], suppress_error: bool, skip_definitions: bool
+    ) -> X:
+        awaited_type = remove_awaitable_type(dep_type)
+        if awaited_type:
+            definition = self.get_definition(dep_type)
+            if definition and not skip_definitions:
+                return await self._use_definition_async(dep_type, definition)
+            dep_type = awaited_type  # type: ignore
+
+        if not skip_definitions:
+            definition = self.get_definition(dep_type)
+            if definition:
+                return await self._use_definition_async(dep_type, definition)
+
+        if self._explicit:
+            if suppress_error:
+                return None  # type: ignore
+            raise DependencyNotDefined(dep_type)
+
+        plan = self._plan_for(dep_type)
+        if not plan.awaits:
+            return self._resolve(dep_type, suppress_error, skip_definitions=True)
+        if suppress_error and plan.suppressible:
+            try:
+                return await build_async(plan, self)
+            except UnresolvableType:
+                return None  # type: ignore
+        return await build_async(plan, self)
+
+    async def _use_definition_async(
+        self, dep_type: Any, definition: SpecialDepDefinition
+    ) -> Any:
+        """Gets an instance from the definition awaiting it, reporting it to any hooks"""
+        hooks = self._hooks
+        if hooks is None:
+            return await _awaited_instance(self, dep_type, definition)
+        hooks.definition_used(dep_type, definition)
+        started = time.perf_counter()
+        try:
+            instance = await _awaited_instance(self, dep_type, definition)
+        except Exception as error:
+            took = time.perf_counter() - started
+            hooks.definition_finished(dep_type, definition, took, error)
+            raise
+        hooks.definition_finished(
+            dep_type, definition, time.perf_counter() - started, None
         )
+        return instance
 
     def partial(
         self,
@@ -309,23 +559,37 @@ class Container(
             key for (key, arg) in spec.defaults.items() if arg is injectable
         )
         keys_and_types = [(key, spec.annotations[key]) for key in keys_to_bind]
+        self._plan_cache.add_bound_types(dep_type for (_, dep_type) in keys_and_types)
 
         base_injection_context = self.temporary_singletons(shared)
         update_container = container_updater if container_updater else _update_nothing
 
-        def _update_args(_injection_context, supplied_args, supplied_kwargs):
+        def _inject(invocation_container, supplied_args, supplied_kwargs):
             keys_to_skip = set(supplied_kwargs.keys())
             keys_to_skip.update(spec.args[0 : len(supplied_args)])
-            with _injection_context as invocation_container:
-                update_container(invocation_container, supplied_args, supplied_kwargs)
-                kwargs = {
-                    key: invocation_container.resolve(dep_type)
-                    for (key, dep_type) in keys_and_types
-                    if key not in keys_to_skip
-                }
+            update_container(invocation_container, supplied_args, supplied_kwargs)
+            kwargs = {
+                key: invocation_container.resolve(dep_type)
+                for (key, dep_type) in keys_and_types
+                if key not in keys_to_skip
+            }
             kwargs.update(supplied_kwargs)
             return supplied_args, kwargs
 
+        def _update_args(_injection_context, supplied_args, supplied_kwargs):
+            with _injection_context as invocation_container:
+                hooks = invocation_container._hooks
+                if hooks is None:
+                    return _inject(invocation_container, supplied_args, supplied_kwargs)
+                return observed_injection(
+                    hooks,
+                    func,
+                    _inject,
+                    invocation_container,
+                    supplied_args,
+                    supplied_kwargs,
+                )
+
         return apply_argument_updater(func, base_injection_context, _update_args, spec)
 
     def magic_partial(
@@ -355,34 +619,322 @@ class Container(
         :return:
         """
         spec = self._get_spec_without_self(func)
+        self._plan_cache.add_bound_types(
+            dep_type
+            for (key, dep_type) in spec.annotations.items()
+            if key not in (keys_to_skip or [])
+        )
 
         update_container = container_updater if container_updater else _update_nothing
         base_injection_context = self.temporary_singletons(shared)
 
-        def _update_args(_injection_context, supplied_args, supplied_kwargs):
-            final_keys_to_skip = (keys_to_skip or []) + list(supplied_kwargs.keys())
-            final_skip_pos_up_to = max(skip_pos_up_to, len(supplied_args))
-            with _injection_context as invocation_container:
-                update_container(invocation_container, supplied_args, supplied_kwargs)
-                kwargs = invocation_container._infer_dependencies(
+        # Which arguments need injecting only depends on the shape of the call
+        # so the work is done once for each combination of supplied arguments.
+        injection_plans: Dict[Any, List[Tuple[str, Type, Any, bool]]] = {}
+
+        def _injection_plan(supplied_args, supplied_kwargs):
+            shape = (
+                (len(supplied_args), frozenset(supplied_kwargs))
+                if supplied_kwargs
+                else len(supplied_args)
+            )
+            plan = injection_plans.get(shape)
+            if plan is None:
+                plan = _arguments_to_inject(
                     spec,
-                    suppress_error=True,
-                    keys_to_skip=final_keys_to_skip,
-                    skip_pos_up_to=final_skip_pos_up_to,
+                    (keys_to_skip or []) + list(supplied_kwargs.keys()),
+                    max(skip_pos_up_to, len(supplied_args)),
                 )
+                if len(injection_plans) < _MAX_INJECTION_PLANS:
+                    injection_plans[shape] = plan
+            return plan
+
+        def _inject(invocation_container, supplied_args, supplied_kwargs):
+            plan = _injection_plan(supplied_args, supplied_kwargs)
+            kwargs = {}
+            update_container(invocation_container, supplied_args, supplied_kwargs)
+            # With nothing to log or report an undefined argument with a
+            # default is left for the function's own default to fill in
+            quiet = invocation_container._hooks is None and isinstance(
+                invocation_container._undefined_logger, NullLogger
+            )
+            for key, dep_type, default, defaulted in plan:
+                if (
+                    defaulted
+                    and quiet
+                    and invocation_container.get_definition(dep_type) is None
+                ):
+                    continue
+                dep = invocation_container._resolver(
+                    invocation_container, dep_type, True, False, default
+                )
+                if dep is not None:
+                    kwargs[key] = dep
             kwargs.update(supplied_kwargs)
             return supplied_args, kwargs
 
+        def _update_args(_injection_context, supplied_args, supplied_kwargs):
+            with _injection_context as invocation_container:
+                hooks = invocation_container._hooks
+                if hooks is None:
+                    return _inject(invocation_container, supplied_args, supplied_kwargs)
+                return observed_injection(
+                    hooks,
+                    func,
+                    _inject,
+                    invocation_container,
+                    supplied_args,
+                    supplied_kwargs,
+                )
+
         return apply_argument_updater(
             func, base_injection_context, _update_args, spec, catch_errors=True
         )
 
+    def warm_up(
+        self, roots: Optional[Iterable[Any]] = None, max_workers: Optional[int] = None
+    ) -> "WarmUpReport":
+        """Reflects on and plans everything needed to build the roots so the
+        first resolution of each one doesn't have to. Roots can be types or
+        functions, in which case the types of their arguments are warmed up.
+        Without any roots every type injected by a function bound to this
+        container, or one of its clones, is warmed up. Nothing is constructed.
+
+        >>> from tests.examples import SomeClass
+        >>> c = Container()
+        >>> report = c.warm_up([SomeClass])
+        >>> list(report.timings) == [SomeClass] and not report.failures
+        True
+
+        :param roots: types or functions to warm up
+        :param max_workers: if set the roots are spread across a pool of this many threads
+        :return: how long each type (and each root) took
+        """
+        roots = list(self._plan_cache.bound_types if roots is None else roots)
+        if max_workers is None:
+            results = [self._warm_up_root(root) for root in roots]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(self._warm_up_root, roots))
+        report = WarmUpReport()
+        for root, (took, failure, type_timings) in zip(roots, results):
+            for dep_type, type_took in type_timings.items():
+                report.record(dep_type, report.timings.get(dep_type, 0.0) + type_took)
+            report.root_timings[root] = took
+            if failure is not None:
+                report.failures[root] = failure
+        return report
+
+    def _warm_up_root(
+        self, root: Any
+    ) -> Tuple[float, Optional[Exception], Dict[Any, float]]:
+        type_timings: Dict[Any, float] = {}
+        started = time.perf_counter()
+        try:
+            func = inspect.unwrap(root)
+            if isinstance(func, (FunctionType, MethodType)):
+                dep_types = list(self._get_spec_without_self(func).annotations.values())
+            else:
+                dep_types = [root]
+            for dep_type in dep_types:
+                self._warm_up_type(dep_type, type_timings)
+        except Exception as failure:
+            return time.perf_counter() - started, failure, type_timings
+        return time.perf_counter() - started, None, type_timings
+
+    def _warm_up_type(self, dep_type: Any, type_timings: Dict[Any, float]):
+        definition = self.get_definition(dep_type)
+        if isinstance(definition, SingletonWrapper):
+            definition = definition.singleton_type
+        if isinstance(definition, Alias):
+            dep_type = definition.alias_type
+            definition = self.get_definition(dep_type)
+        if definition is None and self._plans.get(dep_type) is None:
+            self._compile_plans(dep_type, type_timings)
+
+    def initialise_singletons(
+        self, max_workers: Optional[int] = None
+    ) -> "WarmUpReport":
+        """Builds every singleton that hasn't been built yet instead of waiting
+        for the first resolution to need it. Singletons are built in a thread
+        pool and each one waits for any singletons it depends on. Async
+        singletons are left to be built on first use.
+
+        >>> from tests.examples import SomeClass
+        >>> c = Container()
+        >>> c[SomeClass] = Singleton(SomeClass)
+        >>> list(c.initialise_singletons().timings) == [SomeClass]
+        True
+
+        :param max_workers: the most singletons to build at the same time
+        :return: how long each singleton took to build along with any failures
+        :raises CircularDefinitionError: if singletons depend on each other
+        """
+        singleton_types = self._unbuilt_singleton_types()
+        graph = self.dependency_graph(singleton_types)
+        cycle = graph.find_cycle()
+        if cycle:
+            raise CircularDefinitionError(cycle[0], set(cycle))
+        singletons = set(singleton_types)
+        waiting_on = {
+            dep_type: self._singletons_needed_by(dep_type, graph, singletons)
+            for dep_type in singleton_types
+        }
+        dependents: Dict[Any, List[Any]] = {dep_type: [] for dep_type in waiting_on}
+        for dep_type, needed in waiting_on.items():
+            for singleton_type in needed:
+                dependents[singleton_type].append(dep_type)
+
+        report = WarmUpReport()
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            running: Dict[Future, Any] = {}
+
+            def _finished(dep_type: Any, took: float, failure: Optional[Exception]):
+                report.record(dep_type, took, failure)
+                for dependent in dependents[dep_type]:
+                    waiting_on[dependent].discard(dep_type)
+                    if dependent in report.timings:
+                        continue
+                    if failure is not None:
+                        # Building it would only try the failed singleton again
+                        _finished(dependent, 0.0, failure)
+                    elif not waiting_on[dependent]:
+                        future = pool.submit(self._build_singleton, dependent)
+                        running[future] = dependent
+
+            for dep_type, needed in waiting_on.items():
+                if not needed:
+                    running[pool.submit(self._build_singleton, dep_type)] = dep_type
+            while running:
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    _finished(running.pop(future), *future.result())
+        return report
+
+    def _unbuilt_singleton_types(self) -> List[Any]:
+        singleton_types: List[Any] = []
+        seen: Set[int] = set()
+        for dep_type, definition in self._flattened_definitions().items():
+            # Optional[X] shares the definition of X so each is only built once
+            if (
+                not isinstance(definition, SingletonWrapper)
+                or definition._has_instance
+                or id(definition) in seen
+            ):
+                continue
+            seen.add(id(definition))
+            if not isinstance(
+                definition.singleton_type,
+                (AsyncConstructionWithContainer, AsyncConstructionWithoutContainer),
+            ):
+                singleton_types.append(dep_type)
+        return singleton_types
+
+    @staticmethod
+    def _singletons_needed_by(
+        dep_type: Any, graph: DependencyGraph, singletons: Set[Any]
+    ) -> Set[Any]:
+        """The singletons dep_type needs without going through another singleton"""
+        needed: Set[Any] = set()
+        visited: Set[Any] = set()
+        pending = list(graph.dependencies_of(dep_type))
+        while pending:
+            dependency = pending.pop()
+            if dependency in visited:
+                continue
+            visited.add(dependency)
+            if dependency in singletons:
+                needed.add(dependency)
+            else:
+                pending.extend(graph.dependencies_of(dependency))
+        return needed
+
+    def _build_singleton(self, dep_type: Any) -> Tuple[float, Optional[Exception]]:
+        started = time.perf_counter()
+        try:
+            self.resolve(dep_type)
+        except Exception as failure:
+            return time.perf_counter() - started, failure
+        return time.perf_counter() - started, None
+
+    def dependency_graph(
+        self, roots: Optional[Iterable[Any]] = None
+    ) -> DependencyGraph:
+        """Works out which types depend on which from the definitions and by
+        reflecting on constructors. Nothing is constructed. Types defined by
+        a function are leaves of the graph.
+
+        >>> from tests.examples import SomeClass
+        >>> c = Container()
+        >>> graph = c.dependency_graph([SomeClass])
+        >>> graph.find_cycle() is None and SomeClass in graph
+        True
+
+        :param roots: the types to start from. Defaults to every defined type
+                      and every type injected by a bound function.
+        :return:
+        """
+        if roots is None:
+            roots = [*self.defined_types, *self._plan_cache.bound_types]
+        dependencies: Dict[Any, Tuple[Any, ...]] = {}
+        pending = list(roots)
+        while pending:
+            dep_type = pending.pop()
+            if dep_type not in dependencies:
+                dependencies[dep_type] = self._direct_dependencies(dep_type)
+                pending.extend(dependencies[dep_type])
+        return DependencyGraph(dependencies)
+
+    def _direct_dependencies(self, dep_type: Any) -> Tuple[Any, ...]:
+        definition = self.get_definition(dep_type)
+        if isinstance(definition, SingletonWrapper):
+            definition = definition.singleton_type
+        if isinstance(definition, Alias):
+            if definition.skip_definitions or definition.alias_type == dep_type:
+                return self._reflected_dependencies(definition.alias_type)
+            return (definition.alias_type,)
+        if definition is not None:
+            return ()
+        return self._reflected_dependencies(dep_type)
+
+    def _reflected_dependencies(self, dep_type: Any) -> Tuple[Any, ...]:
+        """The same arguments _start_plan would plan for dep_type"""
+        optional_dep_type = remove_optional_type(dep_type)
+        if optional_dep_type:
+            return (optional_dep_type,)
+        if dep_type in UNRESOLVABLE_TYPES or not inspect.isclass(dep_type):
+            return ()
+        spec = self._reflector.get_function_spec(dep_type.__init__)
+        return tuple(
+            sub_dep_type
+            for (key, sub_dep_type) in spec.annotations.items()
+            if sub_dep_type != Any
+            and sub_dep_type != dep_type
+            and not (key in spec.defaults and sub_dep_type in UNRESOLVABLE_TYPES)
+        )
+
     def clone(self) -> "Container":
         """returns a copy of the container
         :return:
         """
         return Container(self, log_undefined_deps=self._undefined_logger)
 
+    def freeze(self) -> "FrozenContainer":
+        """Returns a read only copy of the container with every definition
+        checked and flattened ahead of time. Useful once all definitions
+        have been set up at the start of an application.
+
+        >>> from tests.examples import SomeClass
+        >>> c = Container()
+        >>> c[SomeClass] = SomeClass()
+        >>> frozen = c.freeze()
+        >>> frozen[SomeClass] is c[SomeClass]
+        True
+
+        :return:
+        """
+        return FrozenContainer(self)
+
     def get_definition(self, dep_type: Type[X]) -> Optional[SpecialDepDefinition[X]]:
         """
         Will return the definition in this container. If none has been defined any
@@ -393,61 +945,204 @@ class Container(
         """
         definition = self._registered_types.get(dep_type, Unset)
         if definition is Unset:
-            return self._parent_definitions.get_definition(dep_type)
+            return self._inherited_definitions().get(dep_type)
         return definition
 
+    def _all_definitions(self) -> Dict[Type, SpecialDepDefinition]:
+        """
+        Every definition visible to this container with the closest
+        definition winning.
+        """
+        return dict(self._flattened_definitions())
+
+    def _inherited_definitions(self) -> Dict[Type, SpecialDepDefinition]:
+        """
+        Every definition from the parent containers. The dictionary is
+        rebuilt whenever a definition is added to a container whose
+        definitions have already been flattened.
+        """
+        version = self._plan_cache.definitions_version
+        if self._inherited_version != version:
+            parent = self._parent_definitions
+            if isinstance(parent, Container):
+                self._inherited = parent._flattened_definitions()
+            else:
+                self._inherited = {
+                    dep_type: cast(SpecialDepDefinition, definition)
+                    for dep_type in parent.defined_types
+                    for definition in [parent.get_definition(dep_type)]
+                    if definition is not None
+                }
+            self._inherited_version = version
+        return self._inherited
+
+    def _flattened_definitions(self) -> Dict[Type, SpecialDepDefinition]:
+        """The definitions this container hands on to its clones"""
+        version = self._plan_cache.definitions_version
+        if self._flat_definitions is None or self._flat_version != version:
+            inherited = self._inherited_definitions()
+            if inherited:
+                self._flat_definitions = {**inherited, **self._registered_types}
+            else:
+                # Nothing to merge so the clones can share the definitions directly
+                self._flat_definitions = self._registered_types
+            self._flat_version = version
+        return self._flat_definitions
+
     def __getitem__(self, dep: Type[X]) -> X:
         return self.resolve(dep)
 
     def __setitem__(self, dep: Type[X], resolver: TypeResolver[X]):
         self.define(dep, resolver)
 
-    def _reflection_build_with_err_handling(
-        self,
-        dep_type: Type[X],
-        suppress_error: bool,
-        *,
-        default: X = Unset,
-        type_stack: Optional[Set[Type]] = None,
-    ) -> X:
-        try:
-            return self._reflection_build(
-                dep_type, default=default, type_stack=type_stack
-            )
-        except UnresolvableType as inner_error:
-            if not suppress_error:
-                raise UnresolvableType(dep_type) from inner_error
-            return None  # type: ignore
-        except RecursionError as recursion_error:
-            raise RecursiveDefinitionError(dep_type) from recursion_error
+    def _register(self, dep_type: Type, definition: SpecialDepDefinition):
+        self._registered_types[dep_type] = definition
+        self._defined_types = None
+        if self._flat_definitions is not None:
+            # Clones have copies of the old definitions
+            self._flat_definitions = None
+            self._plan_cache.definitions_version += 1
+        if isinstance(self._parent_definitions, Container):
+            self._plan_cache.mark_overridden(dep_type)
+        else:
+            self._plan_cache.invalidate_dependents(dep_type)
 
-    def _reflection_build(
+    def _plan_for(self, dep_type: Type) -> PlanNode:
+        """
+        Returns the plan for building dep_type by reflection. Plans are
+        compiled once and shared with every clone of the container.
+        """
+        plan = self._plans.get(dep_type)
+        if plan is None:
+            plan = self._compile_plans(dep_type)
+        return plan
+
+    def _compile_plans(
+        self, root_type: Type, timings: Optional[Dict[Any, float]] = None
+    ) -> PlanNode:
+        """
+        Compiles the plan for root_type along with any plans it needs that
+        don't exist yet. An explicit stack is used instead of recursion so
+        deep dependency graphs can't exhaust the interpreter's stack. The
+        types currently being planned are kept in a single set to detect
+        circular dependencies. If timings is given the time spent reflecting
+        on and planning each type (but not its arguments) is added to it.
+        """
+        version = self._plan_cache.version
+        logger = self._plan_logger()
+        being_planned: Dict[Type, None] = {}
+        stack: List[_PlanFrame] = []
+        node = self._start_plan(root_type, stack, being_planned, version)
+        while stack:
+            frame = stack[-1]
+            if node is not None:
+                frame.arguments.append((frame.pending[frame.position][0], node))
+                frame.position += 1
+                node = None
+            if frame.position < len(frame.pending):
+                key, sub_dep_type, default = frame.pending[frame.position]
+                node = self._known_step(sub_dep_type, default)
+                if node is None:
+                    node = self._start_plan(sub_dep_type, stack, being_planned, version)
+                continue
+            stack.pop()
+            if frame.optional:
+                node = OptionalStep(frame.dep_type, frame.arguments[0][1])
+            else:
+                being_planned.pop(frame.dep_type)
+                # Only optional frames have arguments without a key
+                arguments = cast(List[Tuple[str, PlanNode]], frame.arguments)
+                node = ReflectionStep(frame.dep_type, arguments, logger)
+            self._store_plan(frame.dep_type, node, version)
+            took = time.perf_counter() - frame.started
+            if stack:
+                stack[-1].arguments_took += took
+            if timings is not None and not frame.optional:
+                timings[frame.dep_type] = took - frame.arguments_took
+        return cast(PlanNode, node)
+
+    def _start_plan(
         self,
-        dep_type: Type[X],
-        *,
-        default: X = Unset,
-        type_stack: Optional[Set[Type]] = None,
-    ) -> X:
-        type_stack = set(type_stack or [])
-        if dep_type in type_stack:
-            raise CircularDefinitionError(dep_type, type_stack)
-        type_stack.add(dep_type)
-        self._undefined_logger.warning(
-            f"Undefined dependency. Using reflection for {dep_type}",
-            extra={"undefined_dependency": dep_type},
-        )
-        spec = self._reflector.get_function_spec(dep_type.__init__)
+        dep_type: Type,
+        stack: List["_PlanFrame"],
+        being_planned: Dict[Type, None],
+        version: int,
+    ) -> Optional[PlanNode]:
+        """
+        Either returns the finished plan for dep_type or pushes a frame
+        onto the stack for its arguments to be planned.
+        """
+        plan = self._plans.get(dep_type)
+        if plan is not None:
+            return plan
+        optional_dep_type = remove_optional_type(dep_type)
+        if optional_dep_type:
+            stack.append(
+                _PlanFrame(dep_type, [(None, optional_dep_type, Unset)], optional=True)
+            )
+            return None
+        if dep_type in being_planned:
+            raise CircularDefinitionError(dep_type, set(being_planned))
         if dep_type in UNRESOLVABLE_TYPES:
-            if default is not Unset:
-                return default
-            raise UnresolvableType(dep_type)
-        sub_deps = self._infer_dependencies(
-            spec, types_to_skip={dep_type}, type_stack=type_stack
+            plan = UnresolvableStep(dep_type, self._plan_logger())
+            self._store_plan(dep_type, plan, version)
+            return plan
+        started = time.perf_counter()
+        spec = self._reflector.get_function_spec(dep_type.__init__)
+        being_planned[dep_type] = None
+        stack.append(
+            _PlanFrame(
+                dep_type,
+                [
+                    (key, sub_dep_type, spec.defaults.get(key, Unset))
+                    for (key, sub_dep_type) in spec.annotations.items()
+                    if sub_dep_type != Any and sub_dep_type != dep_type
+                ],
+                started=started,
+            )
         )
-        try:
-            return dep_type(**sub_deps)  # type: ignore
-        except TypeError as type_error:
-            raise UnresolvableType(dep_type) from type_error
+        return None
+
+    def _known_step(self, dep_type: Type, default: Any) -> Optional[PlanNode]:
+        """
+        The step for an argument that doesn't need planning. None if the
+        argument's type has to be built by reflection.
+        """
+        if dep_type in self._plan_cache.overridden:
+            return LiveStep(dep_type, hooks=self._hooks)
+        definition = self.get_definition(dep_type)
+        if definition:
+            step = DefinitionStep(dep_type, definition)
+            if self._hooks is not None:
+                step.build = observed_definition_builder(
+                    self._hooks, dep_type, definition
+                )
+            return step
+        if default is not Unset and dep_type in UNRESOLVABLE_TYPES:
+            return DefaultStep(dep_type, default, self._plan_logger())
+        return None
+
+    def _store_plan(self, dep_type: Type, plan: PlanNode, version: int):
+        backend = self._plan_cache.backend
+        if self._hooks is not None:
+            # Observed plans report every type built by reflection so the
+            # generated code (which calls constructors directly) isn't used
+            if isinstance(plan, ReflectionStep):
+                plan.build = observed_reflection_builder(
+                    self._hooks, dep_type, plan.build
+                )
+        elif (
+            backend is not None
+            and isinstance(plan, ReflectionStep)
+            and not plan.always_fails
+        ):
+            plan.build = backend(plan)
+        self._plan_cache.store(self._plans, dep_type, plan, version)
+
+    def _plan_logger(self) -> Optional[logging.Logger]:
+        if isinstance(self._undefined_logger, NullLogger):
+            return None
+        return self._undefined_logger
 
     def _infer_dependencies(
         self,
@@ -455,24 +1150,12 @@ class Container(
         suppress_error=False,
         keys_to_skip: Optional[List[str]] = None,
         skip_pos_up_to=0,
-        types_to_skip: Optional[Set[Type]] = None,
-        type_stack: Optional[Set[Type]] = None,
     ):
-        dep_keys_to_skip: List[str] = []
-        dep_keys_to_skip.extend(spec.args[0:skip_pos_up_to])
-        dep_keys_to_skip.extend(keys_to_skip or [])
-        types_to_skip = types_to_skip or set()
         sub_deps = {
-            key: self._resolve(
-                sub_dep_type,
-                suppress_error=suppress_error,
-                default=spec.defaults.get(key, Unset),
-                type_stack=type_stack,
+            key: self._resolver(self, sub_dep_type, suppress_error, False, default)
+            for (key, sub_dep_type, default, _) in _arguments_to_inject(
+                spec, keys_to_skip or [], skip_pos_up_to
             )
-            for (key, sub_dep_type) in spec.annotations.items()
-            if sub_dep_type != Any
-            and (key not in dep_keys_to_skip)
-            and (sub_dep_type not in types_to_skip)
         }
         return {key: dep for (key, dep) in sub_deps.items() if dep is not None}
 
@@ -485,6 +1168,16 @@ class Container(
 
 @mypyc_attr(allow_interpreted_subclasses=True)
 class ExplicitContainer(Container):
+    def __init__(
+        self,
+        container: Optional["Container"] = None,
+        log_undefined_deps: Union[bool, logging.Logger] = False,
+        reflection_cache_size: Optional[int] = DEFAULT_REFLECTION_CACHE_SIZE,
+    ):
+        super().__init__(container, log_undefined_deps, reflection_cache_size)
+        self._explicit = True
+        self._resolver = self._pick_resolver()
+
     def resolve(
         self, dep_type: Type[X], suppress_error=False, skip_definitions=False
     ) -> X:
@@ -497,16 +1190,7 @@ class ExplicitContainer(Container):
 
     def define(self, dep, resolver):
         definition = super().define(dep, resolver)
-        if isinstance(definition, Alias):
-            raise InvalidDependencyDefinition(
-                "Aliases are not valid in an explicit container"
-            )
-        if isinstance(definition, Singleton) and isinstance(
-            definition.singleton_type, Alias
-        ):
-            raise InvalidDependencyDefinition(
-                "Aliases are not valid inside singletons in an explicit container"
-            )
+        _reject_aliases(definition)
         return definition
 
     def clone(self):
@@ -515,6 +1199,359 @@ class ExplicitContainer(Container):
         """
         return ExplicitContainer(self, log_undefined_deps=self._undefined_logger)
 
+    def freeze(self) -> "FrozenContainer":
+        """Returns a read only copy of the container. Like the explicit
+        container it will only resolve defined types.
+        :return:
+        """
+        return FrozenContainer(self, explicit=True)
+
+
+@mypyc_attr(allow_interpreted_subclasses=True)
+class FrozenContainer(Container):
+    """
+    A read only snapshot of a container's definitions.
+
+    All the definitions from the container and its parents are flattened
+    into a single lookup. Alias chains are collapsed and singletons that
+    have already been built are replaced with the instance itself. New
+    definitions can't be added but the container can still be cloned.
+
+    >>> from tests.examples import SomeClass, SomeExtendedClass
+    >>> c = Container()
+    >>> c[SomeClass] = SomeExtendedClass
+    >>> frozen = c.freeze()
+    >>> frozen[SomeClass]
+    <tests.examples.SomeExtendedClass object at ...>
+    >>> frozen[SomeClass] = SomeClass
+    Traceback (most recent call last):
+    ...
+    lagom.exceptions.ContainerIsFrozen: ...
+    """
+
+    def __init__(self, container: Container, explicit: bool = False):
+        """
+        :param container: The container to take a snapshot of
+        :param explicit: If true types without a definition will not be built by reflection
+        """
+        super().__init__(log_undefined_deps=container._undefined_logger)
+        self._explicit = explicit
+        self._reflector = container._reflector
+        self._tracer = container._tracer
+        self._use_hooks(container._added_hooks)
+
+        definitions = container._all_definitions()
+        # The snapshot gets its own debug info
+        definitions.pop(ContainerDebugInfo, None)
+        for dep_type, definition in definitions.items():
+            self._registered_types[dep_type] = _collapse_definition(
+                dep_type, definition, definitions
+            )
+        if not explicit:
+            self._check_aliases()
+
+    def define(self, dep, resolver):
+        raise ContainerIsFrozen(
+            "Definitions can't be added to a frozen container. Try cloning it first."
+        )
+
+    def freeze(self) -> "FrozenContainer":
+        return self
+
+    def clone(self) -> Container:
+        """returns an unfrozen copy. Copies of explicit snapshots stay explicit.
+        :return:
+        """
+        if self._explicit:
+            return ExplicitContainer(self, log_undefined_deps=self._undefined_logger)
+        return Container(self, log_undefined_deps=self._undefined_logger)
+
+    def get_definition(self, dep_type: Type[X]) -> Optional[SpecialDepDefinition[X]]:
+        return self._registered_types.get(dep_type)
+
+    @property
+    def defined_types(self) -> Set[Type]:
+        return set(self._registered_types.keys())
+
+    def _check_aliases(self):
+        """
+        Any alias that ends up needing reflection is planned now so that
+        problems show up when freezing rather than on first use.
+        """
+        for definition in list(self._registered_types.values()):
+            if isinstance(definition, SingletonWrapper):
+                definition = definition.singleton_type
+            if isinstance(definition, Alias):
+                plan = self._plan_for(definition.alias_type)
+                if plan.always_fails:
+                    # Nothing is built so this only raises the error
+                    # the first resolution would have
+                    plan.build(self)
+
+
+@mypyc_attr(allow_interpreted_subclasses=True)
+class Scope(Container):
+    """
+    A cheap, short lived child of a container used for a single invocation
+    of a bound function. Types marked as shared are built once per scope.
+    Everything else is delegated to the parent container.
+
+    Unlike a clone nothing is registered when a scope is created. The shared
+    types are looked up by their position in a list which is filled in as
+    they are first needed.
+
+    >>> from tests.examples import SomeClass
+    >>> c = Container()
+    >>> with c.temporary_singletons([SomeClass]) as scope:
+    ...     scope[SomeClass] is scope[SomeClass]
+    True
+    """
+
+    _slots: Dict[Any, int]
+    _shared: List[Optional["_ScopedSingleton"]]
+
+    def __init__(
+        self, container: Container, slots: Dict[Any, int], explicit: bool = False
+    ):
+        """
+        :param container: The container to delegate to
+        :param slots: The position of each shared type (including Optional versions)
+        :param explicit: If true types without a definition will not be built by reflection
+        """
+        self._slots = slots
+        self._shared = [None] * len(slots)
+        self._explicit = explicit
+        self._registered_types = _NO_DEFINITIONS
+        self._parent_definitions = container
+        self._reflector = container._reflector
+        self._undefined_logger = container._undefined_logger
+        self._plan_cache = container._plan_cache
+        self._plans = container._plans
+        self._added_hooks = container._added_hooks
+        self._hooks = container._hooks
+        self._resolver = self._pick_resolver()
+        self._tracer = container._tracer
+        self._inherited = _NO_DEFINITIONS
+        self._inherited_version = -1
+        self._flat_definitions = None
+        self._flat_version = -1
+        self._defined_types = None
+        self._defined_types_version = -1
+
+    def resolve(
+        self, dep_type: Type[X], suppress_error=False, skip_definitions=False
+    ) -> X:
+        if self._explicit:
+            definition = self.get_definition(dep_type)
+            if not definition:
+                if suppress_error:
+                    return None  # type: ignore
+                raise DependencyNotDefined(dep_type)
+            return definition.get_instance(self)
+        return self._resolver(self, dep_type, suppress_error, skip_definitions)
+
+    def define(self, dep, resolver):
+        definition = super().define(dep, resolver)
+        if self._explicit:
+            _reject_aliases(definition)
+        return definition
+
+    def clone(self) -> Container:
+        """returns a copy of the scope. Copies of explicit scopes stay explicit.
+        :return:
+        """
+        if self._explicit:
+            return ExplicitContainer(self, log_undefined_deps=self._undefined_logger)
+        return Container(self, log_undefined_deps=self._undefined_logger)
+
+    def freeze(self) -> "FrozenContainer":
+        return FrozenContainer(self, explicit=self._explicit)
+
+    def get_definition(self, dep_type: Type[X]) -> Optional[SpecialDepDefinition[X]]:
+        definition = self._registered_types.get(dep_type)
+        if definition is not None:
+            return definition
+        slot = self._slots.get(dep_type)
+        if slot is not None:
+            return self._shared_definition(slot, dep_type)
+        return self._parent_definitions.get_definition(dep_type)
+
+    @property
+    def defined_types(self) -> Set[Type]:
+        return self._parent_definitions.defined_types.union(
+            self._registered_types.keys(), self._slots.keys()
+        )
+
+    def _flattened_definitions(self) -> Dict[Type, SpecialDepDefinition]:
+        version = self._plan_cache.definitions_version
+        if self._flat_definitions is None or self._flat_version != version:
+            definitions = dict(self._inherited_definitions())
+            for dep_type, slot in self._slots.items():
+                definitions[dep_type] = self._shared_definition(slot, dep_type)
+            definitions.update(self._registered_types)
+            self._flat_definitions = definitions
+            self._flat_version = version
+        return self._flat_definitions
+
+    def _register(self, dep_type: Type, definition: SpecialDepDefinition):
+        if self._registered_types is _NO_DEFINITIONS:
+            self._registered_types = {}
+        super()._register(dep_type, definition)
+
+    def _shared_definition(self, slot: int, dep_type: Type) -> "_ScopedSingleton":
+        definition = self._shared[slot]
+        if definition is None:
+            definition = _ScopedSingleton(
+                cast(Container, self._parent_definitions),
+                remove_optional_type(dep_type) or dep_type,
+            )
+            self._shared[slot] = definition
+        return definition
+
+
+class WarmUpReport:
+    """
+    The result of Container.warm_up or Container.initialise_singletons.
+    Timings are in seconds and kept for each type. For warm_up that is the
+    time spent reflecting on and planning the type itself (not the types it
+    needs). Types that were already planned don't appear. The total for
+    each root, including any types it needed that no earlier root had, is
+    in root_timings and failures are recorded against the root.
+    """
+
+    timings: Dict[Any, float]
+    root_timings: Dict[Any, float]
+    failures: Dict[Any, Exception]
+
+    def __init__(self):
+        self.timings = {}
+        self.root_timings = {}
+        self.failures = {}
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.timings.values())
+
+    def slowest(self, count: int = 10) -> List[Tuple[Any, float]]:
+        """The types that took the longest, slowest first"""
+        return sorted(self.timings.items(), key=lambda item: item[1], reverse=True)[
+            :count
+        ]
+
+    def record(self, dep_type: Any, took: float, failure: Optional[Exception] = None):
+        self.timings[dep_type] = took
+        if failure is not None:
+            self.failures[dep_type] = failure
+
+    def __repr__(self):
+        return (
+            f"<WarmUpReport {len(self.timings)} types in {self.total_time:.4f}s, "
+            f"{len(self.failures)} failed>"
+        )
+
+
+class _PlanFrame:
+    """A type whose plan is being compiled by Container._compile_plans"""
+
+    dep_type: Any
+    # The (key, type, default) of every argument that needs a plan step.
+    # Optional frames have a single argument without a key.
+    pending: List[Tuple[Optional[str], Any, Any]]
+    position: int
+    arguments: List[Tuple[Optional[str], PlanNode]]
+    optional: bool
+    # When reflecting on the type started and how long its arguments took
+    started: float
+    arguments_took: float
+
+    def __init__(
+        self,
+        dep_type: Any,
+        pending: List[Tuple[Optional[str], Any, Any]],
+        optional: bool = False,
+        started: Optional[float] = None,
+    ):
+        self.dep_type = dep_type
+        self.pending = pending
+        self.position = 0
+        self.arguments = []
+        self.optional = optional
+        self.started = time.perf_counter() if started is None else started
+        self.arguments_took = 0.0
+
+
+class _ScopeFactory:
+    """
+    Builds the scope for each invocation of a bound function. The slot for
+    every shared type is worked out once when the function is bound.
+    """
+
+    _shared: List[Type]
+    _slots: Dict[Any, int]
+    _prepared: Optional[PlanCache]
+
+    def __init__(self, shared: List[Type]):
+        self._shared = list(shared)
+        self._slots = {}
+        for slot, dep_type in enumerate(dict.fromkeys(shared)):
+            self._slots[dep_type] = slot
+            self._slots[Optional[dep_type]] = slot  # type: ignore
+        self._prepared = None
+
+    def __call__(self, container):
+        if not isinstance(container, Container):
+            return update_container_singletons(container, self._shared)
+        if container._plan_cache is not self._prepared:
+            # Plans have to look shared types up in the resolving container
+            for dep_type in self._slots:
+                container._plan_cache.mark_overridden(dep_type)
+            self._prepared = container._plan_cache
+        return Scope(container, self._slots, explicit=container._explicit)
+
+
+class _ScopedSingleton(SpecialDepDefinition):
+    """Resolves a shared type from the parent container once per scope"""
+
+    _container: ReadableContainer
+    _dep_type: Type
+    _instance: Any
+
+    def __init__(self, container: ReadableContainer, dep_type: Type):
+        self._container = container
+        self._dep_type = dep_type
+        self._instance = Unset
+
+    def get_instance(self, _container: ReadableContainer):
+        if self._instance is Unset:
+            self._instance = self._container.resolve(self._dep_type)
+        return self._instance
+
+
+_NO_DEFINITIONS: Dict[Type, SpecialDepDefinition] = {}
+
+
+def _collapse_definition(
+    dep_type: Type,
+    definition: SpecialDepDefinition,
+    definitions: Dict[Type, SpecialDepDefinition],
+    chain: FrozenSet[Type] = frozenset(),
+) -> SpecialDepDefinition:
+    """
+    Follows aliases to the definition that actually does the building and
+    swaps built singletons for their instance.
+    """
+    if isinstance(definition, SingletonWrapper) and definition._has_instance:
+        return PlainInstance(definition._instance)
+    if isinstance(definition, Alias) and not definition.skip_definitions:
+        target = definitions.get(definition.alias_type)
+        if target is not None:
+            if definition.alias_type in chain:
+                raise CircularDefinitionError(definition.alias_type, set(chain))
+            return _collapse_definition(
+                definition.alias_type, target, definitions, chain.union([dep_type])
+            )
+    return definition
+
 
 class EmptyDefinitionSet(DefinitionsSource):
     """
@@ -535,5 +1572,72 @@ class EmptyDefinitionSet(DefinitionsSource):
         return set()
 
 
+# Functions taking **kwargs could be called with any number of
+# different keyword arguments so only this many call shapes are remembered.
+_MAX_INJECTION_PLANS = 32
+
+
+def _arguments_to_inject(
+    spec: FunctionSpec, keys_to_skip: List[str], skip_pos_up_to: int
+) -> List[Tuple[str, Type, Any, bool]]:
+    """
+    The name, type and default of each argument of a function that the
+    container should try to build. The flag is set for arguments that will
+    fall back to their default unless their type has been defined.
+    """
+    dep_keys_to_skip = set(spec.args[0:skip_pos_up_to]).union(keys_to_skip)
+    arguments = []
+    for key, dep_type in spec.annotations.items():
+        if dep_type != Any and key not in dep_keys_to_skip:
+            default = spec.defaults.get(key, Unset)
+            defaulted = default is not Unset and dep_type in UNRESOLVABLE_TYPES
+            arguments.append((key, dep_type, default, defaulted))
+    return arguments
+
+
+def _reject_aliases(definition: SpecialDepDefinition):
+    """Explicit containers have to say how every type is built"""
+    if isinstance(definition, Alias):
+        raise InvalidDependencyDefinition(
+            "Aliases are not valid in an explicit container"
+        )
+    if isinstance(definition, Singleton) and isinstance(
+        definition.singleton_type, Alias
+    ):
+        raise InvalidDependencyDefinition(
+            "Aliases are not valid inside singletons in an explicit container"
+        )
+
+
+def _awaited_instance(
+    container: Container, dep_type: Any, definition: SpecialDepDefinition
+) -> Awaitable:
+    if remove_awaitable_type(dep_type):
+        return definition.get_instance(container)
+    return get_instance_async(container, dep_type, definition)
+
+
+def _plain_resolver(hooks: Optional[ResolutionHooks]) -> Callable[..., Any]:
+    return Container._resolve if hooks is None else Container._observed_resolve
+
+
+def _resolve_explicitly(
+    container: Container,
+    dep_type: Type[X],
+    suppress_error=False,
+    skip_definitions=False,
+    default: X = Unset,
+) -> X:
+    """The resolver of explicit containers. Only defined types are resolved."""
+    if skip_definitions or container.get_definition(dep_type) is None:
+        if default is not Unset:
+            return default
+        if suppress_error:
+            return None  # type: ignore
+        raise DependencyNotDefined(dep_type)
+    resolver = _plain_resolver(container._hooks)
+    return resolver(container, dep_type, suppress_error, False, default)
+
+
 def _update_nothing(_c: WriteableContainer, _a: typing.Collection, _k: Dict):
     return None
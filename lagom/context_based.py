@@ -21,6 +21,7 @@ from lagom.functools import wraps
 from lagom.compilaton import mypyc_attr
 from lagom.definitions import ConstructionWithContainer, SingletonWrapper, Alias
 from lagom.exceptions import InvalidDependencyDefinition
+from lagom.hooks import ObservedContextManager, ResolutionHooks
 from lagom.interfaces import (
     ReadableContainer,
     SpecialDepDefinition,
@@ -171,6 +172,9 @@ class ContextContainer(Container):
             # itself.
             type_def = copy(type_def)
             type_def.skip_definitions = True
+        hooks = self._hooks
+        if hooks is not None:
+            return ConstructionWithContainer(lambda c: self._observed_context_resolver(c, type_def, dep_type, hooks))  # type: ignore
         return ConstructionWithContainer(lambda c: self._context_resolver(c, type_def))  # type: ignore
 
     def _singleton_type_def(self, dep_type: Type):
@@ -188,3 +192,19 @@ class ContextContainer(Container):
         assert self.exit_stack, "Types can only be resolved within a with"
         context_manager = cast(ContextManager, type_def.get_instance(c))
         return self.exit_stack.enter_context(context_manager)
+
+    def _observed_context_resolver(
+        self,
+        c: ReadableContainer,
+        type_def: SpecialDepDefinition,
+        dep_type: Type,
+        hooks: ResolutionHooks,
+    ):
+        """
+        The same as _context_resolver but reports entering and exiting the
+        context manager to the container's hooks
+        """
+        assert self.exit_stack, "Types can only be resolved within a with"
+        context_manager = cast(ContextManager, type_def.get_instance(c))
+        observed = ObservedContextManager(hooks, dep_type, context_manager)
+        return self.exit_stack.enter_context(observed)
@@ -71,10 +71,14 @@ def magic_bind_to_container(
     return _decorator
 
 
-def dependency_definition(container: Container, singleton: bool = False):
+def dependency_definition(
+    container: Container, singleton: bool = False, eager: bool = False
+):
     """Registers the provided function with the container
     The return type of the decorated function will be reflected and whenever
-    the container is asked for this type the function will be called
+    the container is asked for this type the function will be called.
+    Async functions only run once the awaitable is awaited unless eager is
+    set, in which case a task is started as soon as the type is resolved.
 
     >>> from tests.examples import SomeClass, SomeExtendedClass
     >>> c = Container()
@@ -87,7 +91,7 @@ def dependency_definition(container: Container, singleton: bool = False):
     """
 
     def _decorator(func):
-        definition_func, return_type = _extract_definition_func_and_type(func)  # type: ignore
+        definition_func, return_type = _extract_definition_func_and_type(func, eager)  # type: ignore
 
         if singleton:
             container.define(return_type, Singleton(definition_func))
@@ -137,7 +141,7 @@ def context_dependency_definition(container: Container):
 
 
 def _extract_definition_func_and_type(
-    func,
+    func, eager: bool = False
 ) -> Tuple[SpecialDepDefinition, Type[T]]:
     """
     Takes a function or a generator and returns a function and the return type.
@@ -151,7 +155,7 @@ def _extract_definition_func_and_type(
             f"Function {func.__name__} used as a definition must have a return type"
         )
     if inspect.iscoroutinefunction(func):
-        return async_construction(func), return_type
+        return async_construction(func, eager), return_type
     if not inspect.isgeneratorfunction(func) and not inspect.isasyncgenfunction(func):
         return construction(func), return_type
 
@@ -4,8 +4,10 @@ Classes representing specific ways of representing dependencies
 
 import asyncio
 import inspect
+import time
 from threading import Lock
 from typing import (
+    Any,
     Union,
     Type,
     Optional,
@@ -14,6 +16,9 @@ from typing import (
     NoReturn,
     Iterator,
     Awaitable,
+    Generator,
+    Generic,
+    List,
 )
 
 from .exceptions import (
@@ -27,32 +32,107 @@ X = TypeVar("X")
 AX = Awaitable[X]
 
 
+_NOT_STARTED = 0
+_RUNNING = 1
+_FINISHED = 2
+
+
+class LazyAwaitable(Generic[X]):
+    """Calls start and awaits the result the first time it is awaited.
+
+    No task is created or scheduled so nothing runs unless the awaitable is
+    awaited. It can be awaited any number of times (and by several tasks at
+    once) but start is only called once. If the first await is cancelled
+    the next one starts again.
+    """
+
+    __slots__ = ("_start", "_state", "_result", "_error", "_waiters")
+
+    _start: Callable[[], Awaitable[X]]
+    _state: int
+    _result: Any
+    _error: Optional[Exception]
+    _waiters: List[asyncio.Future]
+
+    def __init__(self, start: Callable[[], Awaitable[X]]):
+        self._start = start
+        self._state = _NOT_STARTED
+        self._result = None
+        self._error = None
+        self._waiters = []
+
+    def __await__(self) -> Generator[Any, None, X]:
+        while self._state == _RUNNING:
+            # Another task is running it so wait to hear that it finished
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            yield from waiter
+        if self._state == _NOT_STARTED:
+            self._state = _RUNNING
+            try:
+                self._result = yield from self._start().__await__()
+                self._state = _FINISHED
+            except Exception as error:
+                self._error = error
+                self._state = _FINISHED
+            except BaseException:
+                self._state = _NOT_STARTED
+                raise
+            finally:
+                self._wake_waiters()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def _wake_waiters(self):
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+
 class AsyncConstructionWithoutContainer(SpecialDepDefinition[AX]):
-    """Wraps an awaitable for constructing a type"""
+    """Wraps an awaitable for constructing a type
+
+    Nothing runs until the returned awaitable is awaited. With eager set
+    a task is created straight away instead.
+    """
 
-    def __init__(self, constructor: Callable[[], AX]):
+    def __init__(self, constructor: Callable[[], AX], eager: bool = False):
         self.constructor = constructor
+        self.eager = eager
 
     def get_instance(self, container: ReadableContainer) -> AX:
         resolver = self.constructor
-        return asyncio.ensure_future(resolver())
+        if self.eager:
+            return asyncio.ensure_future(resolver())
+        return LazyAwaitable(resolver)
 
     def __copy__(self):
-        return AsyncConstructionWithoutContainer(self.constructor)
+        return AsyncConstructionWithoutContainer(self.constructor, self.eager)
 
 
 class AsyncConstructionWithContainer(SpecialDepDefinition[AX]):
-    """Wraps an awaitable for constructing a type"""
+    """Wraps an awaitable for constructing a type
 
-    def __init__(self, constructor: Callable[[ReadableContainer], AX]):
+    Nothing runs until the returned awaitable is awaited. With eager set
+    a task is created straight away instead.
+    """
+
+    def __init__(
+        self, constructor: Callable[[ReadableContainer], AX], eager: bool = False
+    ):
         self.constructor = constructor
+        self.eager = eager
 
     def get_instance(self, container: ReadableContainer) -> Awaitable[AX]:
         resolver = self.constructor
-        return asyncio.ensure_future(resolver(container))
+        if self.eager:
+            return asyncio.ensure_future(resolver(container))
+        return LazyAwaitable(lambda: resolver(container))
 
     def __copy__(self):
-        return AsyncConstructionWithContainer(self.constructor)
+        return AsyncConstructionWithContainer(self.constructor, self.eager)
 
 
 class ConstructionWithoutContainer(SpecialDepDefinition[X]):
@@ -112,19 +192,20 @@ class YieldWithContainer(SpecialDepDefinition[X]):
 
 
 def async_construction(
-    resolver: Callable,
+    resolver: Callable, eager: bool = False
 ) -> Union[AsyncConstructionWithContainer, AsyncConstructionWithoutContainer]:
     """
     Takes a generator and returns a type definition
     :param reflector:
     :param resolver:
+    :param eager: start a task on resolution instead of waiting to be awaited
     :return:
     """
     func_arity = arity(resolver)
     if func_arity == 0:
-        return AsyncConstructionWithoutContainer(resolver)
+        return AsyncConstructionWithoutContainer(resolver, eager)
     if func_arity == 1:
-        return AsyncConstructionWithContainer(resolver)
+        return AsyncConstructionWithContainer(resolver, eager)
     raise InvalidDependencyDefinition(f"Arity {func_arity} functions are not supported")
 
 
@@ -183,31 +264,56 @@ class Alias(SpecialDepDefinition[X]):
         return Alias(self.alias_type, self.skip_definitions)
 
 
+class _Unbuilt:
+    """Marks a singleton that hasn't been built. None is a valid singleton."""
+
+    def __repr__(self):
+        return "<unbuilt>"
+
+
+_UNBUILT: Any = _Unbuilt()
+
+
 class SingletonWrapper(SpecialDepDefinition[X]):
-    """Builds only once then saves the built instance"""
+    """Builds only once then saves the built instance
+
+    Once built getting the instance is a single attribute read. The lock is
+    only used whilst the instance is being built. threads_waited and
+    seconds_waited record how much contention there was for it.
+    """
 
     singleton_type: SpecialDepDefinition
-    _instance: Optional[X]
+    threads_waited: int
+    seconds_waited: float
+    _instance: Any
     _thread_lock: Lock
 
     def __init__(self, def_to_wrap: SpecialDepDefinition):
         self.singleton_type = def_to_wrap
-        self._instance = None
+        self.threads_waited = 0
+        self.seconds_waited = 0.0
+        self._instance = _UNBUILT
         self._thread_lock = Lock()
 
     def get_instance(self, container: ReadableContainer) -> X:
-        if self._has_instance:
-            return self._instance  # type: ignore
+        instance = self._instance
+        if instance is not _UNBUILT:
+            return instance
         return self._load_instance(container)
 
     @property
     def _has_instance(self) -> bool:
-        return self._instance is not None
+        return self._instance is not _UNBUILT
 
     def _load_instance(self, container):
-        try:
+        if not self._thread_lock.acquire(blocking=False):
+            # Another thread is building the instance
+            started = time.perf_counter()
             self._thread_lock.acquire()
-            if self._has_instance:
+            self.threads_waited += 1
+            self.seconds_waited += time.perf_counter() - started
+        try:
+            if self._instance is not _UNBUILT:
                 return self._instance
             self._instance = self.singleton_type.get_instance(container)
             return self._instance
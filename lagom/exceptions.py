@@ -56,6 +56,12 @@ class DuplicateDefinition(ValueError, LagomException):
     pass
 
 
+class ContainerIsFrozen(TypeError, LagomException):
+    """The container is read only so definitions can't be added"""
+
+    pass
+
+
 class TypeOnlyAvailableAsAwaitable(SyntaxError, LagomException):
     """The type is only available as Awaitable[T]"""
 
@@ -0,0 +1,127 @@
+"""
+A static view of how types depend on each other.
+
+The graph is worked out from a container's definitions and by reflecting
+on constructors. Nothing is constructed so problems like circular
+dependencies can be found at startup rather than in the middle of a request.
+See `Container.dependency_graph`.
+"""
+
+from collections import deque
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .exceptions import CircularDefinitionError
+
+
+class DependencyGraph:
+    """
+    Maps each type to the types it directly depends on, along with the
+    reverse. Types defined by a function are leaves as there is no way to
+    know what the function will ask the container for without calling it.
+    The graph is a snapshot of the container when it was built.
+
+    >>> graph = DependencyGraph({"car": ("engine",), "engine": ()})
+    >>> graph.topological_order()
+    ['engine', 'car']
+    >>> graph.dependents_of("engine")
+    ('car',)
+    """
+
+    _dependencies: Dict[Any, Tuple[Any, ...]]
+    _dependents: Dict[Any, Tuple[Any, ...]]
+
+    def __init__(self, dependencies: Dict[Any, Tuple[Any, ...]]):
+        self._dependencies = dependencies
+        dependents: Dict[Any, List[Any]] = {dep_type: [] for dep_type in dependencies}
+        for dep_type, direct_dependencies in dependencies.items():
+            for dependency in direct_dependencies:
+                dependents.setdefault(dependency, []).append(dep_type)
+        self._dependents = {
+            dep_type: tuple(types) for (dep_type, types) in dependents.items()
+        }
+
+    def __contains__(self, dep_type) -> bool:
+        return dep_type in self._dependents
+
+    def __len__(self) -> int:
+        return len(self._dependents)
+
+    @property
+    def types(self) -> Set[Any]:
+        """Every type in the graph"""
+        return set(self._dependents)
+
+    def dependencies_of(self, dep_type) -> Tuple[Any, ...]:
+        """The types dep_type needs directly"""
+        return self._dependencies.get(dep_type, ())
+
+    def dependents_of(self, dep_type) -> Tuple[Any, ...]:
+        """The types that need dep_type directly"""
+        return self._dependents.get(dep_type, ())
+
+    def everything_depending_on(self, dep_type) -> Set[Any]:
+        """Every type that needs dep_type directly or indirectly"""
+        found: Set[Any] = set()
+        pending = list(self.dependents_of(dep_type))
+        while pending:
+            dependent = pending.pop()
+            if dependent not in found:
+                found.add(dependent)
+                pending.extend(self.dependents_of(dependent))
+        return found
+
+    def find_cycle(self) -> Optional[List[Any]]:
+        """
+        Returns the types making up a circular dependency (the first type
+        is repeated at the end) or None if there aren't any.
+        """
+        finished: Set[Any] = set()
+        for start in self._dependencies:
+            if start in finished:
+                continue
+            # Depth first with an explicit stack of (type, next dependency index)
+            path: List[Any] = [start]
+            on_path = {start}
+            positions = [0]
+            while path:
+                dependencies = self.dependencies_of(path[-1])
+                if positions[-1] == len(dependencies):
+                    finished.add(path[-1])
+                    on_path.discard(path.pop())
+                    positions.pop()
+                    continue
+                dependency = dependencies[positions[-1]]
+                positions[-1] += 1
+                if dependency in on_path:
+                    return path[path.index(dependency) :] + [dependency]
+                if dependency not in finished:
+                    path.append(dependency)
+                    on_path.add(dependency)
+                    positions.append(0)
+        return None
+
+    def topological_order(self) -> List[Any]:
+        """
+        Every type in the graph ordered so that each type comes after
+        everything it depends on.
+        :raises CircularDefinitionError: if the graph contains a cycle
+        """
+        waiting_on = {
+            dep_type: len(set(self.dependencies_of(dep_type)))
+            for dep_type in self._dependents
+        }
+        ready = deque(
+            dep_type for (dep_type, count) in waiting_on.items() if count == 0
+        )
+        order: List[Any] = []
+        while ready:
+            dep_type = ready.popleft()
+            order.append(dep_type)
+            for dependent in dict.fromkeys(self.dependents_of(dep_type)):
+                waiting_on[dependent] -= 1
+                if waiting_on[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) != len(waiting_on):
+            cycle = self.find_cycle() or []
+            raise CircularDefinitionError(cycle[0], set(cycle))
+        return order
@@ -0,0 +1,234 @@
+"""
+Hooks for observing what a container does.
+
+Subclass `ResolutionHooks`, override the events you're interested in and
+add an instance to a container with `Container.add_hooks`. Containers
+without hooks never call into this module: adding hooks swaps in an
+observed resolve function and a separate set of observed resolution plans
+so the unobserved path has nothing extra to check.
+
+>>> from lagom import Container
+>>> from tests.examples import SomeClass
+>>> class PrintingHooks(ResolutionHooks):
+...     def reflection_started(self, dep_type):
+...         print(f"building {dep_type.__name__}")
+>>> c = Container()
+>>> c.add_hooks(PrintingHooks())
+>>> c[SomeClass]
+building SomeClass
+<tests.examples.SomeClass object at ...>
+"""
+
+from time import perf_counter
+from typing import Any, Callable, List, Optional, Tuple
+
+from .definitions import SingletonWrapper
+from .interfaces import SpecialDepDefinition
+
+
+class ResolutionHooks:
+    """
+    Receives events from a container. Every method does nothing so only
+    the events that are needed have to be overridden. Timings are in
+    seconds. Hooks run on the resolving thread so should be quick and
+    shouldn't raise.
+    """
+
+    def resolve_started(self, dep_type: Any) -> None:
+        """A type has been asked for directly (not as part of another type)"""
+
+    def resolve_finished(
+        self, dep_type: Any, took: float, error: Optional[Exception]
+    ) -> None:
+        """The type asked for has been built or failed with error"""
+
+    def definition_used(self, dep_type: Any, definition: SpecialDepDefinition) -> None:
+        """A definition is about to be used to get dep_type"""
+
+    def definition_finished(
+        self,
+        dep_type: Any,
+        definition: SpecialDepDefinition,
+        took: float,
+        error: Optional[Exception],
+    ) -> None:
+        """The definition used to get dep_type has returned or failed with error"""
+
+    def reflection_started(self, dep_type: Any) -> None:
+        """dep_type is about to be built by reflection"""
+
+    def reflection_finished(
+        self, dep_type: Any, took: float, error: Optional[Exception]
+    ) -> None:
+        """A type built by reflection (including its arguments) is finished"""
+
+    def singleton_built(self, dep_type: Any, took: float) -> None:
+        """A singleton was built for the first time"""
+
+    def context_entered(self, dep_type: Any, took: float) -> None:
+        """The context manager for dep_type was entered by a ContextContainer"""
+
+    def context_exited(self, dep_type: Any, took: float) -> None:
+        """The context manager for dep_type was exited by a ContextContainer"""
+
+    def injection_started(self, func: Callable) -> None:
+        """The arguments of a function bound to the container are about to be injected"""
+
+    def injection_finished(
+        self, func: Callable, took: float, error: Optional[Exception]
+    ) -> None:
+        """The arguments of a bound function have been injected or failed with error"""
+
+
+class HookSet(ResolutionHooks):
+    """Passes every event on to each of the hooks in turn"""
+
+    hooks: Tuple[ResolutionHooks, ...]
+
+    def __init__(self, hooks: Tuple[ResolutionHooks, ...]):
+        self.hooks = hooks
+
+    # Sets of the same hooks are equal so they share observed plans
+    def __eq__(self, other):
+        return isinstance(other, HookSet) and other.hooks == self.hooks
+
+    def __hash__(self):
+        return hash(self.hooks)
+
+    def resolve_started(self, dep_type):
+        for hooks in self.hooks:
+            hooks.resolve_started(dep_type)
+
+    def resolve_finished(self, dep_type, took, error):
+        for hooks in self.hooks:
+            hooks.resolve_finished(dep_type, took, error)
+
+    def definition_used(self, dep_type, definition):
+        for hooks in self.hooks:
+            hooks.definition_used(dep_type, definition)
+
+    def definition_finished(self, dep_type, definition, took, error):
+        for hooks in self.hooks:
+            hooks.definition_finished(dep_type, definition, took, error)
+
+    def reflection_started(self, dep_type):
+        for hooks in self.hooks:
+            hooks.reflection_started(dep_type)
+
+    def reflection_finished(self, dep_type, took, error):
+        for hooks in self.hooks:
+            hooks.reflection_finished(dep_type, took, error)
+
+    def singleton_built(self, dep_type, took):
+        for hooks in self.hooks:
+            hooks.singleton_built(dep_type, took)
+
+    def context_entered(self, dep_type, took):
+        for hooks in self.hooks:
+            hooks.context_entered(dep_type, took)
+
+    def context_exited(self, dep_type, took):
+        for hooks in self.hooks:
+            hooks.context_exited(dep_type, took)
+
+    def injection_started(self, func):
+        for hooks in self.hooks:
+            hooks.injection_started(func)
+
+    def injection_finished(self, func, took, error):
+        for hooks in self.hooks:
+            hooks.injection_finished(func, took, error)
+
+
+def combine_hooks(hooks: List[ResolutionHooks]) -> Optional[ResolutionHooks]:
+    """A single hooks object for the list. None if the list is empty."""
+    if not hooks:
+        return None
+    if len(hooks) == 1:
+        return hooks[0]
+    return HookSet(tuple(hooks))
+
+
+def use_definition(
+    hooks: ResolutionHooks, container, dep_type, definition: SpecialDepDefinition
+):
+    """Gets an instance from the definition, reporting it and any singleton built"""
+    hooks.definition_used(dep_type, definition)
+    started = perf_counter()
+    try:
+        if isinstance(definition, SingletonWrapper) and not definition._has_instance:
+            instance = definition.get_instance(container)
+            hooks.singleton_built(dep_type, perf_counter() - started)
+        else:
+            instance = definition.get_instance(container)
+    except Exception as error:
+        hooks.definition_finished(dep_type, definition, perf_counter() - started, error)
+        raise
+    hooks.definition_finished(dep_type, definition, perf_counter() - started, None)
+    return instance
+
+
+def observed_definition_builder(
+    hooks: ResolutionHooks, dep_type, definition: SpecialDepDefinition
+):
+    """The build function for a definition step in an observed plan"""
+
+    def _build(container):
+        return use_definition(hooks, container, dep_type, definition)
+
+    return _build
+
+
+def observed_reflection_builder(hooks: ResolutionHooks, dep_type, build):
+    """Wraps the build function of a reflection step in an observed plan"""
+
+    def _build(container):
+        hooks.reflection_started(dep_type)
+        started = perf_counter()
+        try:
+            instance = build(container)
+        except Exception as error:
+            hooks.reflection_finished(dep_type, perf_counter() - started, error)
+            raise
+        hooks.reflection_finished(dep_type, perf_counter() - started, None)
+        return instance
+
+    return _build
+
+
+def observed_injection(hooks: ResolutionHooks, func: Callable, inject, *args):
+    """Injects the arguments of a bound function reporting it to the hooks"""
+    hooks.injection_started(func)
+    started = perf_counter()
+    try:
+        injected = inject(*args)
+    except Exception as error:
+        hooks.injection_finished(func, perf_counter() - started, error)
+        raise
+    hooks.injection_finished(func, perf_counter() - started, None)
+    return injected
+
+
+class ObservedContextManager:
+    """Reports how long a context manager took to enter and exit"""
+
+    __slots__ = ("hooks", "dep_type", "context_manager")
+
+    def __init__(self, hooks: ResolutionHooks, dep_type, context_manager):
+        self.hooks = hooks
+        self.dep_type = dep_type
+        self.context_manager = context_manager
+
+    def __enter__(self):
+        started = perf_counter()
+        try:
+            return self.context_manager.__enter__()
+        finally:
+            self.hooks.context_entered(self.dep_type, perf_counter() - started)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        started = perf_counter()
+        try:
+            return self.context_manager.__exit__(exc_type, exc_val, exc_tb)
+        finally:
+            self.hooks.context_exited(self.dep_type, perf_counter() - started)
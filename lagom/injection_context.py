@@ -27,19 +27,20 @@ class TemporaryInjectionContext:
         """Capture the base container and an optional per-enter update function."""
         self._base_container = container
         self._update_function = update_function
-        if update_function is not None:
-            self._build_temporary_container = lambda: update_function(
-                self._base_container
-            )
-        else:
-            self._build_temporary_container = lambda: self._base_container.clone()
 
     def __enter__(self) -> ReadableContainer:
-        return self._build_temporary_container()
+        if self._update_function is not None:
+            return self._update_function(self._base_container)
+        return self._base_container.clone()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         pass
 
+    @property
+    def tracer(self):
+        """The tracer of the base container. None unless tracing is switched on."""
+        return getattr(self._base_container, "_tracer", None)
+
     def rebind(self, new_container):
         """Return a copy of this context bound to a different base container."""
         return TemporaryInjectionContext(new_container, self._update_function)
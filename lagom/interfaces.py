@@ -16,8 +16,12 @@ from typing import (
     Dict,
     NoReturn,
     Protocol,
+    TYPE_CHECKING,
 )
 
+if TYPE_CHECKING:
+    from .metrics import ResolutionMetrics
+
 X = TypeVar("X")
 
 
@@ -176,11 +180,21 @@ class ContainerDebugInfo(ABC):
 
     @property
     @abstractmethod
-    def reflection_cache_overview(self) -> Dict[str, str]:
+    def reflection_cache_overview(self) -> Dict[str, Optional[int]]:
+        """
+        Statistics about the runtime reflection performed by lagom: the
+        size and maxsize of the cache along with its hits, misses,
+        evictions and entries dropped because the function was collected.
+        :return:
+        """
+        pass
+
+    @property
+    @abstractmethod
+    def resolution_metrics(self) -> Optional["ResolutionMetrics"]:
         """
-        A summary of what runtime reflection has been performed by lagom
-        This will be empty if types have only be loaded from explicit
-        definitions
+        The per type metrics recorded for the container or None if no
+        ResolutionMetrics hooks have been added.
         :return:
         """
         pass
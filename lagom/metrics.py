@@ -0,0 +1,301 @@
+"""
+Per type resolution metrics.
+
+`ResolutionMetrics` is a set of hooks that keeps counts and timings for
+every type a container resolves. Add it to a container and read it back
+directly or through `ContainerDebugInfo.resolution_metrics`:
+
+>>> from lagom import Container
+>>> from tests.examples import SomeClass
+>>> metrics = ResolutionMetrics()
+>>> c = Container()
+>>> c.add_hooks(metrics)
+>>> _ = c[SomeClass]
+>>> metrics.for_type(SomeClass).resolves
+1
+"""
+
+import threading
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .definitions import SingletonWrapper
+from .hooks import ResolutionHooks
+
+# The quantiles reported for the time taken to resolve and build each type
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class TypeMetrics:
+    """
+    The metrics for a single type. Percentiles are worked out from the
+    most recent resolutions (or builds) only.
+    """
+
+    __slots__ = (
+        "resolves",
+        "failures",
+        "defined",
+        "reflected",
+        "singleton_uses",
+        "singleton_builds",
+        "total_seconds",
+        "build_seconds",
+        "self_seconds",
+        "_recent",
+        "_recent_builds",
+    )
+
+    # Times the type was asked for directly
+    resolves: int
+    failures: int
+    # Times the type (directly or as an argument) came from a definition
+    defined: int
+    # Times the type (directly or as an argument) was built by reflection
+    reflected: int
+    singleton_uses: int
+    singleton_builds: int
+    # Time spent resolving the type when it was asked for directly
+    total_seconds: float
+    # Time spent building the type (directly or as an argument) from its
+    # definition or by reflection. Includes building its own arguments.
+    build_seconds: float
+    # Like build_seconds but without the time spent building the arguments
+    self_seconds: float
+    _recent: Deque[float]
+    _recent_builds: Deque[float]
+
+    def __init__(self, sample_size: int):
+        self.resolves = 0
+        self.failures = 0
+        self.defined = 0
+        self.reflected = 0
+        self.singleton_uses = 0
+        self.singleton_builds = 0
+        self.total_seconds = 0.0
+        self.build_seconds = 0.0
+        self.self_seconds = 0.0
+        self._recent = deque(maxlen=sample_size)
+        self._recent_builds = deque(maxlen=sample_size)
+
+    @property
+    def singleton_hit_rate(self) -> Optional[float]:
+        """The fraction of singleton uses that didn't have to build it"""
+        if not self.singleton_uses:
+            return None
+        return (self.singleton_uses - self.singleton_builds) / self.singleton_uses
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        """
+        The time in seconds that the given fraction of recent resolutions
+        were at least as fast as. None if the type hasn't been resolved.
+        """
+        return _percentile(self._recent, quantile)
+
+    def build_percentile(self, quantile: float) -> Optional[float]:
+        """
+        Like percentile but for the time taken to build the type wherever
+        it was needed. None if the type hasn't been built.
+        """
+        return _percentile(self._recent_builds, quantile)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "resolves": self.resolves,
+            "failures": self.failures,
+            "defined": self.defined,
+            "reflected": self.reflected,
+            "singleton_uses": self.singleton_uses,
+            "singleton_builds": self.singleton_builds,
+            "singleton_hit_rate": self.singleton_hit_rate,
+            "total_seconds": self.total_seconds,
+            "percentiles": {str(q): self.percentile(q) for q in QUANTILES},
+            "build_seconds": self.build_seconds,
+            "self_seconds": self.self_seconds,
+            "build_percentiles": {str(q): self.build_percentile(q) for q in QUANTILES},
+        }
+
+
+class ResolutionMetrics(ResolutionHooks):
+    """
+    Hooks that record metrics for every type. All the containers using the
+    hooks share the same metrics.
+    """
+
+    _sample_size: int
+    _types: Dict[Any, TypeMetrics]
+    _lock: threading.Lock
+    # The time spent building the arguments of each type being built,
+    # innermost last. A context variable so concurrent tasks each have one.
+    _building: ContextVar[Tuple[List[float], ...]]
+
+    def __init__(self, sample_size: int = 1000):
+        """
+        :param sample_size: how many recent timings to keep per type for percentiles
+        """
+        self._sample_size = sample_size
+        self._types = {}
+        self._lock = threading.Lock()
+        self._building = ContextVar("lagom_metrics_building", default=())
+
+    def for_type(self, dep_type) -> Optional[TypeMetrics]:
+        """The metrics for dep_type or None if nothing has been recorded"""
+        return self._types.get(dep_type)
+
+    @property
+    def types(self) -> List[Any]:
+        """Every type that has metrics"""
+        return list(self._types)
+
+    def reset(self):
+        """Forgets everything recorded so far"""
+        with self._lock:
+            self._types = {}
+
+    def slowest(self, count: int = 10) -> List[Tuple[Any, float]]:
+        """
+        The types that have taken the most time in total to build, not
+        counting the time spent building the types they needed
+        """
+        totals = [(t, m.self_seconds) for (t, m) in list(self._types.items())]
+        return sorted(totals, key=lambda item: item[1], reverse=True)[:count]
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """The metrics of every type keyed by the name of the type"""
+        return {
+            _type_name(dep_type): metrics.as_dict()
+            for (dep_type, metrics) in list(self._types.items())
+        }
+
+    def to_prometheus(self, prefix: str = "lagom") -> str:
+        """The metrics in the prometheus text exposition format"""
+        counters = [
+            ("resolves", "Times the type was resolved directly"),
+            ("failures", "Times resolving the type directly failed"),
+            ("defined", "Times the type came from a definition"),
+            ("reflected", "Times the type was built by reflection"),
+            ("singleton_uses", "Times a singleton definition was used"),
+            ("singleton_builds", "Times a singleton was built"),
+        ]
+        types = [
+            (_label(dep_type), metrics)
+            for (dep_type, metrics) in list(self._types.items())
+        ]
+        lines: List[str] = []
+        for name, description in counters:
+            metric = f"{prefix}_{name}_total"
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} counter")
+            for label, metrics in types:
+                lines.append(f'{metric}{{type="{label}"}} {getattr(metrics, name)}')
+        metric = f"{prefix}_resolve_seconds"
+        lines.append(f"# HELP {metric} Time taken to resolve the type directly")
+        lines.append(f"# TYPE {metric} summary")
+        for label, metrics in types:
+            for quantile in QUANTILES:
+                value = metrics.percentile(quantile)
+                if value is not None:
+                    lines.append(
+                        f'{metric}{{type="{label}",quantile="{quantile}"}} {value}'
+                    )
+            lines.append(f'{metric}_sum{{type="{label}"}} {metrics.total_seconds}')
+            lines.append(f'{metric}_count{{type="{label}"}} {metrics.resolves}')
+        metric = f"{prefix}_build_seconds"
+        lines.append(f"# HELP {metric} Time taken to build the type wherever needed")
+        lines.append(f"# TYPE {metric} summary")
+        for label, metrics in types:
+            for quantile in QUANTILES:
+                value = metrics.build_percentile(quantile)
+                if value is not None:
+                    lines.append(
+                        f'{metric}{{type="{label}",quantile="{quantile}"}} {value}'
+                    )
+            builds = metrics.defined + metrics.reflected
+            lines.append(f'{metric}_sum{{type="{label}"}} {metrics.build_seconds}')
+            lines.append(f'{metric}_count{{type="{label}"}} {builds}')
+        metric = f"{prefix}_build_self_seconds_total"
+        lines.append(
+            f"# HELP {metric} Time taken to build the type without its arguments"
+        )
+        lines.append(f"# TYPE {metric} counter")
+        for label, metrics in types:
+            lines.append(f'{metric}{{type="{label}"}} {metrics.self_seconds}')
+        return "\n".join(lines) + "\n"
+
+    def resolve_finished(self, dep_type, took, error):
+        with self._lock:
+            metrics = self._metrics_for(dep_type)
+            metrics.resolves += 1
+            metrics.total_seconds += took
+            metrics._recent.append(took)
+            if error is not None:
+                metrics.failures += 1
+
+    def definition_used(self, dep_type, definition):
+        with self._lock:
+            metrics = self._metrics_for(dep_type)
+            metrics.defined += 1
+            if isinstance(definition, SingletonWrapper):
+                metrics.singleton_uses += 1
+        self._build_started()
+
+    def definition_finished(self, dep_type, definition, took, error):
+        self._build_finished(dep_type, took, reflected=False)
+
+    def reflection_started(self, dep_type):
+        self._build_started()
+
+    def reflection_finished(self, dep_type, took, error):
+        self._build_finished(dep_type, took, reflected=True)
+
+    def singleton_built(self, dep_type, took):
+        with self._lock:
+            self._metrics_for(dep_type).singleton_builds += 1
+
+    def _build_started(self):
+        self._building.set(self._building.get() + ([0.0],))
+
+    def _build_finished(self, dep_type, took: float, reflected: bool):
+        building = self._building.get()
+        arguments_took = 0.0
+        if building:
+            arguments_took = building[-1][0]
+            building = building[:-1]
+            self._building.set(building)
+            if building:
+                # The type was an argument of the one being built
+                building[-1][0] += took
+        with self._lock:
+            metrics = self._metrics_for(dep_type)
+            if reflected:
+                metrics.reflected += 1
+            metrics.build_seconds += took
+            metrics.self_seconds += max(0.0, took - arguments_took)
+            metrics._recent_builds.append(took)
+
+    def _metrics_for(self, dep_type) -> TypeMetrics:
+        metrics = self._types.get(dep_type)
+        if metrics is None:
+            metrics = TypeMetrics(self._sample_size)
+            self._types[dep_type] = metrics
+        return metrics
+
+
+def _percentile(timings: Deque[float], quantile: float) -> Optional[float]:
+    recent = sorted(timings)
+    if not recent:
+        return None
+    index = min(len(recent) - 1, max(0, int(quantile * len(recent) + 0.5) - 1))
+    return recent[index]
+
+
+def _type_name(dep_type) -> str:
+    if isinstance(dep_type, type):
+        return f"{dep_type.__module__}.{dep_type.__qualname__}"
+    return str(dep_type)
+
+
+def _label(dep_type) -> str:
+    name = _type_name(dep_type)
+    return name.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,697 @@
+"""
+Precompiled resolution plans.
+
+When the container has to build a type by reflection it makes the same
+decisions every time: which definition to use for each argument, whether
+a type is optional, whether it can be built at all. A plan records those
+decisions once so that later resolutions only call constructors.
+"""
+
+import asyncio
+import logging
+import weakref
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
+
+from .definitions import UnresolvableTypeDefinition
+from .exceptions import (
+    UnresolvableType,
+    RecursiveDefinitionError,
+    TypeOnlyAvailableAsAwaitable,
+)
+from .hooks import use_definition
+from .interfaces import SpecialDepDefinition, ReadableContainer
+
+Builder = Callable[[ReadableContainer], Any]
+
+# Formatted by the logger so nothing is formatted unless the warning is written
+UNDEFINED_DEPENDENCY_MESSAGE = "Undefined dependency. Using reflection for %s"
+
+
+class PlanCache:
+    """
+    Resolution plans shared by a container and all of its clones.
+
+    Plans bind definitions from the root container directly. Any type that
+    gets defined in a clone is marked as overridden and plans look these
+    types up in the resolving container instead. This means clones made
+    for a single request can reuse every plan without recompiling.
+
+    Every plan records the types it consulted. When one of those types gets
+    a new definition only the plans that consulted it are thrown away.
+
+    Plans reference the types they build so each set of plans is capped.
+    Once a set is full the oldest plans are thrown away (and replanned if
+    they are needed again) so types that are no longer used can be freed.
+    """
+
+    __slots__ = (
+        "max_plans",
+        "overridden",
+        "version",
+        "definitions_version",
+        "backend",
+        "bound_types",
+        "changed_at",
+        "_cleared_at",
+        "_dependents",
+        "_plans_by_logger",
+        "__weakref__",
+    )
+
+    # The most plans kept in each set of plans. None for no limit.
+    max_plans: Optional[int]
+    overridden: Set[Any]
+    # Bumped every time any plan is thrown away
+    version: int
+    # Bumped when definitions that clones have already copied change
+    definitions_version: int
+    # Optionally turns a compiled reflection plan into a faster builder
+    backend: Optional[Callable[["ReflectionStep"], Builder]]
+    # Types injected by bound functions. Used as an ordered set.
+    # Capped like the plans with the oldest dropped first.
+    bound_types: Dict[Any, None]
+    # The version at which each type last changed
+    changed_at: Dict[Any, int]
+    # Plans compiled before this version are never stored. Set when every
+    # plan is thrown away or changed_at is emptied to stop it growing.
+    _cleared_at: int
+    # The planned types that consulted each type
+    _dependents: Dict[Any, Set[Any]]
+    # Keyed by the undefined dependency logger and hooks the plans report to.
+    # Only kept whilst a container is using them so hooks that have been
+    # removed everywhere (and anything they recorded) can be freed.
+    _plans_by_logger: (
+        "weakref.WeakValueDictionary[Tuple[Optional[logging.Logger], Any], _PlanSet]"
+    )
+
+    def __init__(self, max_plans: Optional[int] = None):
+        """
+        :param max_plans: The most plans to keep for each logger and hooks. None means no limit.
+        """
+        self.max_plans = max_plans
+        self.overridden = set()
+        self.version = 0
+        self.definitions_version = 0
+        self.backend = None
+        self.bound_types = {}
+        self.changed_at = {}
+        self._cleared_at = 0
+        self._dependents = {}
+        self._plans_by_logger = weakref.WeakValueDictionary()
+
+    def plans_for(
+        self, logger: Optional[logging.Logger], hooks: Any = None
+    ) -> Dict[Any, "PlanNode"]:
+        """
+        The plans for containers using the given undefined dependency logger
+        and hooks. The same dictionary is returned for as long as any
+        container holds on to it.
+        """
+        key = (logger, hooks)
+        plans = self._plans_by_logger.get(key)
+        if plans is None:
+            plans = _PlanSet()
+            self._plans_by_logger[key] = plans
+        return plans
+
+    def store(
+        self, plans: Dict[Any, "PlanNode"], dep_type, plan: "PlanNode", version: int
+    ):
+        """
+        Stores a plan whose compilation started at the given version unless
+        something it consulted has changed since.
+        """
+        if version != self.version and (
+            self._cleared_at > version
+            or any(self.changed_at.get(t, 0) > version for t in plan.depends_on)
+        ):
+            return
+        plans[dep_type] = plan
+        for consulted in plan.depends_on:
+            self._dependents.setdefault(consulted, set()).add(dep_type)
+        if self.max_plans is not None and len(plans) > self.max_plans:
+            self._evict_oldest(plans)
+
+    def add_bound_types(self, dep_types: Iterable[Any]):
+        """Records types injected by a bound function"""
+        self.bound_types.update((dep_type, None) for dep_type in dep_types)
+        if self.max_plans is not None:
+            while len(self.bound_types) > self.max_plans:
+                del self.bound_types[next(iter(self.bound_types))]
+
+    def mark_overridden(self, dep_type):
+        """Records that a clone has its own definition of dep_type"""
+        if dep_type not in self.overridden:
+            self.overridden.add(dep_type)
+            self.invalidate_dependents(dep_type)
+
+    def invalidate_dependents(self, dep_type):
+        """Throws away every plan that consulted dep_type"""
+        self.version += 1
+        self.changed_at[dep_type] = self.version
+        if self.max_plans is not None and len(self.changed_at) > self.max_plans:
+            # Only plans compiled whilst a type changed need these
+            self.changed_at.clear()
+            self._cleared_at = self.version
+        dependents = self._dependents.pop(dep_type, None)
+        if dependents:
+            for plans in list(self._plans_by_logger.values()):
+                for planned_type in dependents:
+                    plans.pop(planned_type, None)
+
+    def invalidate(self):
+        """Throws away every plan"""
+        self.version += 1
+        self._cleared_at = self.version
+        self._dependents.clear()
+        for plans in list(self._plans_by_logger.values()):
+            plans.clear()
+
+    def _evict_oldest(self, plans: Dict[Any, "PlanNode"]):
+        """
+        Throws away the plan that has been in the set the longest. Oldest
+        rather than least recently used so finding a plan stays a single
+        dictionary lookup.
+        """
+        dep_type = next(iter(plans))
+        plan = plans.pop(dep_type)
+        if any(dep_type in other for other in list(self._plans_by_logger.values())):
+            # Another set still has a plan that has to be invalidated
+            return
+        for consulted in plan.depends_on:
+            dependents = self._dependents.get(consulted)
+            if dependents is not None:
+                dependents.discard(dep_type)
+                if not dependents:
+                    del self._dependents[consulted]
+
+
+class _PlanSet(Dict[Any, "PlanNode"]):
+    """A dictionary of plans. Unlike a plain dict it can be weakly referenced."""
+
+
+class PlanNode:
+    """
+    A single step in a resolution plan. Every node knows how to build its
+    type given the container doing the resolving and which types it consulted
+    the definitions of whilst being compiled.
+    """
+
+    __slots__ = ("dep_type", "build", "depends_on", "always_fails", "awaits")
+
+    dep_type: Any
+    build: Builder
+    depends_on: FrozenSet[Any]
+    # Building is known to raise UnresolvableType without doing anything
+    # else first (calling definitions, constructors or logging).
+    always_fails: bool
+    # Building might need an async definition awaiting. Only matters to
+    # build_async. Plans that never await are built by calling build.
+    awaits: bool
+
+    # If resolve is called with suppress_error then failures from this node are swallowed
+    suppressible: bool = True
+
+    def __init__(
+        self,
+        dep_type,
+        build: Builder,
+        depends_on: FrozenSet[Any],
+        always_fails: bool = False,
+        awaits: bool = False,
+    ):
+        self.dep_type = dep_type
+        self.build = build
+        self.depends_on = depends_on
+        self.always_fails = always_fails
+        self.awaits = awaits
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.dep_type}>"
+
+
+class DefinitionStep(PlanNode):
+    """The type has a definition so the definition is used directly"""
+
+    __slots__ = ("definition",)
+
+    definition: SpecialDepDefinition
+
+    def __init__(self, dep_type, definition: SpecialDepDefinition):
+        self.definition = definition
+        super().__init__(
+            dep_type,
+            definition.get_instance,
+            frozenset([dep_type]),
+            awaits=only_available_as_awaitable(definition),
+        )
+
+
+class LiveStep(PlanNode):
+    """
+    The type is overridden by at least one clone so its definition is
+    looked up in the resolving container every time.
+    """
+
+    __slots__ = ("optional", "hooks")
+
+    optional: bool
+    # The hooks definitions are reported to in observed plans
+    hooks: Any
+
+    def __init__(self, dep_type, optional: bool = False, hooks: Any = None):
+        self.optional = optional
+        self.hooks = hooks
+        # The definition could be async in any clone
+        super().__init__(
+            dep_type,
+            _live_builder(dep_type, optional, hooks),
+            frozenset(),
+            awaits=True,
+        )
+
+
+class ReflectionStep(PlanNode):
+    """
+    The type is built by calling its constructor with planned arguments.
+    If any argument can never be built then neither can this type so none
+    of the other arguments are built either.
+    """
+
+    __slots__ = ("arguments", "logger", "depth")
+
+    arguments: List[Tuple[str, PlanNode]]
+    logger: Optional[logging.Logger]
+    # The number of reflected types in the longest chain this plan builds
+    depth: int
+
+    def __init__(
+        self,
+        dep_type,
+        arguments: List[Tuple[str, PlanNode]],
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.arguments = arguments
+        self.logger = logger
+        self.depth = 1 + max(
+            (node.depth for (_, node) in arguments if isinstance(node, ReflectionStep)),
+            default=0,
+        )
+        depends_on = frozenset([dep_type]).union(
+            *(node.depends_on for (_, node) in arguments)
+        )
+        always_fails = logger is None and any(
+            node.always_fails for (_, node) in arguments
+        )
+        super().__init__(dep_type, _nothing, depends_on, always_fails)
+        self.awaits = any(node.awaits for (_, node) in self.arguments_to_build())
+        if self.depth <= MAX_NESTED_DEPTH:
+            build = _reflection_builder(dep_type, self.arguments_to_build())
+            self.build = _logged(build, dep_type, logger)
+        else:
+            self.build = _flattened_builder(self)
+
+    def arguments_to_build(self) -> List[Tuple[str, PlanNode]]:
+        """
+        The arguments that are actually built. When the type can never be
+        built only the argument that fails is attempted.
+        """
+        if self.always_fails:
+            return [next(arg for arg in self.arguments if arg[1].always_fails)]
+        return self.arguments
+
+
+class DefaultStep(PlanNode):
+    """The type can't be built but the argument has a default to use instead"""
+
+    __slots__ = ("default",)
+
+    default: Any
+
+    def __init__(self, dep_type, default, logger: Optional[logging.Logger] = None):
+        self.default = default
+
+        def _build(_container):
+            return default
+
+        super().__init__(
+            dep_type, _logged(_build, dep_type, logger), frozenset([dep_type])
+        )
+
+
+class UnresolvableStep(PlanNode):
+    """The type can never be built by reflection"""
+
+    __slots__ = ()
+
+    def __init__(self, dep_type, logger: Optional[logging.Logger] = None):
+        def _build(_container):
+            raise UnresolvableType(dep_type) from UnresolvableType(dep_type)
+
+        super().__init__(
+            dep_type,
+            _logged(_build, dep_type, logger),
+            frozenset([dep_type]),
+            always_fails=logger is None,
+        )
+
+
+class OptionalStep(PlanNode):
+    """
+    Optional[T] is built as T but returns None instead of failing when T
+    can't be built by reflection.
+    """
+
+    __slots__ = ("inner",)
+
+    inner: PlanNode
+    suppressible = False
+
+    def __init__(self, dep_type, inner: PlanNode):
+        self.inner = inner
+        depends_on = frozenset([dep_type]).union(inner.depends_on)
+        awaits = inner.awaits and not inner.always_fails
+        if isinstance(inner, DefinitionStep):
+            # Errors raised by definitions are never suppressed
+            super().__init__(dep_type, inner.build, depends_on, awaits=awaits)
+        elif inner.always_fails:
+            super().__init__(dep_type, _nothing, depends_on)
+        elif isinstance(inner, LiveStep):
+            inner = LiveStep(inner.dep_type, optional=True, hooks=inner.hooks)
+            super().__init__(dep_type, inner.build, depends_on, awaits=awaits)
+        else:
+            super().__init__(
+                dep_type, _suppressed(inner.build), depends_on, awaits=awaits
+            )
+
+
+def _live_builder(dep_type, optional: bool, hooks: Any) -> Builder:
+    def _build(container):
+        definition = container.get_definition(dep_type)
+        if definition:
+            if hooks is not None:
+                return use_definition(hooks, container, dep_type, definition)
+            return definition.get_instance(container)
+        plan = container._plan_for(dep_type)
+        if optional:
+            try:
+                return plan.build(container)
+            except UnresolvableType:
+                return None
+        return plan.build(container)
+
+    return _build
+
+
+# Plans that reflect more types deep than this are built by a loop
+# instead of nested calls so they can't exhaust the interpreter's stack.
+MAX_NESTED_DEPTH = 50
+
+
+def _reflection_builder(dep_type: Type, arguments: List[Tuple[str, PlanNode]]):
+    steps = tuple((key, node.build) for (key, node) in arguments)
+
+    def _build(container):
+        try:
+            kwargs = {}
+            for key, build_argument in steps:
+                value = build_argument(container)
+                if value is not None:
+                    kwargs[key] = value
+            try:
+                return dep_type(**kwargs)
+            except TypeError as type_error:
+                raise UnresolvableType(dep_type) from type_error
+        except UnresolvableType as inner_error:
+            raise UnresolvableType(dep_type) from inner_error
+        except RecursionError as recursion_error:
+            raise RecursiveDefinitionError(dep_type) from recursion_error
+
+    return _build
+
+
+# Instructions used by flattened builders
+_CALL = 0
+_CONSTRUCT = 1
+_LOG = 2
+
+# Where a failure happened: the reflected types being built (outermost first)
+# and whether the failure came from calling a constructor.
+FailurePosition = Tuple[Tuple[Any, ...], bool]
+
+# The reflected types being built as a linked list: (outer, dep_type).
+# Nested plans share their parent's link instead of copying a tuple.
+_Building = Optional[Tuple[Any, Any]]
+
+
+def _flattened_builder(plan: ReflectionStep) -> Builder:
+    """
+    Builds a deep plan by looping over a flat list of instructions rather
+    than making a nested call for each level of the dependency graph.
+    The instructions are only worked out the first time the plan itself is
+    built. Plans that are only ever built as part of a bigger plan never
+    need their own.
+    """
+    instructions: List[Tuple[int, Any, Any, _Building]] = []
+
+    def _build(container):
+        if not instructions:
+            _add_instructions(plan, instructions)
+        values: List[Any] = []
+        instruction = instructions[0]
+        try:
+            for instruction in instructions:
+                kind, target, keys, _ = instruction
+                if kind == _CALL:
+                    values.append(target(container))
+                elif kind == _CONSTRUCT:
+                    kwargs = {}
+                    if keys:
+                        arguments = values[-len(keys) :]
+                        del values[-len(keys) :]
+                        for key, value in zip(keys, arguments):
+                            if value is not None:
+                                kwargs[key] = value
+                    values.append(target(**kwargs))
+                else:
+                    target.warning(
+                        UNDEFINED_DEPENDENCY_MESSAGE,
+                        keys,
+                        extra={"undefined_dependency": keys},
+                    )
+            return values[0]
+        except Exception as error:
+            _, _, _, building = instruction
+            position = (_unlink(building), instruction[0] == _CONSTRUCT)
+            raise translate_failure(position, error)
+
+    return _build
+
+
+def _add_instructions(
+    plan: ReflectionStep, instructions: List[Tuple[int, Any, Any, _Building]]
+):
+    """Appends the instructions to build plan (works depth first without recursing)"""
+    # Each entry is either a plan to expand or a finished instruction
+    pending: List[Any] = [(plan, None)]
+    while pending:
+        item = pending.pop()
+        if len(item) == 4:
+            instructions.append(item)
+            continue
+        node, outer = item
+        inner = (outer, node.dep_type)
+        arguments = node.arguments_to_build()
+        keys = tuple(key for (key, _) in arguments)
+        # The stack is last in first out so everything is pushed in reverse
+        pending.append((_CONSTRUCT, node.dep_type, keys, inner))
+        for _, argument in reversed(arguments):
+            if isinstance(argument, ReflectionStep):
+                pending.append((argument, inner))
+            else:
+                pending.append((_CALL, argument.build, None, inner))
+        if node.logger is not None:
+            pending.append((_LOG, node.logger, node.dep_type, outer))
+
+
+def _unlink(building: _Building) -> Tuple[Any, ...]:
+    dep_types = []
+    while building is not None:
+        building, dep_type = building
+        dep_types.append(dep_type)
+    return tuple(reversed(dep_types))
+
+
+def translate_failure(position: FailurePosition, error: Exception) -> Exception:
+    """
+    Turns an error raised whilst building into the error that would be
+    raised if each reflected type had been built by a separate call.
+    Every reflected type wraps the error from the level below it.
+    """
+    building, constructing = position
+    if not building:
+        return error
+    if isinstance(error, RecursionError):
+        recursive_error = RecursiveDefinitionError(building[-1])
+        recursive_error.__cause__ = error
+        return recursive_error
+    if isinstance(error, TypeError) and constructing:
+        inner_error = UnresolvableType(building[-1])
+        inner_error.__cause__ = error
+        error = inner_error
+    if not isinstance(error, UnresolvableType):
+        return error
+    for dep_type in reversed(building):
+        outer_error = UnresolvableType(dep_type)
+        outer_error.__cause__ = error
+        error = outer_error
+    return error
+
+
+def only_available_as_awaitable(definition: SpecialDepDefinition) -> bool:
+    """Whether the definition is the placeholder for T when only Awaitable[T] is defined"""
+    return isinstance(definition, UnresolvableTypeDefinition) and isinstance(
+        definition._msg_or_exception, TypeOnlyAvailableAsAwaitable
+    )
+
+
+async def get_instance_async(
+    container: Any, dep_type, definition: SpecialDepDefinition
+):
+    """
+    Gets an instance from the definition. Types only available as
+    Awaitable[T] are awaited rather than raising an error.
+    """
+    if only_available_as_awaitable(definition):
+        async_definition = container.get_definition(Awaitable[dep_type])  # type: ignore
+        if async_definition is not None:
+            return await async_definition.get_instance(container)
+    return definition.get_instance(container)
+
+
+async def build_async(plan: PlanNode, container: Any):
+    """
+    Builds the plan awaiting any types only available as Awaitable[T].
+    The arguments of a reflected type that need awaiting are built
+    concurrently. Parts of the plan that never await are built as normal.
+    """
+    if not plan.awaits:
+        return plan.build(container)
+    if isinstance(plan, DefinitionStep):
+        return await get_instance_async(container, plan.dep_type, plan.definition)
+    if isinstance(plan, LiveStep):
+        return await _build_live_async(container, plan.dep_type, plan.optional)
+    if isinstance(plan, OptionalStep):
+        inner = plan.inner
+        if isinstance(inner, DefinitionStep):
+            return await build_async(inner, container)
+        if isinstance(inner, LiveStep):
+            return await _build_live_async(container, inner.dep_type, optional=True)
+        try:
+            return await build_async(inner, container)
+        except UnresolvableType:
+            return None
+    assert isinstance(plan, ReflectionStep)
+    return await _build_reflection_async(plan, container)
+
+
+async def _build_live_async(container: Any, dep_type, optional: bool):
+    definition = container.get_definition(dep_type)
+    if definition:
+        return await get_instance_async(container, dep_type, definition)
+    plan = container._plan_for(dep_type)
+    if optional:
+        try:
+            return await build_async(plan, container)
+        except UnresolvableType:
+            return None
+    return await build_async(plan, container)
+
+
+async def _build_reflection_async(plan: ReflectionStep, container: Any):
+    dep_type = plan.dep_type
+    if plan.logger is not None:
+        plan.logger.warning(
+            UNDEFINED_DEPENDENCY_MESSAGE,
+            dep_type,
+            extra={"undefined_dependency": dep_type},
+        )
+    arguments = plan.arguments_to_build()
+    try:
+        values: List[Any] = []
+        awaiting: List[int] = []
+        for index, (_, argument) in enumerate(arguments):
+            if argument.awaits:
+                awaiting.append(index)
+                values.append(None)
+            else:
+                values.append(argument.build(container))
+        if len(awaiting) == 1:
+            values[awaiting[0]] = await build_async(
+                arguments[awaiting[0]][1], container
+            )
+        elif awaiting:
+            # Every argument is allowed to finish so none are left running
+            # when one fails. The first failure in argument order is raised.
+            results = await asyncio.gather(
+                *(build_async(arguments[index][1], container) for index in awaiting),
+                return_exceptions=True,
+            )
+            for index, result in zip(awaiting, results):
+                if isinstance(result, BaseException):
+                    raise result
+                values[index] = result
+        kwargs = {
+            key: value
+            for ((key, _), value) in zip(arguments, values)
+            if value is not None
+        }
+        try:
+            return dep_type(**kwargs)
+        except TypeError as type_error:
+            raise UnresolvableType(dep_type) from type_error
+    except UnresolvableType as inner_error:
+        raise UnresolvableType(dep_type) from inner_error
+    except RecursionError as recursion_error:
+        raise RecursiveDefinitionError(dep_type) from recursion_error
+
+
+def _nothing(_container):
+    return None
+
+
+def _suppressed(build: Builder) -> Builder:
+    def _build(container):
+        try:
+            return build(container)
+        except UnresolvableType:
+            return None
+
+    return _build
+
+
+def _logged(build: Builder, dep_type, logger: Optional[logging.Logger]) -> Builder:
+    if logger is None:
+        return build
+
+    def _build(container):
+        logger.warning(
+            UNDEFINED_DEPENDENCY_MESSAGE,
+            dep_type,
+            extra={"undefined_dependency": dep_type},
+        )
+        return build(container)
+
+    return _build
@@ -0,0 +1,251 @@
+"""
+Records which types built which whilst resolving.
+
+A CPU profiler only shows lagom's own functions. Inside `profiling` every
+resolve and bound function call made through the container is recorded as a
+tree of the types built, how each one was built (a definition such as
+`Singleton` or `Alias`, or by reflection) and how long it took. The tree
+can be exported for speedscope (https://www.speedscope.app) or as
+collapsed stacks for flamegraph tools:
+
+>>> from lagom import Container
+>>> from tests.examples import SomeClass
+>>> c = Container()
+>>> with profiling(c) as profile:
+...     _ = c[SomeClass]
+>>> [node.name for node in profile.roots]
+['tests.examples.SomeClass [reflection]']
+"""
+
+import inspect
+import json
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .container import Container
+from .definitions import Alias, SingletonWrapper
+from .hooks import ResolutionHooks
+from .interfaces import SpecialDepDefinition
+
+_CALL = "call"
+_RESOLVE = "resolve"
+_REFLECTION = "reflection"
+
+
+class ResolutionNode:
+    """A single step in the construction tree"""
+
+    __slots__ = ("built", "kind", "started", "took", "error", "children", "_merged")
+
+    # The type (or for calls the bound function) this step built
+    built: Any
+    # How it was built: a definition class, reflection, resolve or call
+    kind: str
+    # time.perf_counter() when the step started
+    started: float
+    took: float
+    error: Optional[Exception]
+    children: List["ResolutionNode"]
+    # The started event that was folded into this node
+    _merged: Optional[str]
+
+    def __init__(self, built, kind: str):
+        self.built = built
+        self.kind = kind
+        self.started = perf_counter()
+        self.took = 0.0
+        self.error = None
+        self.children = []
+        self._merged = None
+
+    @property
+    def name(self) -> str:
+        return f"{_name_of(self.built)} [{self.kind}]"
+
+    @property
+    def self_time(self) -> float:
+        """The time taken by this step without its children"""
+        return max(0.0, self.took - sum(child.took for child in self.children))
+
+    def __repr__(self):
+        return f"<ResolutionNode {self.name} {self.took:.6f}s>"
+
+
+class ResolutionProfile(ResolutionHooks):
+    """
+    Hooks that build a tree of every resolution. Each thread records its
+    own stack of unfinished steps so resolutions on different threads
+    become separate roots.
+    """
+
+    roots: List[ResolutionNode]
+    _local: threading.local
+    _lock: threading.Lock
+
+    def __init__(self):
+        self.roots = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def to_collapsed(self) -> str:
+        """
+        The profile as collapsed stacks (one line per distinct stack with
+        its total self time in microseconds) for flamegraph.pl and friends.
+        """
+        totals: Dict[str, int] = {}
+        for stack, node in self._walk():
+            line = ";".join(_collapsed_name(n) for n in stack)
+            totals[line] = totals.get(line, 0) + round(node.self_time * 1_000_000)
+        return "".join(f"{line} {total}\n" for (line, total) in totals.items())
+
+    def to_speedscope(self, name: str = "lagom resolution") -> Dict[str, Any]:
+        """The profile in speedscope's file format as a json compatible dict"""
+        frames: List[Dict[str, str]] = []
+        frame_index: Dict[str, int] = {}
+        samples: List[List[int]] = []
+        weights: List[float] = []
+        for stack, node in self._walk():
+            sample = []
+            for step in stack:
+                if step.name not in frame_index:
+                    frame_index[step.name] = len(frames)
+                    frames.append({"name": step.name})
+                sample.append(frame_index[step.name])
+            samples.append(sample)
+            weights.append(node.self_time)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "lagom",
+            "name": name,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+    def to_speedscope_json(self, name: str = "lagom resolution") -> str:
+        return json.dumps(self.to_speedscope(name))
+
+    def resolve_started(self, dep_type):
+        self._push(ResolutionNode(dep_type, _RESOLVE))
+
+    def resolve_finished(self, dep_type, took, error):
+        self._pop(took, error)
+
+    def definition_used(self, dep_type, definition):
+        self._start(dep_type, _definition_kind(definition), "definition")
+
+    def definition_finished(self, dep_type, definition, took, error):
+        self._finish(dep_type, took, error, "definition")
+
+    def reflection_started(self, dep_type):
+        self._start(dep_type, _REFLECTION, "reflection")
+
+    def reflection_finished(self, dep_type, took, error):
+        self._finish(dep_type, took, error, "reflection")
+
+    def injection_started(self, func):
+        self._push(ResolutionNode(func, _CALL))
+
+    def injection_finished(self, func, took, error):
+        self._pop(took, error)
+
+    def _start(self, built, kind: str, event: str):
+        stack = self._stack()
+        top = stack[-1] if stack else None
+        if (
+            top is not None
+            and top.kind == _RESOLVE
+            and top.built is built
+            and not top.children
+        ):
+            # The resolve asked for directly is the step itself
+            top.kind = kind
+            top._merged = event
+        else:
+            self._push(ResolutionNode(built, kind))
+
+    def _finish(self, built, took: float, error: Optional[Exception], event: str):
+        stack = self._stack()
+        top = stack[-1] if stack else None
+        if top is not None and top._merged == event and top.built is built:
+            top._merged = None
+        else:
+            self._pop(took, error)
+
+    def _stack(self) -> List[ResolutionNode]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _push(self, node: ResolutionNode):
+        stack = self._stack()
+        if stack:
+            stack[-1].children.append(node)
+        else:
+            self._add_root(node)
+        stack.append(node)
+
+    def _add_root(self, node: ResolutionNode):
+        with self._lock:
+            self.roots.append(node)
+
+    def _pop(self, took: float, error: Optional[Exception]):
+        stack = self._stack()
+        if stack:
+            node = stack.pop()
+            node.took = took
+            node.error = error
+
+    def _walk(self) -> Iterator[Tuple[List[ResolutionNode], ResolutionNode]]:
+        """Every node along with the stack of nodes leading to it"""
+        pending: List[List[ResolutionNode]] = [[root] for root in self.roots]
+        pending.reverse()
+        while pending:
+            stack = pending.pop()
+            node = stack[-1]
+            yield stack, node
+            pending.extend(stack + [child] for child in reversed(node.children))
+
+
+@contextmanager
+def profiling(container: Container) -> Iterator[ResolutionProfile]:
+    """
+    Records every resolution made through the container (and anything
+    cloned from it whilst the block runs) until the end of the with block.
+    """
+    profile = ResolutionProfile()
+    container.add_hooks(profile)
+    try:
+        yield profile
+    finally:
+        container.remove_hooks(profile)
+
+
+def _definition_kind(definition: SpecialDepDefinition) -> str:
+    if isinstance(definition, SingletonWrapper):
+        return "Singleton"
+    if isinstance(definition, Alias):
+        return "Alias"
+    return type(definition).__name__
+
+
+def _name_of(built) -> str:
+    if inspect.isclass(built) or inspect.isfunction(built) or inspect.ismethod(built):
+        return f"{built.__module__}.{built.__qualname__}"
+    return str(built)
+
+
+def _collapsed_name(node: ResolutionNode) -> str:
+    return node.name.replace(";", ":")
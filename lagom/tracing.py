@@ -0,0 +1,355 @@
+"""
+Sampled tracing of bound function calls.
+
+Recording every resolution costs too much for a busy service. A
+`ResolutionTracer` decides once per call of a function bound with
+`partial` or `magic_partial` whether to trace it. Sampled calls (one in
+every `sample_every`) are resolved with hooks attached to the per call
+container so the whole tree of types built is recorded. Calls that aren't
+sampled cost a counter increment plus, when `slower_than` is set, timing
+the call so that slow calls can still be reported (without their tree).
+Finished traces are passed to a sink:
+
+>>> from lagom import Container, injectable
+>>> from tests.examples import SomeClass
+>>> c = Container()
+>>> sink = RingBufferSink()
+>>> c.use_tracer(ResolutionTracer(sink, sample_every=1))
+>>> def handler(thing: SomeClass = injectable):
+...     pass
+>>> c.partial(handler)()
+>>> [span.name for span in sink.traces[0].spans()]
+['lagom.tracing.handler [call]', 'lagom.tracing.handler [injection]', 'tests.examples.SomeClass [reflection]']
+"""
+
+import itertools
+import logging
+import weakref
+from collections import deque
+from time import perf_counter, time
+from typing import Any, Callable, Deque, Iterator, List, Optional, Tuple
+
+from .container import Container
+from .profiling import ResolutionNode, ResolutionProfile
+
+_CALL = "call"
+_INJECTION = "injection"
+
+
+class Span:
+    """A step of a trace in the shape used by OpenTelemetry style exporters"""
+
+    __slots__ = (
+        "name",
+        "kind",
+        "built",
+        "span_id",
+        "parent_id",
+        "start_time",
+        "end_time",
+        "error",
+    )
+
+    name: str
+    kind: str
+    built: Any
+    # The position of the span in its trace. The call is always 0.
+    span_id: int
+    parent_id: Optional[int]
+    # Seconds since the epoch
+    start_time: float
+    end_time: float
+    error: Optional[Exception]
+
+    def __init__(
+        self,
+        node: ResolutionNode,
+        span_id: int,
+        parent_id: Optional[int],
+        start_time: float,
+    ):
+        self.name = node.name
+        self.kind = node.kind
+        self.built = node.built
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.start_time = start_time
+        self.end_time = start_time + node.took
+        self.error = node.error
+
+    def __repr__(self):
+        return f"<Span {self.span_id} {self.name}>"
+
+
+class ResolutionTrace:
+    """
+    A single traced call. The root is the call itself. Sampled calls have
+    the injection of the arguments (and everything built for them) as
+    children. Calls only reported for being slow have no children.
+    """
+
+    __slots__ = ("root", "sampled", "started_at")
+
+    root: ResolutionNode
+    sampled: bool
+    # Seconds since the epoch
+    started_at: float
+
+    def __init__(self, root: ResolutionNode, sampled: bool, started_at: float):
+        self.root = root
+        self.sampled = sampled
+        self.started_at = started_at
+
+    @property
+    def took(self) -> float:
+        return self.root.took
+
+    @property
+    def error(self) -> Optional[Exception]:
+        return self.root.error
+
+    def spans(self) -> List[Span]:
+        """Every step of the trace, parents before their children"""
+        spans: List[Span] = []
+        pending: List[Tuple[ResolutionNode, Optional[int]]] = [(self.root, None)]
+        while pending:
+            node, parent_id = pending.pop()
+            span_id = len(spans)
+            offset = node.started - self.root.started
+            spans.append(Span(node, span_id, parent_id, self.started_at + offset))
+            pending.extend((child, span_id) for child in reversed(node.children))
+        return spans
+
+    def __str__(self):
+        lines: List[str] = []
+        pending: List[Tuple[ResolutionNode, int]] = [(self.root, 0)]
+        while pending:
+            node, depth = pending.pop()
+            failed = " failed" if node.error is not None else ""
+            lines.append(f"{'  ' * depth}{node.name} {node.took * 1000:.3f}ms{failed}")
+            pending.extend((child, depth + 1) for child in reversed(node.children))
+        return "\n".join(lines)
+
+
+TraceSink = Callable[[ResolutionTrace], None]
+
+
+class RingBufferSink:
+    """Keeps the most recent traces in memory"""
+
+    _traces: Deque[ResolutionTrace]
+
+    def __init__(self, size: int = 100):
+        self._traces = deque(maxlen=size)
+
+    def __call__(self, trace: ResolutionTrace):
+        self._traces.append(trace)
+
+    @property
+    def traces(self) -> List[ResolutionTrace]:
+        """The kept traces, oldest first"""
+        return list(self._traces)
+
+    def clear(self):
+        self._traces.clear()
+
+
+class LoggingSink:
+    """Logs each trace as an indented tree"""
+
+    _logger: logging.Logger
+    _level: int
+
+    def __init__(self, logger: Optional[logging.Logger] = None, level=logging.INFO):
+        self._logger = logger or logging.getLogger(__name__)
+        self._level = level
+
+    def __call__(self, trace: ResolutionTrace):
+        if self._logger.isEnabledFor(self._level):
+            self._logger.log(self._level, "Traced call:\n%s", trace)
+
+
+class SpanSink:
+    """
+    Passes every span of each trace to an export function. Children are
+    exported before their parents as spans are usually emitted when they end.
+    """
+
+    _export: Callable[[Span], Any]
+
+    def __init__(self, export: Callable[[Span], Any]):
+        self._export = export
+
+    def __call__(self, trace: ResolutionTrace):
+        for span in reversed(trace.spans()):
+            self._export(span)
+
+
+class InMemorySpanExporter:
+    """Collects the spans given to a SpanSink. Mostly useful for tests."""
+
+    _spans: List[Span]
+
+    def __init__(self):
+        self._spans = []
+
+    def __call__(self, span: Span):
+        self._spans.append(span)
+
+    def get_finished_spans(self) -> List[Span]:
+        return list(self._spans)
+
+    def clear(self):
+        self._spans = []
+
+
+class ResolutionTracer:
+    """
+    Decides which calls of bound functions are traced and sends the traces
+    to a sink. Use it with `Container.use_tracer`.
+    """
+
+    _sink: TraceSink
+    _sample_every: int
+    _slower_than: Optional[float]
+    _calls: Iterator[int]
+    _recorder: "_TraceRecorder"
+
+    def __init__(
+        self,
+        sink: TraceSink,
+        sample_every: int = 100,
+        slower_than: Optional[float] = None,
+    ):
+        """
+        :param sink: called with every finished trace. Shouldn't raise.
+        :param sample_every: trace one call in this many. 0 to only trace slow calls.
+        :param slower_than: also report any call taking at least this many seconds
+        """
+        self._sink = sink
+        self._sample_every = sample_every
+        self._slower_than = slower_than
+        self._calls = itertools.count()
+        self._recorder = _TraceRecorder()
+
+    def trace(self, func, invoke, injection_context, args, kwargs):
+        """Calls invoke(injection_context, args, kwargs) tracing it if it's sampled"""
+        node, context, nested = self._begin(func, injection_context)
+        if node is None and self._slower_than is None:
+            return invoke(injection_context, args, kwargs)
+        started_at = time()
+        started = perf_counter()
+        try:
+            result = invoke(context, args, kwargs)
+        except Exception as error:
+            self._leave(node)
+            self._finish(func, node, nested, started_at, started, error)
+            raise
+        self._leave(node)
+        self._finish(func, node, nested, started_at, started, None)
+        return result
+
+    async def atrace(self, func, start, injection_context, args, kwargs):
+        """Like trace but for async functions. start returns the awaitable to trace."""
+        node, context, nested = self._begin(func, injection_context)
+        if node is None and self._slower_than is None:
+            return await start(injection_context, args, kwargs)
+        started_at = time()
+        started = perf_counter()
+        try:
+            try:
+                awaitable = start(context, args, kwargs)
+            finally:
+                # Injection is synchronous. Leaving before awaiting means
+                # other tasks on this thread can't end up in this trace.
+                self._leave(node)
+            result = await awaitable
+        except Exception as error:
+            self._finish(func, node, nested, started_at, started, error)
+            raise
+        self._finish(func, node, nested, started_at, started, None)
+        return result
+
+    def _begin(self, func, injection_context):
+        recorder = self._recorder
+        # Bound functions called during a sampled call are part of its trace
+        nested = bool(recorder._stack())
+        if not nested and not self._sample():
+            return None, injection_context, False
+        node = ResolutionNode(func, _CALL)
+        recorder._push(node)
+        return node, _SampledInjectionContext(injection_context, recorder), nested
+
+    def _sample(self) -> bool:
+        return self._sample_every > 0 and next(self._calls) % self._sample_every == 0
+
+    def _leave(self, node: Optional[ResolutionNode]):
+        if node is None:
+            return
+        stack = self._recorder._stack()
+        if stack and stack[-1] is node:
+            stack.pop()
+
+    def _finish(
+        self,
+        func,
+        node: Optional[ResolutionNode],
+        nested: bool,
+        started_at: float,
+        started: float,
+        error: Optional[Exception],
+    ):
+        took = perf_counter() - started
+        if node is not None:
+            node.took = took
+            node.error = error
+            if not nested:
+                self._sink(ResolutionTrace(node, True, started_at))
+        elif self._slower_than is not None and took >= self._slower_than:
+            node = ResolutionNode(func, _CALL)
+            node.started = started
+            node.took = took
+            node.error = error
+            self._sink(ResolutionTrace(node, False, started_at))
+
+
+class _TraceRecorder(ResolutionProfile):
+    """
+    Hooks attached to the containers of sampled calls. Calls are held on
+    to by the tracer rather than being kept as roots.
+    """
+
+    # The observed plans of each plan cache. Containers of sampled calls
+    # are thrown away straight after the call so without this every
+    # sampled call would have to plan everything again.
+    _plans: "weakref.WeakKeyDictionary[Any, Any]"
+
+    def __init__(self):
+        super().__init__()
+        self._plans = weakref.WeakKeyDictionary()
+
+    def injection_started(self, func):
+        self._push(ResolutionNode(func, _INJECTION))
+
+    def _add_root(self, node: ResolutionNode):
+        pass
+
+
+class _SampledInjectionContext:
+    """Attaches the recorder to the per call container of a sampled call"""
+
+    __slots__ = ("_context", "_recorder")
+
+    def __init__(self, context, recorder: _TraceRecorder):
+        self._context = context
+        self._recorder = recorder
+
+    def __enter__(self):
+        container = self._context.__enter__()
+        if isinstance(container, Container):
+            container.add_hooks(self._recorder)
+            self._recorder._plans[container._plan_cache] = container._plans
+        return container
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return self._context.__exit__(exc_type, exc_val, exc_tb)
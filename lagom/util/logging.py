@@ -2,7 +2,10 @@
 Help with logging within lagom
 """
 
-from typing import TYPE_CHECKING
+import logging
+import threading
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 if TYPE_CHECKING:
     from logging import Logger
@@ -39,3 +42,94 @@ else:
 
         def critical(self, msg, *args, **kwargs):
             pass
+
+
+class AggregatedUndefinedLogger(logging.Logger):
+    """
+    A logger for `log_undefined_deps` that only warns the first time each
+    undefined dependency is built by reflection. After that the type is
+    only counted so a frequently reflected type can't flood the logs. A
+    summary of the most reflected types can be logged on demand with
+    `flush` or every `summary_every` seconds.
+
+    >>> from lagom import Container
+    >>> from tests.examples import SomeClass
+    >>> undefined = AggregatedUndefinedLogger()
+    >>> c = Container(log_undefined_deps=undefined)
+    >>> _ = c[SomeClass], c[SomeClass]
+    >>> undefined.most_reflected()
+    [(<class 'tests.examples.SomeClass'>, 2)]
+    """
+
+    _target: logging.Logger
+    _counts: Dict[Any, int]
+    _lock: threading.Lock
+    _summary_every: Optional[float]
+    _summary_size: int
+    _next_summary: Optional[float]
+
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        summary_every: Optional[float] = None,
+        summary_size: int = 10,
+    ):
+        """
+        :param logger: where the warnings and summaries are written. Defaults to lagom's logger.
+        :param summary_every: seconds between summaries. None to only summarise on flush.
+        :param summary_size: how many of the most reflected types each summary lists
+        """
+        super().__init__("lagom.undefined_dependencies")
+        self._target = logger or logging.getLogger("lagom.container")
+        # Anything else logged here ends up with the target's handlers
+        self.parent = self._target
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._summary_every = summary_every
+        self._summary_size = summary_size
+        self._next_summary = (
+            monotonic() + summary_every if summary_every is not None else None
+        )
+
+    def warning(self, msg, *args, **kwargs):
+        extra = kwargs.get("extra") or {}
+        if "undefined_dependency" not in extra:
+            self._target.warning(msg, *args, **kwargs)
+            return
+        dep_type = extra["undefined_dependency"]
+        with self._lock:
+            seen = self._counts.get(dep_type, 0)
+            self._counts[dep_type] = seen + 1
+        if not seen:
+            self._target.warning(msg, *args, **kwargs)
+        if self._next_summary is not None and monotonic() >= self._next_summary:
+            self.flush()
+
+    @property
+    def counts(self) -> Dict[Any, int]:
+        """How many times each undefined dependency has been reflected"""
+        with self._lock:
+            return dict(self._counts)
+
+    def most_reflected(self, count: int = 10) -> List[Tuple[Any, int]]:
+        """The undefined dependencies reflected most often with their counts"""
+        counts = self.counts.items()
+        return sorted(counts, key=lambda item: item[1], reverse=True)[:count]
+
+    def flush(self) -> List[Tuple[Any, int]]:
+        """Logs a summary of the most reflected undefined dependencies and returns it"""
+        if self._summary_every is not None:
+            self._next_summary = monotonic() + self._summary_every
+        summary = self.most_reflected(self._summary_size)
+        if summary:
+            self._target.info(
+                "Most reflected undefined dependencies: %s",
+                ", ".join(f"{dep_type} ({count})" for (dep_type, count) in summary),
+                extra={"undefined_dependency_counts": dict(summary)},
+            )
+        return summary
+
+    def reset(self):
+        """Forgets the counts so every type will be warned about again"""
+        with self._lock:
+            self._counts = {}
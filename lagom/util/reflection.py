@@ -1,8 +1,15 @@
 """Extra information about the reflection API
 """
 
+import atexit
+import hashlib
 import inspect
-from functools import lru_cache
+import os
+import pickle  # nosec
+import sys
+import weakref
+from collections import OrderedDict
+from types import FunctionType, MethodType
 from typing import (
     Dict,
     Type,
@@ -13,12 +20,22 @@ from typing import (
     Any,
     Mapping,
     Sequence,
+    Tuple,
 )
 
 import typing
 
+from ..version import __version__
+
 RETURN_ANNOTATION = "return"
 
+# Before python 3.11 get_type_hints made an argument defaulting to None optional
+_IMPLICIT_OPTIONALS = sys.version_info < (3, 11)
+
+# Setting this environment variable to a file path turns on the
+# persistent reflection cache when lagom is imported.
+REFLECTION_CACHE_ENV_VAR = "LAGOM_REFLECTION_CACHE"
+
 
 _TYPE_AWAITABLE = type(typing.Awaitable)
 
@@ -61,46 +78,421 @@ class FunctionSpec:
         return FunctionSpec(new_args, self.annotations, self.defaults, self.return_type)
 
 
+DEFAULT_REFLECTION_CACHE_SIZE = 1024
+
+
 class CachingReflector:
     """
     Takes a function and returns an object representing
     the function's type signature. Results are cached
     so subsequent calls do not need to call the reflection
     API.
+
+    Each reflector has its own cache holding at most maxsize functions
+    with the least recently used dropped first. Functions and classes are
+    held weakly so being reflected on never keeps them in memory.
     """
 
+    maxsize: Optional[int]
+    hits: int
+    misses: int
+    evictions: int
+    collected: int
+    _specs: "OrderedDict[Any, FunctionSpec]"
+    _forget: Callable[[Any], None]
+
+    def __init__(self, maxsize: Optional[int] = DEFAULT_REFLECTION_CACHE_SIZE):
+        """
+        :param maxsize: The most functions to cache. None means no limit.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.collected = 0
+        self._specs = OrderedDict()
+        self._forget = _forget_when_collected(self)
+
     @property
-    def overview_of_cache(self) -> Dict[str, str]:
+    def overview_of_cache(self) -> Dict[str, Optional[int]]:
         """
-        Gives a humanish readable representation of what has been reflected on.
-        Removed since lru cache is now used
+        Statistics about what has been reflected on
         :return:
         """
-        return {"hidden": ""}
+        return {
+            "size": len(self._specs),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "collected": self.collected,
+        }
 
-    @lru_cache(maxsize=1024)
     def get_function_spec(self, func) -> FunctionSpec:
         """
         Returns details about the function's signature
         :param func:
         :return:
         """
+        key = _cache_key(func)
+        try:
+            spec = self._specs[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable callables can't be cached
+            return self._reflect(func)
+        else:
+            self.hits += 1
+            if self.maxsize is not None:
+                try:
+                    self._specs.move_to_end(key)
+                except KeyError:
+                    # Another thread evicted it in the meantime
+                    pass
+            return spec
+        self.misses += 1
+        spec = self._reflect(func)
+        self._store(func, spec)
+        return spec
+
+    def _reflect(self, func) -> FunctionSpec:
+        persistent_cache = _persistent_cache
+        if persistent_cache is not None:
+            return persistent_cache.get_function_spec(func)
         return reflect(func)
 
+    def _store(self, func, spec: FunctionSpec):
+        if self.maxsize == 0:
+            return
+        key = _cache_key(func, self._forget)
+        self._specs[key] = spec
+        if self.maxsize is not None and len(self._specs) > self.maxsize:
+            try:
+                self._specs.popitem(last=False)
+                self.evictions += 1
+            except KeyError:
+                pass
+
+
+def _cache_key(func, callback=None) -> Any:
+    """
+    A key that refers to the function weakly where possible. A bound method
+    is keyed by its function as it gets a new identity on every access.
+    """
+    if isinstance(func, MethodType):
+        func = func.__func__
+    try:
+        return weakref.ref(func, callback)
+    except TypeError:
+        # Builtins can't be weakly referenced but are never unloaded either
+        return func
+
+
+def _forget_when_collected(reflector: CachingReflector):
+    # Only a weak reference to the reflector is held so its cache
+    # doesn't end up in a reference cycle.
+    reflector_ref = weakref.ref(reflector)
+
+    def _forget(key):
+        live_reflector = reflector_ref()
+        if (
+            live_reflector is not None
+            and live_reflector._specs.pop(key, None) is not None
+        ):
+            live_reflector.collected += 1
+
+    return _forget
+
+
+# The (mtime, size, sha256) of a source file
+_Fingerprint = Tuple[int, int, str]
+
+
+class PersistentReflectionCache:
+    """
+    Keeps the result of reflecting on functions in a file so that a new
+    process can skip the reflection API for code that hasn't changed.
+
+    Each function is stored against its qualified name and a fingerprint
+    of the file it was defined in. If the file's modification time or size
+    has changed the content hash is checked before the entry is trusted.
+    Only that file is checked. If an annotation names something from
+    another module (for example an alias imported from elsewhere) and only
+    that module changes the stored spec is still used until the cache is
+    cleared or the function's own file changes.
+    Functions that can't be identified by name are always reflected on
+    live. This includes lambdas, anything defined inside another function,
+    anything created by exec and anything wrapped by a decorator. Only the
+    argument names and type hints are stored. Defaults are always read
+    from the function itself.
+
+    The file is a pickle so it should be treated with the same trust
+    as the application's source code.
+    """
+
+    path: str
+    hits: int
+    misses: int
+    _entries: Dict[str, Tuple[_Fingerprint, bytes]]
+    _stats: Dict[str, Optional[Tuple[int, int]]]
+    _digests: Dict[str, Optional[str]]
+    _changed: bool
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = _load_entries(path)
+        self._stats = {}
+        self._digests = {}
+        self._changed = False
+
+    def get_function_spec(self, func) -> FunctionSpec:
+        """
+        Returns the stored spec for the function if its source is unchanged
+        otherwise reflects on it and stores the result.
+        """
+        key = _persistent_key(func)
+        if key is None:
+            return reflect(func)
+        filename = func.__code__.co_filename
+        entry = self._entries.get(key)
+        if entry is not None and self._unchanged(filename, entry[0]):
+            try:
+                args, annotations, return_type = pickle.loads(entry[1])  # nosec
+                spec = FunctionSpec(
+                    args, annotations, _defaults_from_code(func), return_type
+                )
+                self.hits += 1
+                return spec
+            except Exception:
+                # Most likely a type has moved since the entry was written
+                pass
+        self.misses += 1
+        spec = reflect(func)
+        self._store(key, filename, spec)
+        return spec
+
+    def save(self):
+        """Writes the cache to disk if anything new has been reflected on"""
+        if not self._changed:
+            return
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as cache_file:
+            pickle.dump((_cache_format(), self._entries), cache_file)
+        os.replace(temporary_path, self.path)
+        self._changed = False
+
+    def clear(self):
+        """Forgets every stored spec. The file is emptied on the next save"""
+        self._entries = {}
+        self._changed = True
+
+    def _unchanged(self, filename: str, stored: _Fingerprint) -> bool:
+        stat = self._stat(filename)
+        if stat is None:
+            return False
+        if stat == stored[:2]:
+            return True
+        # Copying files (e.g. into a container image) changes the mtime
+        # so fall back to comparing the content.
+        return self._digest(filename) == stored[2]
+
+    def _stat(self, filename: str) -> Optional[Tuple[int, int]]:
+        if filename not in self._stats:
+            try:
+                stat = os.stat(filename)
+                self._stats[filename] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                self._stats[filename] = None
+        return self._stats[filename]
+
+    def _digest(self, filename: str) -> Optional[str]:
+        if filename not in self._digests:
+            try:
+                with open(filename, "rb") as source_file:
+                    self._digests[filename] = hashlib.sha256(
+                        source_file.read()
+                    ).hexdigest()
+            except OSError:
+                self._digests[filename] = None
+        return self._digests[filename]
+
+    def _store(self, key: str, filename: str, spec: FunctionSpec):
+        stat = self._stat(filename)
+        digest = self._digest(filename)
+        if stat is None or digest is None:
+            return
+        try:
+            serialised = pickle.dumps((spec.args, spec.annotations, spec.return_type))
+        except Exception:
+            return
+        self._entries[key] = (stat + (digest,), serialised)
+        self._changed = True
+
+
+_persistent_cache: Optional[PersistentReflectionCache] = None
+
+
+def use_persistent_reflection_cache(
+    path: str, save_at_exit: bool = True
+) -> PersistentReflectionCache:
+    """
+    Turns on the persistent reflection cache for every container.
+    The same can be done by setting the LAGOM_REFLECTION_CACHE environment
+    variable before lagom is imported.
+
+    :param path: The file to load the cache from and save it to.
+    :param save_at_exit: If true the cache is saved when the interpreter exits.
+    :return:
+    """
+    global _persistent_cache
+    # A replaced cache is no longer saved at exit
+    stop_using_persistent_reflection_cache()
+    cache = PersistentReflectionCache(path)
+    if save_at_exit:
+        atexit.register(cache.save)
+    _persistent_cache = cache
+    return cache
+
+
+def stop_using_persistent_reflection_cache():
+    """Turns the persistent reflection cache off again. It is no longer saved at exit."""
+    global _persistent_cache
+    if _persistent_cache is not None:
+        atexit.unregister(_persistent_cache.save)
+    _persistent_cache = None
+
+
+def _persistent_key(func) -> Optional[str]:
+    """A stable name for the function or None if it doesn't have one"""
+    code = getattr(func, "__code__", None)
+    if code is None or hasattr(func, "__wrapped__"):
+        return None
+    qualname = getattr(func, "__qualname__", "<")
+    if "<" in qualname or not os.path.isfile(code.co_filename):
+        return None
+    return f"{func.__module__}:{qualname}"
+
+
+def _defaults_from_code(func) -> Dict[str, Any]:
+    """
+    The same defaults inspect.signature finds for a plain function. Defaults
+    are read from the function instead of being stored because markers
+    like injectable are compared by identity.
+    """
+    code = func.__code__
+    positional = code.co_varnames[: code.co_argcount]
+    defaults = func.__defaults__ or ()
+    found = dict(zip(positional[len(positional) - len(defaults) :], defaults))
+    found.update(func.__kwdefaults__ or {})
+    return {
+        name: default
+        for name, default in found.items()
+        if default is not inspect.Parameter.empty
+    }
+
+
+def _cache_format() -> Tuple[str, Tuple[int, int]]:
+    return __version__, sys.version_info[:2]
+
+
+def _load_entries(path: str) -> Dict[str, Tuple[_Fingerprint, bytes]]:
+    try:
+        with open(path, "rb") as cache_file:
+            cache_format, entries = pickle.load(cache_file)  # nosec
+    except Exception:
+        # A missing or unreadable cache just means starting from empty
+        return {}
+    if cache_format != _cache_format():
+        return {}
+    return entries
+
 
 def reflect(func: Callable) -> FunctionSpec:
     """
     Extension to inspect.getfullargspec with a little more.
+    Plain python functions are read straight from their code object,
+    defaults and annotations. Anything else goes through inspect.
     :param func:
     :return:
     """
+    spec = None
+    if type(func) is FunctionType and not hasattr(func, "__wrapped__"):
+        spec = _reflect_plain_function(func)
+    if spec is None:
+        spec = _reflect_with_inspect(func)
+    return spec
+
+
+def _reflect_with_inspect(func: Callable) -> FunctionSpec:
     spec = inspect.getfullargspec(func)
     annotations = get_type_hints(func)
     defaults = _get_default_args(func)
+    return _function_spec(func, spec.args, annotations, defaults)
+
+
+def _reflect_plain_function(func: FunctionType) -> Optional[FunctionSpec]:
+    """
+    Reflects on the function in a single pass. Returns None if any of the
+    annotations need the full get_type_hints treatment.
+    """
+    code = func.__code__
+    defaults = _defaults_from_code(func)
+    annotations = {}
+    for name, annotation in func.__annotations__.items():
+        if isinstance(annotation, str):
+            try:
+                annotation = _evaluate(annotation, func.__globals__)
+            except Exception:
+                return None
+        if annotation is None:
+            annotation = type(None)
+        elif not _is_evaluated(annotation):
+            return None
+        elif _IMPLICIT_OPTIONALS and name in defaults and defaults[name] is None:
+            return None
+        annotations[name] = annotation
+    return _function_spec(
+        func, list(code.co_varnames[: code.co_argcount]), annotations, defaults
+    )
+
+
+def _function_spec(func, args, annotations, defaults) -> FunctionSpec:
     ret = annotations.pop(RETURN_ANNOTATION, None)
     if ret and inspect.iscoroutinefunction(func):
         ret = Awaitable[ret]  # type: ignore # todo: figure this out
-    return FunctionSpec(spec.args, annotations, defaults, ret)
+    return FunctionSpec(args, annotations, defaults, ret)
+
+
+def _evaluate(annotation: str, function_globals: Dict[str, Any]):
+    """
+    Evaluates a postponed (PEP 563) annotation the same way get_type_hints
+    would for a function. Plain names are looked up without compiling.
+    """
+    if annotation.isidentifier():
+        if annotation in function_globals:
+            return function_globals[annotation]
+        builtins = function_globals.get("__builtins__", {})
+        if not isinstance(builtins, dict):
+            builtins = vars(builtins)
+        if annotation in builtins:
+            return builtins[annotation]
+    return eval(annotation, function_globals)  # nosec
+
+
+def _is_evaluated(annotation) -> bool:
+    """True if get_type_hints would return the annotation unchanged"""
+    if annotation is Any:
+        return True
+    origin = getattr(annotation, "__origin__", None)
+    if origin is None:
+        return isinstance(annotation, type)
+    # Annotated[T, ...] is stripped down to T by get_type_hints
+    if hasattr(annotation, "__metadata__"):
+        return False
+    return all(_is_evaluated(arg) for arg in getattr(annotation, "__args__", ()))
 
 
 def _get_default_args(func):
@@ -118,10 +510,15 @@ def remove_optional_type(dep_type) -> Optional[Type]:
     :param dep_type:
     :return:
     """
+    # Plain classes are the common case so check for __args__ before
+    # paying the cost of an exception.
+    args = getattr(dep_type, "__args__", None)
+    if args is None:
+        return None
     try:
         # Hacky: an optional type has [T, None] in __args__
-        if len(dep_type.__args__) == 2 and dep_type.__args__[1] == None.__class__:
-            return dep_type.__args__[0]
+        if len(args) == 2 and args[1] == None.__class__:
+            return args[0]
     except:
         pass
     return None
@@ -138,3 +535,7 @@ def remove_awaitable_type(dep_type) -> Optional[Type]:
     ):
         return dep_type.__args__[0]  # type: ignore
     return None
+
+
+if os.environ.get(REFLECTION_CACHE_ENV_VAR):
+    use_persistent_reflection_cache(os.environ[REFLECTION_CACHE_ENV_VAR])
@@ -5,7 +5,7 @@ bound to a container
 
 import functools
 import inspect
-from typing import Protocol, Any, cast
+from typing import Protocol, Any, Awaitable, Dict, Optional, cast
 
 from .exceptions import UnableToInvokeBoundFunction
 from .injection_context import TemporaryInjectionContext
@@ -30,20 +30,41 @@ class RegularFunc(ContainerBoundFunction):
     _argument_updater: _Callable
     _base_injection_context: TemporaryInjectionContext
     _inner_func: _Callable
+    _error_spec: Optional[FunctionSpec]
 
-    def __init__(self, inner_func, base_injection_context, argument_updater):
-        """Capture the wrapped function, its injection context, and the updater."""
+    def __init__(
+        self, inner_func, base_injection_context, argument_updater, error_spec=None
+    ):
+        """Capture the wrapped function, its injection context, and the updater.
+        If error_spec is supplied TypeErrors are reported as UnableToInvokeBoundFunction.
+        """
         self._inner_func = inner_func
         self._base_injection_context = base_injection_context
         self._argument_updater = argument_updater
+        self._error_spec = error_spec
 
     def __call__(self, *args, **kwargs):
-        argument_updater = self._argument_updater
-        inner_func = self._inner_func
-        bound_args, bound_kwargs = argument_updater(
-            self._base_injection_context, args, kwargs
+        tracer = self._base_injection_context.tracer
+        if tracer is not None:
+            return tracer.trace(
+                self._inner_func,
+                self._invoke,
+                self._base_injection_context,
+                args,
+                kwargs,
+            )
+        return self._invoke(self._base_injection_context, args, kwargs)
+
+    def _invoke(self, injection_context, args, kwargs):
+        bound_args, bound_kwargs = self._argument_updater(
+            injection_context, args, kwargs
         )
-        return inner_func(*bound_args, **bound_kwargs)
+        if self._error_spec is None:
+            return self._inner_func(*bound_args, **bound_kwargs)
+        try:
+            return self._inner_func(*bound_args, **bound_kwargs)
+        except TypeError as error:
+            raise _unable_to_invoke(error, self._error_spec, bound_kwargs)
 
     def rebind(self, container: ReadableContainer):
         """Return a new bound function whose injection context targets `container`."""
@@ -51,6 +72,7 @@ class RegularFunc(ContainerBoundFunction):
             self._inner_func,
             self._base_injection_context.rebind(container),
             self._argument_updater,
+            self._error_spec,
         )
 
 
@@ -62,23 +84,33 @@ class AsyncFunc(ContainerBoundFunction):
     _argument_updater: _Callable
     _base_injection_context: TemporaryInjectionContext
     _inner_func: _Callable
+    _error_spec: Optional[FunctionSpec]
 
-    def __init__(self, inner_func, base_injection_context, argument_updater):
-        """Capture the wrapped coroutine function, its injection context, and the updater."""
+    def __init__(
+        self, inner_func, base_injection_context, argument_updater, error_spec=None
+    ):
+        """Capture the wrapped coroutine function, its injection context, and the updater.
+        If error_spec is supplied TypeErrors are reported as UnableToInvokeBoundFunction.
+        """
         self._inner_func = inner_func
         self._base_injection_context = base_injection_context
         self._argument_updater = argument_updater
+        self._error_spec = error_spec
 
     def __call__(self, *args, **kwargs):
         return self.__async_call__(*args, **kwargs)
 
     async def __async_call__(self, *args, **kwargs):
-        argument_updater = self._argument_updater
-        inner_func = self._inner_func
-        bound_args, bound_kwargs = argument_updater(
-            self._base_injection_context, args, kwargs
-        )
-        return await inner_func(*bound_args, **bound_kwargs)
+        tracer = self._base_injection_context.tracer
+        if tracer is not None:
+            return await tracer.atrace(
+                self._inner_func,
+                self._start,
+                self._base_injection_context,
+                args,
+                kwargs,
+            )
+        return await self._start(self._base_injection_context, args, kwargs)
 
     def as_coroutine(self):
         """
@@ -86,9 +118,19 @@ class AsyncFunc(ContainerBoundFunction):
         also get added to the coroutine. This is so it acts like a class with
         an __asynccall__ magic method.
         """
+        start = self._start
+        inner_func = self._inner_func
+        injection_context = self._base_injection_context
 
+        # Awaiting the inner coroutine directly means only one extra frame
+        # is added for each call.
         async def _coroutine_func(*args, **kwargs):
-            return await self.__async_call__(*args, **kwargs)
+            tracer = injection_context.tracer
+            if tracer is not None:
+                return await tracer.atrace(
+                    inner_func, start, injection_context, args, kwargs
+                )
+            return await start(injection_context, args, kwargs)
 
         _coroutine_func.rebind = self.rebind  # type: ignore
 
@@ -100,8 +142,21 @@ class AsyncFunc(ContainerBoundFunction):
             self._inner_func,
             self._base_injection_context.rebind(container),
             self._argument_updater,
+            self._error_spec,
         ).as_coroutine()
 
+    def _start(self, injection_context, args, kwargs) -> Awaitable:
+        """Injects the arguments and returns the (not yet awaited) coroutine"""
+        bound_args, bound_kwargs = self._argument_updater(
+            injection_context, args, kwargs
+        )
+        if self._error_spec is None:
+            return self._inner_func(*bound_args, **bound_kwargs)
+        try:
+            return self._inner_func(*bound_args, **bound_kwargs)
+        except TypeError as error:
+            raise _unable_to_invoke(error, self._error_spec, bound_kwargs)
+
 
 def apply_argument_updater(
     func,
@@ -113,40 +168,29 @@ def apply_argument_updater(
     """
     Takes a function and binds it to a container with an update function
     """
-    inner_func = func if not catch_errors else _wrap_func_in_error_handling(func, spec)
+    error_spec = spec if catch_errors else None
     if inspect.iscoroutinefunction(func):
 
         _bound_func = AsyncFunc(
-            inner_func, base_injection_context, argument_updater
+            func, base_injection_context, argument_updater, error_spec
         ).as_coroutine()
 
     else:
 
-        _bound_func = RegularFunc(inner_func, base_injection_context, argument_updater)
+        _bound_func = RegularFunc(
+            func, base_injection_context, argument_updater, error_spec
+        )
 
     return cast(ContainerBoundFunction, functools.wraps(func)(_bound_func))
 
 
-def _wrap_func_in_error_handling(func, spec: FunctionSpec):
-    """
-    Takes a func and its spec and returns a function that's the same
-    but with more useful TypeError messages
-    :param func:
-    :param spec:
-    :return:
-    """
-
-    @functools.wraps(func)
-    def _error_handling_func(*args, **kwargs):
-        try:
-            return func(*args, **kwargs)
-        except TypeError as error:
-            # if it wasn't in kwargs the container couldn't build it
-            unresolvable_deps = [
-                dep_type
-                for (name, dep_type) in spec.annotations.items()
-                if name not in kwargs.keys()
-            ]
-            raise UnableToInvokeBoundFunction(str(error), unresolvable_deps)
-
-    return _error_handling_func
+def _unable_to_invoke(
+    error: TypeError, spec: FunctionSpec, kwargs: Dict
+) -> UnableToInvokeBoundFunction:
+    # if it wasn't in kwargs the container couldn't build it
+    unresolvable_deps = [
+        dep_type
+        for (name, dep_type) in spec.annotations.items()
+        if name not in kwargs.keys()
+    ]
+    return UnableToInvokeBoundFunction(str(error), unresolvable_deps)
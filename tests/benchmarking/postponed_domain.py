@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+class Engine:
+    def __init__(self, size: int = 4):
+        self.size = size
+
+
+class PostponedCar:
+    def __init__(self, engine: Engine, wheels: int = 4) -> None:
+        self.engine = engine
+        self.wheels = wheels
+
+
+@dataclass
+class PostponedDataclassCar:
+    engine: Engine
+    wheels: int = 4
@@ -0,0 +1,29 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+class Engine:
+    def __init__(self, size: int = 4):
+        self.size = size
+
+
+class PlainCar:
+    def __init__(self, engine: Engine, spare: Optional[Engine] = None, seats=4):
+        self.engine = engine
+        self.spare = spare
+        self.seats = seats
+
+
+class SlotsCar:
+    __slots__ = ("engine", "wheels")
+
+    def __init__(self, engine: Engine, wheels: int = 4) -> None:
+        self.engine = engine
+        self.wheels = wheels
+
+
+@dataclass
+class DataclassCar:
+    engine: Engine
+    owner: str = "nobody"
+    passengers: List[str] = field(default_factory=list)
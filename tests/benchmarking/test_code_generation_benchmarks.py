@@ -0,0 +1,40 @@
+import pytest
+
+from lagom import Singleton, Container, ExplicitContainer
+from lagom.codegen import use_generated_code
+from .core_domain import SomeOtherThingAsAsingleton, SomeService, AThingIMightNeed
+
+
+def _resolve_repeatedly(container):
+    def do_pretend_work():
+        for _ in range(10):
+            container.resolve(AThingIMightNeed).do_it()
+        return True
+
+    return do_pretend_work
+
+
+@pytest.mark.benchmarking
+def test_resolving_by_reflection(benchmark):
+    container = Container()
+    container[SomeOtherThingAsAsingleton] = Singleton(SomeOtherThingAsAsingleton)
+
+    assert benchmark(_resolve_repeatedly(container))
+
+
+@pytest.mark.benchmarking
+def test_resolving_with_generated_code(benchmark):
+    container = use_generated_code(Container())
+    container[SomeOtherThingAsAsingleton] = Singleton(SomeOtherThingAsAsingleton)
+
+    assert benchmark(_resolve_repeatedly(container))
+
+
+@pytest.mark.benchmarking
+def test_resolving_explicitly(benchmark):
+    container = ExplicitContainer()
+    container[SomeOtherThingAsAsingleton] = SomeOtherThingAsAsingleton()
+    container[SomeService] = lambda c: SomeService(c[SomeOtherThingAsAsingleton])
+    container[AThingIMightNeed] = lambda c: AThingIMightNeed(c[SomeService])
+
+    assert benchmark(_resolve_repeatedly(container))
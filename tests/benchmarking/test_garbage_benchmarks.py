@@ -0,0 +1,93 @@
+import gc
+from typing import Iterator
+
+import pytest
+
+from lagom import (
+    Singleton,
+    Container,
+    ContextContainer,
+    magic_bind_to_container,
+    bind_to_container,
+    injectable,
+    context_dependency_definition,
+)
+from .core_domain import SomeOtherThingAsAsingleton, SomeService, AThingIMightNeed
+
+CALLS = 1000
+
+
+def _collections() -> int:
+    return sum(generation["collections"] for generation in gc.get_stats())
+
+
+def _live_containers() -> int:
+    # type() rather than isinstance so lazy objects (like django's settings)
+    # aren't asked for their __class__
+    return sum(1 for obj in gc.get_objects() if issubclass(type(obj), Container))
+
+
+def _measure_garbage(benchmark, bound_function):
+    def do_pretend_work():
+        for _ in range(CALLS):
+            bound_function()
+        return True
+
+    bound_function()
+    gc.collect()
+    containers_before = _live_containers()
+    collections_before = _collections()
+
+    assert benchmark.pedantic(do_pretend_work, rounds=5)
+
+    collections = _collections() - collections_before
+    benchmark.extra_info["gc_collections"] = collections
+    benchmark.extra_info["calls"] = CALLS * 5
+
+    # Nothing should be left behind for the cyclic garbage collector
+    assert _live_containers() == containers_before
+    assert gc.collect() == 0
+
+
+@pytest.mark.benchmarking
+def test_garbage_from_magic_partials(benchmark):
+    container = Container()
+    container[SomeOtherThingAsAsingleton] = Singleton(SomeOtherThingAsAsingleton)
+
+    @magic_bind_to_container(container, shared=[SomeService])
+    def do_work(thing: AThingIMightNeed):
+        thing.do_it()
+
+    _measure_garbage(benchmark, do_work)
+
+
+@pytest.mark.benchmarking
+def test_garbage_from_context_partials(benchmark):
+    container = Container()
+    container[SomeOtherThingAsAsingleton] = Singleton(SomeOtherThingAsAsingleton)
+
+    @context_dependency_definition(container)
+    def _load_dep_then_clean(c) -> Iterator[SomeService]:
+        try:
+            yield SomeService(c[SomeOtherThingAsAsingleton])
+        finally:
+            pass
+
+    context_container = ContextContainer(container, context_types=[SomeService])
+
+    @bind_to_container(context_container, shared=[SomeService])
+    def do_work(thing: AThingIMightNeed = injectable):
+        thing.do_it()
+
+    _measure_garbage(benchmark, do_work)
+
+
+@pytest.mark.benchmarking
+def test_garbage_from_clones(benchmark):
+    container = Container()
+    container[SomeOtherThingAsAsingleton] = Singleton(SomeOtherThingAsAsingleton)
+
+    def resolve_in_a_clone():
+        return container.clone()[AThingIMightNeed]
+
+    _measure_garbage(benchmark, resolve_in_a_clone)
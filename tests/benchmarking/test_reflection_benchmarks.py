@@ -0,0 +1,21 @@
+import pytest
+
+from lagom.util.reflection import reflect, _reflect_with_inspect
+from .postponed_domain import PostponedCar, PostponedDataclassCar
+from .reflection_domain import PlainCar, SlotsCar, DataclassCar
+
+CLASSES = [PlainCar, SlotsCar, DataclassCar, PostponedCar, PostponedDataclassCar]
+
+
+@pytest.mark.benchmarking
+@pytest.mark.parametrize("dep_type", CLASSES, ids=lambda dep_type: dep_type.__name__)
+def test_single_pass_reflection(benchmark, dep_type):
+    spec = benchmark(reflect, dep_type.__init__)
+    assert "engine" in spec.annotations
+
+
+@pytest.mark.benchmarking
+@pytest.mark.parametrize("dep_type", CLASSES, ids=lambda dep_type: dep_type.__name__)
+def test_reflection_with_inspect(benchmark, dep_type):
+    spec = benchmark(_reflect_with_inspect, dep_type.__init__)
+    assert "engine" in spec.annotations
@@ -1,9 +1,11 @@
+import asyncio
 from dataclasses import dataclass
 from typing import Awaitable
 
 import pytest
 
 from lagom import Container, dependency_definition, Singleton
+from lagom.definitions import LazyAwaitable
 from lagom.exceptions import TypeOnlyAvailableAsAwaitable
 
 
@@ -69,3 +71,90 @@ async def test_a_sync_and_async_version_can_be_defined(
 
     assert container[MyComplexDep]
     assert container[Awaitable[MyComplexDep]]  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_async_definitions_only_run_once_awaited(container: Container):
+    calls = []
+
+    @dependency_definition(container)
+    async def my_constructor() -> MyComplexDep:
+        calls.append("built")
+        return MyComplexDep(some_number=5)
+
+    tasks_before = len(asyncio.all_tasks())
+    awaitable = container[Awaitable[MyComplexDep]]  # type: ignore[type-abstract]
+    await asyncio.sleep(0)
+    assert calls == []
+    assert len(asyncio.all_tasks()) == tasks_before
+
+    assert (await awaitable) == MyComplexDep(some_number=5)
+    assert calls == ["built"]
+
+
+@pytest.mark.asyncio
+async def test_eager_async_definitions_start_on_resolution(container: Container):
+    calls = []
+
+    @dependency_definition(container, eager=True)
+    async def my_constructor() -> MyComplexDep:
+        calls.append("built")
+        return MyComplexDep(some_number=5)
+
+    awaitable = container[Awaitable[MyComplexDep]]  # type: ignore[type-abstract]
+    await asyncio.sleep(0)
+    assert calls == ["built"]
+    assert (await awaitable) == MyComplexDep(some_number=5)
+
+
+@pytest.mark.asyncio
+async def test_lazy_async_singletons_are_shared_between_concurrent_awaits(
+    container: Container,
+):
+    calls = []
+
+    @dependency_definition(container, singleton=True)
+    async def my_constructor() -> MyComplexDep:
+        calls.append("built")
+        await asyncio.sleep(0.01)
+        return MyComplexDep(some_number=len(calls))
+
+    awaitable = container[Awaitable[MyComplexDep]]  # type: ignore[type-abstract]
+    first, second = await asyncio.gather(awaitable, awaitable)
+    assert first is second
+    assert (await awaitable) is first
+    assert calls == ["built"]
+
+
+@pytest.mark.asyncio
+async def test_lazy_awaitables_raise_the_same_error_every_time():
+    calls = []
+
+    async def _fail():
+        calls.append("called")
+        raise ValueError("no connection")
+
+    awaitable = LazyAwaitable(_fail)
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await awaitable
+    assert calls == ["called"]
+
+
+@pytest.mark.asyncio
+async def test_a_cancelled_lazy_awaitable_starts_again_when_next_awaited():
+    calls = []
+
+    async def _slow():
+        calls.append("called")
+        await asyncio.sleep(0 if len(calls) > 1 else 10)
+        return len(calls)
+
+    awaitable = LazyAwaitable(_slow)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(_await(awaitable), 0.01)
+    assert (await awaitable) == 2
+
+
+async def _await(awaitable):
+    return await awaitable
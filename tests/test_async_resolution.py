@@ -0,0 +1,217 @@
+import asyncio
+from typing import Awaitable, Optional
+
+import pytest
+
+from lagom import Container, ExplicitContainer, Singleton, dependency_definition
+from lagom.exceptions import DependencyNotDefined, UnresolvableType
+from lagom.metrics import ResolutionMetrics
+
+
+class Database:
+    pass
+
+
+class Cache:
+    pass
+
+
+class Queue:
+    pass
+
+
+class Settings:
+    pass
+
+
+class Handler:
+    def __init__(self, database: Database, cache: Cache, settings: Settings):
+        self.database = database
+        self.cache = cache
+        self.settings = settings
+
+
+class Service:
+    def __init__(self, handler: Handler, queue: Optional[Queue] = None):
+        self.handler = handler
+        self.queue = queue
+
+
+class LazyHandler:
+    def __init__(self, database: Awaitable[Database]):
+        self.database = database
+
+
+class NeedsAString:
+    def __init__(self, database: Database, name: str):
+        pass
+
+
+@pytest.fixture
+def async_container(container: Container):
+    @dependency_definition(container)
+    async def _database() -> Database:
+        return Database()
+
+    @dependency_definition(container)
+    async def _cache() -> Cache:
+        return Cache()
+
+    return container
+
+
+@pytest.mark.asyncio
+async def test_async_definitions_are_awaited_for_constructor_arguments(
+    async_container: Container,
+):
+    handler = await async_container.aresolve(Handler)
+    assert isinstance(handler.database, Database)
+    assert isinstance(handler.cache, Cache)
+    assert isinstance(handler.settings, Settings)
+
+
+@pytest.mark.asyncio
+async def test_nested_and_optional_arguments_are_awaited(
+    async_container: Container,
+):
+    @dependency_definition(async_container)
+    async def _queue() -> Queue:
+        return Queue()
+
+    service = await async_container.aresolve(Service)
+    assert isinstance(service.handler.database, Database)
+    assert isinstance(service.queue, Queue)
+
+
+@pytest.mark.asyncio
+async def test_independent_async_arguments_are_built_concurrently(
+    container: Container,
+):
+    started = []
+
+    async def _wait_for_both(built):
+        started.append(built)
+        while len(started) < 2:
+            await asyncio.sleep(0)
+        return built
+
+    @dependency_definition(container)
+    async def _database() -> Database:
+        return await asyncio.wait_for(_wait_for_both(Database()), 1)
+
+    @dependency_definition(container)
+    async def _cache() -> Cache:
+        return await asyncio.wait_for(_wait_for_both(Cache()), 1)
+
+    handler = await container.aresolve(Handler)
+    assert started == [handler.database, handler.cache]
+
+
+@pytest.mark.asyncio
+async def test_awaitable_arguments_are_still_given_the_awaitable(
+    async_container: Container,
+):
+    handler = await async_container.aresolve(LazyHandler)
+    assert isinstance(await handler.database, Database)
+
+
+@pytest.mark.asyncio
+async def test_asking_for_the_awaitable_type_gives_the_awaited_value(
+    async_container: Container,
+):
+    assert isinstance(await async_container.aresolve(Awaitable[Database]), Database)  # type: ignore
+    assert isinstance(await async_container.aresolve(Database), Database)
+
+
+@pytest.mark.asyncio
+async def test_types_without_async_dependencies_resolve_as_normal(
+    container: Container,
+):
+    container[Settings] = Singleton(Settings)
+    assert await container.aresolve(Settings) is container[Settings]
+    assert not container._plan_for(Handler).awaits
+
+
+@pytest.mark.asyncio
+async def test_async_singletons_are_only_built_once(container: Container):
+    built = []
+
+    @dependency_definition(container, singleton=True)
+    async def _database() -> Database:
+        built.append(Database())
+        return built[-1]
+
+    first = await container.aresolve(LazyHandler)
+    second = await container.aresolve(Database)
+    assert (await first.database) is second
+    assert len(built) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_definitions_in_a_clone_are_awaited(container: Container):
+    container.resolve(Handler, suppress_error=True)
+    child = container.clone()
+
+    @dependency_definition(child)
+    async def _database() -> Database:
+        return Database()
+
+    @dependency_definition(child)
+    async def _cache() -> Cache:
+        return Cache()
+
+    handler = await child.aresolve(Handler)
+    assert isinstance(handler.database, Database)
+
+
+@pytest.mark.asyncio
+async def test_failures_are_reported_like_resolve(async_container: Container):
+    with pytest.raises(UnresolvableType) as sync_error:
+        async_container.resolve(NeedsAString)
+    with pytest.raises(UnresolvableType) as error:
+        await async_container.aresolve(NeedsAString)
+    assert str(error.value) == str(sync_error.value)
+    assert await async_container.aresolve(NeedsAString, suppress_error=True) is None
+
+
+@pytest.mark.asyncio
+async def test_errors_from_async_definitions_are_raised(container: Container):
+    @dependency_definition(container)
+    async def _database() -> Database:
+        raise ValueError("no connection")
+
+    @dependency_definition(container)
+    async def _cache() -> Cache:
+        return Cache()
+
+    with pytest.raises(ValueError):
+        await container.aresolve(Handler)
+
+
+@pytest.mark.asyncio
+async def test_explicit_containers_only_build_defined_types(
+    explicit_container: ExplicitContainer,
+):
+    @dependency_definition(explicit_container)
+    async def _database() -> Database:
+        return Database()
+
+    for container in [explicit_container, explicit_container.freeze()]:
+        assert isinstance(await container.aresolve(Database), Database)
+        with pytest.raises(DependencyNotDefined):
+            await container.aresolve(Settings)
+        assert await container.aresolve(Settings, suppress_error=True) is None
+
+
+@pytest.mark.asyncio
+async def test_async_resolution_is_reported_to_hooks(async_container: Container):
+    metrics = ResolutionMetrics()
+    async_container.add_hooks(metrics)
+
+    await async_container.aresolve(Handler)
+    await async_container.aresolve(Database)
+
+    handler_metrics = metrics.for_type(Handler)
+    database_metrics = metrics.for_type(Database)
+    assert handler_metrics and handler_metrics.resolves == 1
+    assert database_metrics and database_metrics.resolves == 1
@@ -0,0 +1,118 @@
+import logging
+from typing import Optional
+
+import pytest
+
+from lagom import Container, Singleton
+from lagom.codegen import use_generated_code, generate_source
+from lagom.exceptions import UnresolvableType, RecursiveDefinitionError
+
+
+class Engine:
+    def __init__(self, size: int = 4):
+        self.size = size
+
+
+class Car:
+    def __init__(self, engine: Engine, spare: Optional[Engine] = None):
+        self.engine = engine
+        self.spare = spare
+
+
+class NeedsAName:
+    def __init__(self, name: str):
+        self.name = name
+
+
+class Greeter:
+    def __init__(self, named: NeedsAName):
+        self.named = named
+
+
+class Broken:
+    def __init__(self):
+        raise TypeError("Something went wrong inside")
+
+
+class NeedsBroken:
+    def __init__(self, broken: Broken):
+        self.broken = broken
+
+
+@pytest.fixture
+def generated_container():
+    return use_generated_code(Container())
+
+
+def test_the_generated_source_calls_constructors_directly(
+    generated_container: Container,
+):
+    generated_container[Engine] = Singleton(Engine)
+    generated_container.resolve(Engine)
+
+    source = generate_source(generated_container, Car)
+
+    assert "def build_Car(c):" in source
+    assert "Car(engine=_instance_0, spare=_instance_0)" in source
+
+
+def test_types_are_built_the_same_way(generated_container: Container):
+    car = generated_container.resolve(Car)
+    assert car.engine.size == 4
+    assert car.spare is not None
+
+
+def test_singletons_are_still_shared(generated_container: Container):
+    generated_container[Engine] = Singleton(Engine)
+    first = generated_container.resolve(Car)
+    second = generated_container.resolve(Car)
+    assert first.engine is second.engine
+
+
+def test_definitions_returning_none_leave_the_default_in_place(
+    generated_container: Container,
+):
+    generated_container[Optional[Engine]] = lambda: None  # type: ignore
+    assert generated_container.resolve(Car).spare is None
+
+
+def test_clones_can_still_override_types(generated_container: Container):
+    generated_container.resolve(Car)
+    clone = generated_container.clone()
+    clone[Engine] = lambda: Engine(8)
+    assert clone.resolve(Car).engine.size == 8
+    assert generated_container.resolve(Car).engine.size == 4
+
+
+@pytest.mark.parametrize("dep_type", [Greeter, NeedsBroken])
+def test_errors_match_the_reflective_plans(
+    generated_container: Container, container: Container, dep_type
+):
+    with pytest.raises(UnresolvableType) as generated_error:
+        generated_container.resolve(dep_type)
+    with pytest.raises(UnresolvableType) as reflected_error:
+        container.resolve(dep_type)
+
+    assert str(generated_error.value) == str(reflected_error.value)
+    assert generated_container.resolve(dep_type, suppress_error=True) is None
+
+
+def test_recursion_errors_are_reported_against_the_type_being_built(
+    generated_container: Container,
+):
+    def _recurse():
+        return _recurse()
+
+    generated_container[Engine] = _recurse
+    with pytest.raises(RecursiveDefinitionError) as error:
+        generated_container.resolve(Car)
+    assert "Car" in str(error.value)
+
+
+def test_undefined_dependencies_are_still_logged(caplog):
+    container = use_generated_code(Container(log_undefined_deps=True))
+    with caplog.at_level(logging.INFO):
+        container.resolve(Car)
+
+    logged_types = [record.undefined_dependency for record in caplog.records]
+    assert logged_types[:2] == [Car, Engine]
@@ -37,3 +37,25 @@ def test_container_invocation_level_is_passed_to_lambdas():
     assert level_one[OtherDepNeedingALambda].dep.contents == "level one"
     assert level_two[OtherDepNeedingALambda].dep.contents == "level two"
     assert level_three[OtherDepNeedingALambda].dep.contents == "level three"
+
+
+def test_deep_clones_see_definitions_added_to_the_root_later():
+    root = Container()
+    root[Dep] = Dep("root")
+    leaf = root.clone().clone().clone()
+    assert leaf[OtherDep].dep.contents == "root"
+
+    root[OtherDepNeedingALambda] = lambda c: OtherDepNeedingALambda(c[Dep])
+    assert leaf[OtherDepNeedingALambda].dep.contents == "root"
+
+
+def test_deep_clones_see_definitions_added_to_the_middle_later():
+    root = Container()
+    middle = root.clone()
+    leaf = middle.clone().clone()
+    assert OtherDepNeedingALambda not in leaf.defined_types
+
+    middle[OtherDepNeedingALambda] = lambda c: OtherDepNeedingALambda("middle")
+    assert OtherDepNeedingALambda in leaf.defined_types
+    assert leaf[OtherDepNeedingALambda].dep == "middle"
+    assert OtherDepNeedingALambda not in root.defined_types
@@ -1,4 +1,7 @@
+import gc
+
 from lagom import Container, Singleton
+from lagom.interfaces import ContainerDebugInfo
 
 
 class InitialDep:
@@ -42,3 +45,11 @@ def test_overwriting_a_singleton_creates_a_new_one(container: Container):
     new_container.define(InitialDep, Singleton(InitialDep))
 
     assert id(container[InitialDep]) != id(new_container[InitialDep])
+
+
+def test_clones_dont_need_the_garbage_collector_to_be_freed():
+    container = Container()
+    gc.collect()
+    for _ in range(10):
+        container.clone()[ContainerDebugInfo]  # type: ignore
+    assert gc.collect() == 0
@@ -53,3 +53,12 @@ def test_the_container_can_inject_its_own_overview(container: Container):
     assert hasattr(info, "defined_types")
     assert hasattr(info, "reflection_cache_overview")
     assert isinstance(info, ContainerDebugInfo)
+
+
+def test_changing_the_listed_types_does_not_change_the_container(
+    container: Container,
+):
+    container[InitialDep] = InitialDep
+    container.defined_types.clear()
+    assert InitialDep in container.defined_types
+    assert InitialDep in container.clone().defined_types
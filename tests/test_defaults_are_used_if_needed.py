@@ -14,3 +14,17 @@ def test_defaults_are_used_if_needed(container: Container):
     resolved = container.resolve(DepWithMultipleDefaults)
     assert resolved.a_string == "hello"
     assert resolved.a_bool is True
+
+
+def handler(name: str = "x", limit: int = 10):
+    return name, limit
+
+
+def test_bound_functions_use_their_own_defaults(container: Container):
+    assert container.magic_partial(handler)() == ("x", 10)
+
+
+def test_defaults_are_still_logged_when_undefined_deps_are_logged(caplog):
+    container = Container(log_undefined_deps=True)
+    assert container.magic_partial(handler)() == ("x", 10)
+    assert {record.undefined_dependency for record in caplog.records} == {str, int}
@@ -0,0 +1,100 @@
+import abc
+from typing import Optional
+
+import pytest
+
+from lagom import Container, Singleton, injectable
+from lagom.exceptions import CircularDefinitionError
+
+
+class Engine:
+    built = 0
+
+    def __init__(self, size: int = 4):
+        Engine.built += 1
+
+
+class Car:
+    def __init__(self, engine: Engine, spare: Optional[Engine] = None):
+        pass
+
+
+class Garage:
+    def __init__(self, car: Car, name: str = "home"):
+        pass
+
+
+class Vehicle(abc.ABC):
+    pass
+
+
+class Chicken:
+    def __init__(self, egg: "Egg"):
+        pass
+
+
+class Egg:
+    def __init__(self, chicken: Chicken):
+        pass
+
+
+def test_the_graph_follows_constructor_arguments(container: Container):
+    graph = container.dependency_graph([Garage])
+
+    assert graph.dependencies_of(Garage) == (Car,)
+    assert graph.dependencies_of(Car) == (Engine, Optional[Engine])
+    assert graph.dependencies_of(Optional[Engine]) == (Engine,)
+    assert graph.dependents_of(Engine) == (Car, Optional[Engine])
+
+
+def test_nothing_is_constructed(container: Container):
+    Engine.built = 0
+    container.dependency_graph([Garage])
+    assert Engine.built == 0
+
+
+def test_definitions_are_followed(container: Container):
+    container[Vehicle] = Car  # type: ignore
+    container[Engine] = lambda: Engine(8)
+
+    graph = container.dependency_graph([Vehicle])
+    assert graph.dependencies_of(Vehicle) == (Car,)
+    assert graph.dependencies_of(Engine) == ()
+
+
+def test_singletons_of_a_class_depend_on_its_arguments(container: Container):
+    container[Car] = Singleton(Car)
+    graph = container.dependency_graph([Car])
+    assert graph.dependencies_of(Car) == (Engine, Optional[Engine])
+
+
+def test_everything_depending_on_a_type_can_be_found(container: Container):
+    graph = container.dependency_graph([Garage])
+    assert graph.everything_depending_on(Engine) == {Car, Garage, Optional[Engine]}
+    assert graph.everything_depending_on(Garage) == set()
+
+
+def test_types_are_ordered_after_their_dependencies(container: Container):
+    order = container.dependency_graph([Garage]).topological_order()
+    assert order.index(Engine) < order.index(Car) < order.index(Garage)
+
+
+def test_circular_dependencies_are_found_before_anything_is_built(
+    container: Container,
+):
+    graph = container.dependency_graph([Garage, Chicken])
+
+    assert graph.find_cycle() in ([Chicken, Egg, Chicken], [Egg, Chicken, Egg])
+    with pytest.raises(CircularDefinitionError):
+        graph.topological_order()
+
+
+def test_by_default_defined_and_bound_types_are_included(container: Container):
+    container[Vehicle] = Car  # type: ignore
+
+    def handler(garage: Garage = injectable):
+        pass
+
+    container.partial(handler)
+    graph = container.dependency_graph()
+    assert {Vehicle, Car, Garage, Engine} <= graph.types
@@ -0,0 +1,158 @@
+import pytest
+
+from lagom import Container, ExplicitContainer, Singleton, FrozenContainer, injectable
+from lagom.exceptions import (
+    ContainerIsFrozen,
+    DependencyNotDefined,
+    CircularDefinitionError,
+    UnableToInvokeBoundFunction,
+    UnresolvableType,
+)
+
+
+class Database:
+    pass
+
+
+class PostgresDatabase(Database):
+    pass
+
+
+class Repository:
+    def __init__(self, db: Database):
+        self.db = db
+
+
+class Service:
+    def __init__(self, repo: Repository):
+        self.repo = repo
+
+
+class NeedsAName:
+    def __init__(self, name: str):
+        pass
+
+
+class LoopyA:
+    pass
+
+
+class LoopyB:
+    pass
+
+
+def test_frozen_containers_resolve_the_same_definitions(container: Container):
+    container[Database] = PostgresDatabase
+    frozen = container.freeze()
+    assert isinstance(frozen, FrozenContainer)
+    assert isinstance(frozen[Service].repo.db, PostgresDatabase)
+
+
+def test_definitions_from_every_parent_are_included(container: Container):
+    container[Database] = PostgresDatabase
+    child = container.clone()
+    child[Repository] = lambda c: Repository(c[Database])
+    frozen = child.freeze()
+    assert isinstance(frozen[Repository].db, PostgresDatabase)
+    assert Repository in frozen.defined_types
+    assert Database in frozen.defined_types
+
+
+def test_frozen_containers_cant_be_changed(container: Container):
+    frozen = container.freeze()
+    with pytest.raises(ContainerIsFrozen):
+        frozen[Database] = PostgresDatabase
+
+
+def test_frozen_containers_can_still_be_cloned_and_changed(container: Container):
+    frozen = container.freeze()
+    clone = frozen.clone()
+    clone[Database] = PostgresDatabase
+    assert isinstance(clone[Service].repo.db, PostgresDatabase)
+    assert not isinstance(frozen[Service].repo.db, PostgresDatabase)
+
+
+def test_built_singletons_are_shared_with_the_original(container: Container):
+    container[Database] = Singleton(PostgresDatabase)
+    original_db = container[Database]
+    frozen = container.freeze()
+    assert frozen[Database] is original_db
+
+
+def test_singletons_built_after_freezing_are_shared_with_the_original(
+    container: Container,
+):
+    container[Database] = Singleton(PostgresDatabase)
+    frozen = container.freeze()
+    assert frozen[Database] is container[Database]
+
+
+def test_alias_chains_are_collapsed(container: Container):
+    container[PostgresDatabase] = Singleton(PostgresDatabase)
+    container[Database] = PostgresDatabase
+    frozen = container.freeze()
+    assert frozen.get_definition(Database) is frozen.get_definition(PostgresDatabase)
+    assert frozen[Database] is frozen[PostgresDatabase]
+
+
+def test_circular_aliases_are_caught_when_freezing(container: Container):
+    container[LoopyA] = LoopyB  # type: ignore
+    container[LoopyB] = LoopyA  # type: ignore
+    with pytest.raises(CircularDefinitionError):
+        container.freeze()
+
+
+def test_aliases_to_types_that_cant_be_built_are_caught_when_freezing(
+    container: Container,
+):
+    container[NeedsAName] = NeedsAName
+    with pytest.raises(UnresolvableType):
+        container.freeze()
+
+
+def test_freezing_an_explicit_container_keeps_it_explicit(
+    explicit_container: ExplicitContainer,
+):
+    explicit_container[Database] = lambda: PostgresDatabase()
+    frozen = explicit_container.freeze()
+    assert isinstance(frozen[Database], PostgresDatabase)
+    with pytest.raises(DependencyNotDefined):
+        frozen.resolve(Service)
+    assert frozen.resolve(Service, suppress_error=True) is None
+
+
+def test_clones_of_an_explicit_frozen_container_are_explicit(
+    explicit_container: ExplicitContainer,
+):
+    explicit_container[Database] = lambda: PostgresDatabase()
+    clone = explicit_container.freeze().clone()
+    assert isinstance(clone[Database], PostgresDatabase)
+    with pytest.raises(DependencyNotDefined):
+        clone.resolve(Repository)
+
+
+def test_functions_bound_to_an_explicit_frozen_container_are_explicit(
+    explicit_container: ExplicitContainer,
+):
+    frozen = explicit_container.freeze()
+
+    def handler(repo: Repository = injectable):
+        return repo
+
+    with pytest.raises(DependencyNotDefined):
+        frozen.partial(handler)()
+    with frozen.temporary_singletons([Database]) as scope:
+        with pytest.raises(DependencyNotDefined):
+            scope.resolve(Repository)
+
+
+def test_magic_partial_on_an_explicit_frozen_container_is_explicit(
+    explicit_container: ExplicitContainer,
+):
+    frozen = explicit_container.freeze()
+
+    def handler(repo: Repository):
+        return repo
+
+    with pytest.raises(UnableToInvokeBoundFunction):
+        frozen.magic_partial(handler)()
@@ -0,0 +1,142 @@
+import threading
+
+import pytest
+
+from lagom import Container, Singleton, dependency_definition
+from lagom.exceptions import CircularDefinitionError
+
+
+class Database:
+    def __init__(self):
+        Database.built.append(self)
+
+    built: list = []
+
+
+class Repository:
+    def __init__(self, database: Database):
+        Repository.built.append(self)
+
+    built: list = []
+
+
+class Service:
+    def __init__(self, repository: Repository):
+        self.repository = repository
+
+
+class BrokenDatabase:
+    def __init__(self):
+        raise ValueError("no connection")
+
+
+class BrokenRepository:
+    def __init__(self, database: BrokenDatabase):
+        pass
+
+
+class Chicken:
+    def __init__(self, egg: "Egg"):
+        pass
+
+
+class Egg:
+    def __init__(self, chicken: Chicken):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def reset_built():
+    Database.built = []
+    Repository.built = []
+
+
+def test_every_singleton_is_built_and_timed(container: Container):
+    container[Database] = Singleton(Database)
+    container[Repository] = Singleton(Repository)
+
+    report = container.initialise_singletons()
+
+    assert set(report.timings) == {Database, Repository}
+    assert not report.failures
+    assert container[Database] is Database.built[0]
+    assert container[Repository] is Repository.built[0]
+    assert len(Database.built) == 1
+
+
+def test_singletons_are_built_after_the_singletons_they_need(container: Container):
+    container[Repository] = Singleton(Repository)
+    container[Database] = Singleton(Database)
+
+    report = container.initialise_singletons(max_workers=4)
+
+    assert list(report.timings) == [Database, Repository]
+    assert len(Database.built) == 1
+
+
+def test_singletons_needed_through_other_types_are_built_first(
+    container: Container,
+):
+    container[Service] = Singleton(Service)
+    container[Database] = Singleton(Database)
+
+    report = container.initialise_singletons(max_workers=4)
+
+    assert list(report.timings) == [Database, Service]
+    assert container[Service].repository is not None
+    assert len(Database.built) == 1
+
+
+def test_independent_singletons_are_built_at_the_same_time(container: Container):
+    both_building = threading.Barrier(2, timeout=5)
+
+    class First:
+        def __init__(self):
+            both_building.wait()
+
+    class Second:
+        def __init__(self):
+            both_building.wait()
+
+    container[First] = Singleton(First)
+    container[Second] = Singleton(Second)
+
+    report = container.initialise_singletons(max_workers=2)
+    assert not report.failures
+
+
+def test_failures_are_reported_and_dependents_are_skipped(container: Container):
+    container[BrokenDatabase] = Singleton(BrokenDatabase)
+    container[BrokenRepository] = Singleton(BrokenRepository)
+    container[Database] = Singleton(Database)
+
+    report = container.initialise_singletons()
+
+    assert set(report.failures) == {BrokenDatabase, BrokenRepository}
+    assert report.timings[BrokenRepository] == 0.0
+    assert report.failures[BrokenRepository] is report.failures[BrokenDatabase]
+    assert len(Database.built) == 1
+
+
+def test_circular_singletons_are_refused_before_anything_is_built(
+    container: Container,
+):
+    container[Chicken] = Singleton(Chicken)
+    container[Database] = Singleton(Database)
+
+    with pytest.raises(CircularDefinitionError):
+        container.initialise_singletons()
+    assert Database.built == []
+
+
+def test_built_and_async_singletons_are_left_alone(container: Container):
+    container[Database] = Singleton(Database)
+    container.resolve(Database)
+
+    @dependency_definition(container, singleton=True)
+    async def _repository() -> Repository:
+        return Repository(Database())
+
+    report = container.initialise_singletons()
+    assert list(report.timings) == []
+    assert Repository.built == []
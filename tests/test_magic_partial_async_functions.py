@@ -63,3 +63,19 @@ async def test_calling_async_partials_works_as_expected_with_shared_too(
         return message
 
     assert await example_async_function("test") == "test"
+
+
+@pytest.mark.asyncio
+async def test_binding_an_async_function_only_adds_a_single_frame(
+    container: Container,
+):
+    @magic_bind_to_container(container)
+    async def example_async_function(something: Something):
+        frame = inspect.currentframe()
+        assert frame and frame.f_back and frame.f_back.f_back
+        return frame.f_back.f_back.f_code.co_name
+
+    assert (
+        await example_async_function()
+        == "test_binding_an_async_function_only_adds_a_single_frame"
+    )
@@ -156,3 +156,14 @@ def test_partials_can_be_provided_with_an_update_method(container: Container):
 
     arg_1, arg_2 = weird("hello")
     assert arg_1 == arg_2
+
+
+def test_different_ways_of_calling_a_partial_are_each_handled():
+    partial = container.magic_partial(example_function_with_to_injectables)
+    supplied = MyDep("supplied ")
+
+    for _ in range(2):
+        assert partial() == "testingtesting"
+        assert partial(supplied) == "supplied testing"
+        assert partial(two=supplied) == "testingsupplied "
+        assert partial(supplied, two=supplied) == "supplied supplied "
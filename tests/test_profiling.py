@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from lagom import Container, Singleton, injectable
+from lagom.exceptions import UnresolvableType
+from lagom.profiling import profiling
+
+
+class Engine:
+    pass
+
+
+class Wheels:
+    pass
+
+
+class Car:
+    def __init__(self, engine: Engine, wheels: Wheels):
+        pass
+
+
+class Garage:
+    def __init__(self, car: Car, name: str):
+        pass
+
+
+def _tree(node):
+    return (node.name.split(".")[-1], [_tree(child) for child in node.children])
+
+
+def test_the_construction_tree_is_recorded(container: Container):
+    container[Engine] = lambda: Engine()
+    container[Wheels] = Singleton(Wheels)
+
+    with profiling(container) as profile:
+        container.resolve(Car)
+
+    assert [_tree(root) for root in profile.roots] == [
+        (
+            "Car [reflection]",
+            [
+                ("Engine [ConstructionWithoutContainer]", []),
+                ("Wheels [Singleton]", [("Wheels [reflection]", [])]),
+            ],
+        )
+    ]
+    car = profile.roots[0]
+    assert car.took >= sum(child.took for child in car.children)
+
+
+def test_bound_function_calls_are_roots(container: Container):
+    def handler(car: Car = injectable):
+        pass
+
+    bound = container.partial(handler)
+    with profiling(container) as profile:
+        bound()
+
+    call = profile.roots[0]
+    assert call.built is handler and call.kind == "call"
+    assert [_tree(child) for child in call.children] == [
+        ("Car [reflection]", [("Engine [reflection]", []), ("Wheels [reflection]", [])])
+    ]
+
+
+def test_failures_are_recorded(container: Container):
+    with profiling(container) as profile:
+        with pytest.raises(UnresolvableType):
+            container.resolve(Garage)
+    assert isinstance(profile.roots[0].error, UnresolvableType)
+
+
+def test_nothing_is_recorded_after_the_block(container: Container):
+    with profiling(container) as profile:
+        container.resolve(Engine)
+    container.resolve(Car)
+    assert len(profile.roots) == 1
+
+
+def test_the_profile_can_be_exported_as_collapsed_stacks(container: Container):
+    with profiling(container) as profile:
+        container.resolve(Car)
+
+    lines = profile.to_collapsed().splitlines()
+    stacks = [line.rsplit(" ", 1)[0] for line in lines]
+    assert f"{__name__}.Car [reflection];{__name__}.Engine [reflection]" in stacks
+    assert all(int(line.rsplit(" ", 1)[1]) >= 0 for line in lines)
+
+
+def test_the_profile_can_be_exported_for_speedscope(container: Container):
+    with profiling(container) as profile:
+        container.resolve(Car)
+        container.resolve(Car)
+
+    exported = json.loads(profile.to_speedscope_json())
+    frames = [frame["name"] for frame in exported["shared"]["frames"]]
+    assert frames == [
+        f"{__name__}.Car [reflection]",
+        f"{__name__}.Engine [reflection]",
+        f"{__name__}.Wheels [reflection]",
+    ]
+    samples = exported["profiles"][0]["samples"]
+    assert samples[:3] == [[0], [0, 1], [0, 2]]
+    assert len(exported["profiles"][0]["weights"]) == 6
@@ -0,0 +1,167 @@
+import gc
+import weakref
+from typing import ContextManager
+
+import pytest
+
+from lagom import Container, ContextContainer, Singleton, injectable
+from lagom.exceptions import UnresolvableType
+from lagom.hooks import ResolutionHooks
+from lagom.metrics import ResolutionMetrics
+from lagom.profiling import profiling
+from tests.examples import SomeClass, SomeClassManager
+
+
+class Engine:
+    pass
+
+
+class Car:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+
+class Garage:
+    def __init__(self, car: Car, name: str):
+        pass
+
+
+class RecordingHooks(ResolutionHooks):
+    def __init__(self):
+        self.events = []
+
+    def resolve_started(self, dep_type):
+        self.events.append(("resolve_started", dep_type))
+
+    def resolve_finished(self, dep_type, took, error):
+        assert took >= 0
+        self.events.append(("resolve_finished", dep_type, type(error)))
+
+    def definition_used(self, dep_type, definition):
+        self.events.append(("definition_used", dep_type))
+
+    def reflection_started(self, dep_type):
+        self.events.append(("reflection_started", dep_type))
+
+    def reflection_finished(self, dep_type, took, error):
+        self.events.append(("reflection_finished", dep_type, type(error)))
+
+    def singleton_built(self, dep_type, took):
+        self.events.append(("singleton_built", dep_type))
+
+    def context_entered(self, dep_type, took):
+        self.events.append(("context_entered", dep_type))
+
+    def context_exited(self, dep_type, took):
+        self.events.append(("context_exited", dep_type))
+
+
+@pytest.fixture
+def hooks(container: Container):
+    hooks = RecordingHooks()
+    container.add_hooks(hooks)
+    return hooks
+
+
+def test_nested_definitions_and_reflection_are_reported(
+    container: Container, hooks: RecordingHooks
+):
+    container[Engine] = lambda: Engine()
+    container.resolve(Car)
+    assert hooks.events == [
+        ("resolve_started", Car),
+        ("reflection_started", Car),
+        ("definition_used", Engine),
+        ("reflection_finished", Car, type(None)),
+        ("resolve_finished", Car, type(None)),
+    ]
+
+
+def test_singletons_are_reported_when_they_are_built(
+    container: Container, hooks: RecordingHooks
+):
+    container[Engine] = Singleton(Engine)
+    container.resolve(Engine)
+    container.resolve(Engine)
+    assert hooks.events.count(("singleton_built", Engine)) == 1
+    assert hooks.events.count(("definition_used", Engine)) == 2
+
+
+def test_failures_are_reported(container: Container, hooks: RecordingHooks):
+    with pytest.raises(UnresolvableType):
+        container.resolve(Garage)
+    assert hooks.events[-1] == ("resolve_finished", Garage, UnresolvableType)
+
+
+def test_clones_and_bound_functions_report_to_the_same_hooks(
+    container: Container, hooks: RecordingHooks
+):
+    def handler(car: Car = injectable):
+        return car
+
+    container.partial(handler)()
+    container.magic_partial(lambda engine: engine)
+    container.clone().resolve(Engine)
+    assert ("resolve_started", Car) in hooks.events
+    assert hooks.events[-1] == ("resolve_finished", Engine, type(None))
+
+
+def test_containers_without_hooks_report_nothing(container: Container):
+    hooks = RecordingHooks()
+    child = container.clone()
+    child.add_hooks(hooks)
+
+    container.resolve(Car)
+    assert hooks.events == []
+    child.resolve(Car)
+    assert ("reflection_started", Engine) in hooks.events
+
+
+def test_hooks_can_be_removed(container: Container, hooks: RecordingHooks):
+    container.remove_hooks(hooks)
+    container.resolve(Car)
+    assert hooks.events == []
+
+
+def test_every_added_hook_is_told(container: Container, hooks: RecordingHooks):
+    another = RecordingHooks()
+    container.add_hooks(another)
+    container.resolve(Engine)
+    assert hooks.events == another.events != []
+
+
+def test_context_managers_entering_and_exiting_are_reported(container: Container):
+    container[ContextManager[SomeClass]] = SomeClassManager  # type: ignore
+    hooks = RecordingHooks()
+    container.add_hooks(hooks)
+    context_container = ContextContainer(container, context_types=[SomeClass])
+
+    with context_container as c:
+        c.resolve(SomeClass)
+    assert ("context_entered", SomeClass) in hooks.events
+    assert hooks.events[-1] == ("context_exited", SomeClass)
+
+
+def test_removed_hooks_are_not_kept_alive(container: Container):
+    metrics = ResolutionMetrics()
+    container.add_hooks(metrics)
+    container.resolve(SomeClass)
+    container.remove_hooks(metrics)
+    removed = weakref.ref(metrics)
+    del metrics
+
+    gc.collect()
+    assert removed() is None
+
+
+def test_finished_profiles_are_not_kept_alive(container: Container):
+    profiles = []
+    for _ in range(5):
+        with profiling(container) as profile:
+            container.resolve(SomeClass)
+        profiles.append(weakref.ref(profile))
+    del profile
+
+    gc.collect()
+    assert [p() for p in profiles] == [None] * 5
+    assert len(container._plan_cache._plans_by_logger) == 1
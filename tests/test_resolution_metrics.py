@@ -0,0 +1,160 @@
+import time
+
+import pytest
+
+from lagom import Container, Singleton, injectable
+from lagom.exceptions import UnresolvableType
+from lagom.interfaces import ContainerDebugInfo
+from lagom.metrics import ResolutionMetrics
+
+
+class Engine:
+    pass
+
+
+class Car:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+
+class Garage:
+    def __init__(self, name: str):
+        pass
+
+
+@pytest.fixture
+def metrics(container: Container):
+    metrics = ResolutionMetrics()
+    container.add_hooks(metrics)
+    return metrics
+
+
+def test_direct_and_nested_resolutions_are_counted(
+    container: Container, metrics: ResolutionMetrics
+):
+    container[Engine] = lambda: Engine()
+    container.resolve(Car)
+    container.resolve(Car)
+
+    car = metrics.for_type(Car)
+    engine = metrics.for_type(Engine)
+    assert car and engine
+    assert (car.resolves, car.reflected, car.defined) == (2, 2, 0)
+    assert (engine.resolves, engine.reflected, engine.defined) == (0, 0, 2)
+    assert car.total_seconds > 0
+    assert car.percentile(0.5) <= car.percentile(0.99)  # type: ignore
+
+
+def test_singleton_hit_rate(container: Container, metrics: ResolutionMetrics):
+    container[Engine] = Singleton(Engine)
+    for _ in range(4):
+        container.resolve(Engine)
+
+    engine = metrics.for_type(Engine)
+    assert engine and engine.singleton_builds == 1
+    assert engine.singleton_hit_rate == 0.75
+
+
+def test_failures_are_counted(container: Container, metrics: ResolutionMetrics):
+    with pytest.raises(UnresolvableType):
+        container.resolve(Garage)
+    garage = metrics.for_type(Garage)
+    assert garage and garage.failures == 1
+
+
+def test_metrics_are_readable_through_the_debug_info(
+    container: Container, metrics: ResolutionMetrics
+):
+    def handler(car: Car = injectable):
+        return container[ContainerDebugInfo]  # type: ignore
+
+    assert container.partial(handler)().resolution_metrics is metrics
+    assert Container().resolution_metrics is None
+
+
+def test_metrics_can_be_exported_as_a_dict(
+    container: Container, metrics: ResolutionMetrics
+):
+    container.resolve(Car)
+    exported = metrics.as_dict()
+    assert exported[f"{__name__}.Car"]["resolves"] == 1
+    assert exported[f"{__name__}.Engine"]["reflected"] == 1
+    assert exported[f"{__name__}.Car"]["percentiles"]["0.5"] > 0
+
+
+def test_metrics_can_be_exported_for_prometheus(
+    container: Container, metrics: ResolutionMetrics
+):
+    container.resolve(Car)
+    exported = metrics.to_prometheus()
+    assert "# TYPE lagom_resolves_total counter" in exported
+    assert f'lagom_resolves_total{{type="{__name__}.Car"}} 1' in exported
+    assert f'lagom_resolve_seconds_count{{type="{__name__}.Car"}} 1' in exported
+    assert f'lagom_build_seconds_count{{type="{__name__}.Engine"}} 1' in exported
+    assert 'quantile="0.99"' in exported
+    assert exported.endswith("\n")
+
+
+def test_metrics_can_be_reset(container: Container, metrics: ResolutionMetrics):
+    container.resolve(Car)
+    metrics.reset()
+    assert metrics.types == []
+
+
+class Showroom:
+    def __init__(self, car: Car):
+        self.car = car
+
+
+def test_types_defined_in_a_clone_are_counted(
+    container: Container, metrics: ResolutionMetrics
+):
+    clone = container.clone()
+    clone[Engine] = lambda: Engine()
+    clone.resolve(Showroom)
+
+    engine = metrics.for_type(Engine)
+    assert engine and engine.defined == 1
+
+
+def test_frozen_containers_keep_and_accept_hooks(
+    container: Container, metrics: ResolutionMetrics
+):
+    container.freeze().resolve(Car)
+    frozen = Container().freeze()
+    more_metrics = ResolutionMetrics()
+    frozen.add_hooks(more_metrics)
+    frozen.resolve(Car)
+
+    car = metrics.for_type(Car)
+    assert car and car.resolves == 1
+    car = more_metrics.for_type(Car)
+    assert car and car.resolves == 1
+
+
+class Slow:
+    def __init__(self):
+        time.sleep(0.01)
+
+
+class NeedsSlow:
+    def __init__(self, slow: Slow, engine: Engine):
+        pass
+
+
+def test_the_time_to_build_arguments_is_recorded(
+    container: Container, metrics: ResolutionMetrics
+):
+    container[Engine] = lambda: Engine()
+    container.resolve(NeedsSlow)
+
+    slow = metrics.for_type(Slow)
+    needs_slow = metrics.for_type(NeedsSlow)
+    engine = metrics.for_type(Engine)
+    assert slow and needs_slow and engine
+    assert slow.build_seconds >= 0.01 and slow.self_seconds >= 0.01
+    assert slow.build_percentile(0.5) == slow.build_seconds
+    assert engine.build_seconds > 0
+    assert needs_slow.build_seconds >= slow.build_seconds + engine.build_seconds
+    assert needs_slow.self_seconds < slow.self_seconds
+    assert metrics.slowest(1) == [(Slow, slow.self_seconds)]
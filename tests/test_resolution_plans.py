@@ -0,0 +1,203 @@
+from typing import Any, Optional
+
+import pytest
+
+from lagom import Container, Singleton
+from lagom.exceptions import UnresolvableType
+from lagom.plans import MAX_NESTED_DEPTH
+
+
+class Engine:
+    def __init__(self, size: int = 4):
+        self.size = size
+
+
+class BigEngine(Engine):
+    def __init__(self):
+        super().__init__(8)
+
+
+class Car:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+
+class Garage:
+    def __init__(self, car: Car, spare: Optional[Engine] = None):
+        self.car = car
+        self.spare = spare
+
+
+class NeedsAName:
+    def __init__(self, name: str):
+        self.name = name
+
+
+class Greeter:
+    def __init__(self, named: NeedsAName):
+        self.named = named
+
+
+def test_defining_a_type_after_it_has_been_planned_is_respected(
+    container: Container,
+):
+    assert container.resolve(Garage).car.engine.size == 4
+    container[Engine] = BigEngine
+    assert container.resolve(Garage).car.engine.size == 8
+
+
+def test_a_clone_can_override_a_type_the_parent_already_planned(
+    container: Container,
+):
+    assert container.resolve(Car).engine.size == 4
+    clone = container.clone()
+    clone[Engine] = BigEngine
+
+    assert clone.resolve(Car).engine.size == 8
+    assert container.resolve(Car).engine.size == 4
+
+
+def test_the_parent_can_change_after_a_clone_has_been_made(container: Container):
+    clone = container.clone()
+    assert clone.resolve(Car).engine.size == 4
+    container[Engine] = BigEngine
+    assert clone.resolve(Car).engine.size == 8
+
+
+def test_optional_dependencies_are_planned_as_well(container: Container):
+    garage = container.resolve(Garage)
+    assert garage.spare is not None
+
+    container[Engine] = Singleton(BigEngine)
+    garage = container.resolve(Garage)
+    assert garage.spare is garage.car.engine
+
+
+def test_failures_are_still_reported_each_time(container: Container):
+    for _ in range(3):
+        with pytest.raises(UnresolvableType):
+            container.resolve(NeedsAName)
+        assert container.resolve(NeedsAName, suppress_error=True) is None
+
+
+def test_a_failing_type_can_be_fixed_by_a_later_definition(container: Container):
+    assert container.resolve(Greeter, suppress_error=True) is None
+    container[NeedsAName] = lambda: NeedsAName("fixed")
+    assert container.resolve(Greeter).named.name == "fixed"
+
+
+def test_a_failing_type_can_be_fixed_by_a_definition_in_a_clone(
+    container: Container,
+):
+    assert container.resolve(Greeter, suppress_error=True) is None
+    clone = container.clone()
+    clone[NeedsAName] = lambda: NeedsAName("fixed")
+    assert clone.resolve(Greeter).named.name == "fixed"
+    assert container.resolve(Greeter, suppress_error=True) is None
+
+
+class Counted:
+    built = 0
+
+    def __init__(self):
+        Counted.built += 1
+
+
+class Doomed:
+    def __init__(self, counted: Counted, name: str):
+        self.counted = counted
+        self.name = name
+
+
+def test_known_failures_are_suppressed_without_building_anything(
+    container: Container,
+):
+    Counted.built = 0
+    for _ in range(3):
+        assert container.resolve(Doomed, suppress_error=True) is None
+    assert Counted.built == 0
+
+
+def test_known_failures_still_raise_the_full_error(container: Container):
+    with pytest.raises(UnresolvableType) as error:
+        container.resolve(Doomed)
+    assert "Doomed => str => str" in str(error.value)
+
+
+def test_an_optional_known_failure_is_none(container: Container):
+    assert container.resolve(Optional[Doomed]) is None  # type: ignore
+
+
+def _chain_of(length: int, bottom: type = Engine) -> type:
+    """Builds classes where each one needs the one before it"""
+    dep_type = bottom
+    for level in range(length):
+
+        def __init__(self, dep):
+            self.dep = dep
+
+        __init__.__annotations__ = {"dep": dep_type}
+        dep_type = type(f"Level{level}", (object,), {"__init__": __init__})
+    return dep_type
+
+
+def test_very_deep_dependency_graphs_can_be_resolved(container: Container):
+    top = _chain_of(3000)
+    built: Any = container.resolve(top)
+    built = container.resolve(top)
+    for _ in range(3000):
+        built = built.dep
+    assert isinstance(built, Engine)
+
+
+def test_very_deep_dependency_graphs_report_errors_the_same_way(
+    container: Container,
+):
+    top = _chain_of(MAX_NESTED_DEPTH + 10, bottom=Greeter)
+    with pytest.raises(UnresolvableType) as error:
+        container.resolve(top)
+    deps = error.value.get_unresolvable_deps_sequence()
+    assert len(deps) == MAX_NESTED_DEPTH + 14
+    assert deps[-5:] == ["Level0", "Greeter", "NeedsAName", "str", "str"]
+    assert container.resolve(top, suppress_error=True) is None
+
+
+class Unrelated:
+    def __init__(self, name: Optional[NeedsAName] = None):
+        self.name = name
+
+
+def test_defining_a_type_only_replans_the_types_that_need_it(container: Container):
+    container.resolve(Garage)
+    container.resolve(Unrelated)
+    unrelated_plan = container._plan_for(Unrelated)
+    garage_plan = container._plan_for(Garage)
+
+    container[Engine] = BigEngine
+    assert container._plan_for(Unrelated) is unrelated_plan
+    assert container._plan_for(Garage) is not garage_plan
+    assert container.resolve(Garage).car.engine.size == 8
+
+
+def test_overriding_a_type_in_a_clone_only_replans_the_types_that_need_it(
+    container: Container,
+):
+    container.resolve(Garage)
+    container.resolve(Unrelated)
+    unrelated_plan = container._plan_for(Unrelated)
+
+    clone = container.clone()
+    clone[Engine] = BigEngine
+    assert clone._plan_for(Unrelated) is unrelated_plan
+    assert clone.resolve(Garage).car.engine.size == 8
+    assert container.resolve(Garage).car.engine.size == 4
+
+
+def test_plans_thrown_away_when_the_cache_is_full_are_planned_again():
+    container = Container(reflection_cache_size=2)
+    assert container.resolve(Garage).car.engine.size == 4
+    assert len(container._plans) == 2
+
+    container[Engine] = BigEngine
+    assert container.resolve(Car).engine.size == 8
+    assert container.resolve(Garage).car.engine.size == 8
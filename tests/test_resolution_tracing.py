@@ -0,0 +1,190 @@
+import asyncio
+import logging
+
+import pytest
+
+from lagom import Container, injectable
+from lagom.metrics import ResolutionMetrics
+from lagom.tracing import (
+    InMemorySpanExporter,
+    LoggingSink,
+    ResolutionTracer,
+    RingBufferSink,
+    SpanSink,
+)
+
+
+class Engine:
+    pass
+
+
+class Car:
+    def __init__(self, engine: Engine):
+        pass
+
+
+def handler(car: Car = injectable):
+    return "ok"
+
+
+def _tree(node):
+    return (node.name.split(".")[-1], [_tree(child) for child in node.children])
+
+
+@pytest.fixture
+def sink():
+    return RingBufferSink()
+
+
+def test_one_in_every_n_calls_is_traced(container: Container, sink: RingBufferSink):
+    container.use_tracer(ResolutionTracer(sink, sample_every=3))
+    bound = container.partial(handler)
+    results = [bound() for _ in range(6)]
+
+    assert results == ["ok"] * 6
+    assert len(sink.traces) == 2
+    trace = sink.traces[0]
+    assert trace.sampled and trace.error is None
+    assert _tree(trace.root) == (
+        "handler [call]",
+        [
+            (
+                "handler [injection]",
+                [("Car [reflection]", [("Engine [reflection]", [])])],
+            )
+        ],
+    )
+    assert trace.took >= trace.root.children[0].took
+
+
+def test_slow_calls_are_reported_without_their_tree(
+    container: Container, sink: RingBufferSink
+):
+    container.use_tracer(ResolutionTracer(sink, sample_every=0, slower_than=0.0))
+    container.magic_partial(handler)()
+
+    [trace] = sink.traces
+    assert not trace.sampled
+    assert trace.root.built is handler and trace.root.children == []
+
+
+def test_fast_calls_that_were_not_sampled_are_not_reported(
+    container: Container, sink: RingBufferSink
+):
+    container.use_tracer(ResolutionTracer(sink, sample_every=0, slower_than=60.0))
+    container.magic_partial(handler)()
+    assert sink.traces == []
+
+
+def test_failing_calls_are_traced_with_the_error(
+    container: Container, sink: RingBufferSink
+):
+    def broken(car: Car = injectable):
+        raise ValueError("nope")
+
+    container.use_tracer(ResolutionTracer(sink, sample_every=1))
+    with pytest.raises(ValueError):
+        container.partial(broken)()
+    assert isinstance(sink.traces[0].error, ValueError)
+
+
+def test_async_functions_can_be_traced(container: Container, sink: RingBufferSink):
+    async def async_handler(car: Car):
+        await asyncio.sleep(0)
+        return "ok"
+
+    container.use_tracer(ResolutionTracer(sink, sample_every=1))
+    bound = container.magic_partial(async_handler)
+
+    assert asyncio.run(bound()) == "ok"
+    assert _tree(sink.traces[0].root.children[0].children[0]) == (
+        "Car [reflection]",
+        [("Engine [reflection]", [])],
+    )
+
+
+def test_bound_functions_called_during_a_sampled_call_are_part_of_its_trace(
+    container: Container, sink: RingBufferSink
+):
+    container.use_tracer(ResolutionTracer(sink, sample_every=1))
+    inner = container.partial(handler)
+
+    def outer():
+        return inner()
+
+    container.partial(outer)()
+
+    [trace] = sink.traces
+    assert [_tree(child)[0] for child in trace.root.children] == [
+        "outer [injection]",
+        "handler [call]",
+    ]
+
+
+def test_tracing_does_not_leave_hooks_behind(
+    container: Container, sink: RingBufferSink
+):
+    metrics = ResolutionMetrics()
+    container.add_hooks(metrics)
+    container.use_tracer(ResolutionTracer(sink, sample_every=1))
+    bound = container.partial(handler)
+    bound()
+    plan_sets = len(container._plan_cache._plans_by_logger)
+    bound()
+
+    assert len(container._plan_cache._plans_by_logger) == plan_sets
+    assert container._added_hooks == (metrics,)
+    car_metrics = metrics.for_type(Car)
+    assert car_metrics and car_metrics.resolves == 2
+
+
+def test_tracing_can_be_stopped(container: Container, sink: RingBufferSink):
+    container.use_tracer(ResolutionTracer(sink, sample_every=1))
+    bound = container.partial(handler)
+    container.use_tracer(None)
+    bound()
+    assert sink.traces == []
+
+
+def test_traces_can_be_exported_as_spans(container: Container):
+    exporter = InMemorySpanExporter()
+    container.use_tracer(ResolutionTracer(SpanSink(exporter), sample_every=1))
+    container.partial(handler)()
+
+    spans = exporter.get_finished_spans()
+    assert [(s.span_id, s.parent_id, s.kind) for s in spans] == [
+        (3, 2, "reflection"),
+        (2, 1, "reflection"),
+        (1, 0, "injection"),
+        (0, None, "call"),
+    ]
+    call = spans[-1]
+    assert all(call.start_time <= s.start_time <= s.end_time for s in spans)
+
+
+def test_traces_can_be_logged(container: Container, caplog):
+    logger = logging.getLogger("traces")
+    container.use_tracer(ResolutionTracer(LoggingSink(logger), sample_every=1))
+    with caplog.at_level(logging.INFO, logger="traces"):
+        container.partial(handler)()
+
+    [record] = caplog.records
+    assert f"{__name__}.Car [reflection]" in record.getMessage()
+
+
+def test_frozen_containers_keep_the_tracer(container: Container, sink: RingBufferSink):
+    container.use_tracer(ResolutionTracer(sink, sample_every=1))
+    container.freeze().partial(handler)()
+    assert len(sink.traces) == 1
+
+
+def test_sampled_calls_reuse_their_plans(container: Container, sink: RingBufferSink):
+    container.use_tracer(ResolutionTracer(sink, sample_every=1))
+    container.partial(handler)()
+
+    observed = [
+        plans
+        for ((_, hooks), plans) in container._plan_cache._plans_by_logger.items()
+        if hooks is not None
+    ]
+    assert len(observed) == 1 and Car in observed[0]
@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 
 from lagom import Singleton, Container
@@ -46,3 +48,61 @@ def test_singleton_can_compose_other_dependencies(container_with_deps: Container
     assert type(first.a) == MyBasicDep
     assert type(first.b) == MyMoreComplicatedDep
     assert first is second
+
+
+def test_singletons_built_as_none_are_only_built_once(container: Container):
+    calls = []
+    container[MyBasicDep] = Singleton(lambda: calls.append("built"))  # type: ignore
+    assert container.resolve(MyBasicDep) is None
+    assert container.resolve(MyBasicDep) is None
+    assert calls == ["built"]
+
+
+class _SignallingLock:
+    """A lock that sets an event whenever it couldn't be acquired straight away"""
+
+    def __init__(self, contended: threading.Event):
+        self._lock = threading.Lock()
+        self._contended = contended
+
+    def acquire(self, blocking=True):
+        acquired = self._lock.acquire(blocking)
+        if not acquired:
+            self._contended.set()
+        return acquired
+
+    def release(self):
+        self._lock.release()
+
+
+def test_threads_waiting_for_a_singleton_to_be_built_are_counted(
+    container: Container,
+):
+    building = threading.Event()
+    finish = threading.Event()
+
+    def _slow_build():
+        building.set()
+        finish.wait()
+        return MyBasicDep()
+
+    singleton: Singleton[MyBasicDep] = Singleton(_slow_build)
+    contended = threading.Event()
+    singleton._thread_lock = _SignallingLock(contended)  # type: ignore
+    container[MyBasicDep] = singleton
+    threads = [
+        threading.Thread(target=container.resolve, args=(MyBasicDep,)) for _ in range(2)
+    ]
+    threads[0].start()
+    building.wait()
+    threads[1].start()
+    # Only finish building once the second thread has found the lock taken
+    assert contended.wait(timeout=10)
+    finish.set()
+    for thread in threads:
+        thread.join()
+
+    assert singleton.threads_waited == 1
+    assert singleton.seconds_waited > 0
+    container.resolve(MyBasicDep)
+    assert singleton.threads_waited == 1
@@ -1,10 +1,22 @@
-from lagom import Container
+from typing import Optional
+
+import pytest
+
+from lagom import Container, ExplicitContainer
+from lagom.exceptions import DependencyNotDefined, InvalidDependencyDefinition
+from lagom.interfaces import ContainerDebugInfo
 
 
 class SomeDep:
     pass
 
 
+class NeedsSomeDep:
+    def __init__(self, dep: SomeDep, maybe_dep: Optional[SomeDep] = None):
+        self.dep = dep
+        self.maybe_dep = maybe_dep
+
+
 def test_temporary_singletons_work(container: Container):
     with container.temporary_singletons([SomeDep]) as container_with_singletons:
         # The original container is unaltered and the dep isn't a singleton
@@ -31,3 +43,57 @@ def test_temporary_singletons_context_is_reusable_but_doesnt_share_state(
         second = c2[SomeDep]
 
     assert first is not second
+
+
+def test_shared_types_are_shared_with_everything_built_in_the_context(
+    container: Container,
+):
+    with container.temporary_singletons([SomeDep]) as c:
+        built = c[NeedsSomeDep]
+        assert built.dep is c[SomeDep]
+        assert built.maybe_dep is built.dep
+
+
+def test_definitions_can_be_added_inside_the_context(container: Container):
+    with container.temporary_singletons([SomeDep]) as c:
+        assert isinstance(c, Container)
+        c[NeedsSomeDep] = lambda: NeedsSomeDep(SomeDep())
+        assert c[NeedsSomeDep] is not None
+        assert NeedsSomeDep in c.defined_types
+    assert NeedsSomeDep not in container.defined_types
+
+
+def test_the_context_container_reports_on_itself(container: Container):
+    with container.temporary_singletons([SomeDep]) as c:
+        assert c[ContainerDebugInfo] is c  # type: ignore
+
+
+def test_contexts_from_explicit_containers_are_still_explicit(
+    explicit_container: ExplicitContainer,
+):
+    explicit_container[SomeDep] = lambda: SomeDep()
+    with explicit_container.temporary_singletons([SomeDep]) as c:
+        assert c[SomeDep] is c[SomeDep]
+        with pytest.raises(DependencyNotDefined):
+            c.resolve(NeedsSomeDep)
+
+
+def test_copies_of_contexts_from_explicit_containers_are_still_explicit(
+    explicit_container: ExplicitContainer,
+):
+    explicit_container[SomeDep] = lambda: SomeDep()
+    with explicit_container.temporary_singletons([]) as c:
+        assert isinstance(c, Container)
+        for copy in [c.clone(), c.freeze()]:
+            assert isinstance(copy[SomeDep], SomeDep)
+            with pytest.raises(DependencyNotDefined):
+                copy.resolve(NeedsSomeDep)
+
+
+def test_contexts_from_explicit_containers_reject_aliases(
+    explicit_container: ExplicitContainer,
+):
+    with explicit_container.temporary_singletons([]) as c:
+        assert isinstance(c, Container)
+        with pytest.raises(InvalidDependencyDefinition):
+            c[SomeDep] = SomeDep
@@ -1,6 +1,7 @@
 import logging
 
 from lagom import Container
+from lagom.util.logging import AggregatedUndefinedLogger
 
 
 class AThing:
@@ -25,3 +26,64 @@ def test_by_default_it_doesnt_log(caplog):
     with caplog.at_level(logging.INFO):
         _something = c[AThing]
     assert len(caplog.records) == 0
+
+
+class AnotherThing:
+    def __init__(self, thing: AThing):
+        pass
+
+
+def test_aggregated_logging_only_warns_once_for_each_type(caplog):
+    undefined = AggregatedUndefinedLogger()
+    c = Container(log_undefined_deps=undefined)
+    with caplog.at_level(logging.INFO):
+        for _ in range(3):
+            _something = c[AnotherThing]
+
+    assert [record.undefined_dependency for record in caplog.records] == [
+        AnotherThing,
+        AThing,
+    ]
+    assert undefined.counts == {AnotherThing: 3, AThing: 3}
+
+
+def test_aggregated_logging_can_summarise_the_most_reflected_types(caplog):
+    undefined = AggregatedUndefinedLogger(summary_size=1)
+    c = Container(log_undefined_deps=undefined)
+    _something = c[AnotherThing]
+    _another = c[AThing]
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        summary = undefined.flush()
+
+    assert summary == [(AThing, 2)]
+    assert caplog.records[0].message == (
+        f"Most reflected undefined dependencies: {AThing} (2)"
+    )
+
+
+def test_aggregated_logging_can_summarise_periodically(caplog):
+    undefined = AggregatedUndefinedLogger(summary_every=0.0)
+    c = Container(log_undefined_deps=undefined)
+    with caplog.at_level(logging.INFO):
+        _something = c[AThing]
+        _something = c[AThing]
+
+    messages = [record.message for record in caplog.records]
+    assert messages[0].startswith("Undefined dependency")
+    assert messages[1:] == [
+        f"Most reflected undefined dependencies: {AThing} (1)",
+        f"Most reflected undefined dependencies: {AThing} (2)",
+    ]
+
+
+def test_aggregated_logging_counts_can_be_reset(caplog):
+    undefined = AggregatedUndefinedLogger()
+    c = Container(log_undefined_deps=undefined)
+    _something = c[AThing]
+    undefined.reset()
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        _something = c[AThing]
+    assert len(caplog.records) == 1
+    assert undefined.most_reflected() == [(AThing, 1)]
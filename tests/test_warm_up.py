@@ -0,0 +1,110 @@
+import abc
+
+from lagom import Container, injectable, bind_to_container
+from lagom.exceptions import CircularDefinitionError
+
+
+class Engine:
+    built = 0
+
+    def __init__(self, size: int = 4):
+        Engine.built += 1
+        self.size = size
+
+
+class Car:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+
+class Garage:
+    def __init__(self, car: Car):
+        self.car = car
+
+
+class Vehicle(abc.ABC):
+    pass
+
+
+class Bike(Vehicle):
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+
+class Chicken:
+    def __init__(self, egg: "Egg"):
+        pass
+
+
+class Egg:
+    def __init__(self, chicken: Chicken):
+        pass
+
+
+def test_warming_up_plans_types_without_building_anything(container: Container):
+    Engine.built = 0
+    report = container.warm_up([Garage])
+
+    assert list(report.root_timings) == [Garage]
+    assert Engine.built == 0
+    misses = container.reflection_cache_overview["misses"]
+    assert isinstance(container.resolve(Garage).car.engine, Engine)
+    assert container.reflection_cache_overview["misses"] == misses
+
+
+def test_functions_have_their_arguments_warmed_up(container: Container):
+    def handler(garage: Garage, name: str = "home"):
+        pass
+
+    container.warm_up([handler])
+    misses = container.reflection_cache_overview["misses"]
+    container.resolve(Garage)
+    assert container.reflection_cache_overview["misses"] == misses
+
+
+def test_aliases_are_followed(container: Container):
+    container[Vehicle] = Bike  # type: ignore
+    container.warm_up([Vehicle])
+    misses = container.reflection_cache_overview["misses"]
+    assert isinstance(container.resolve(Vehicle), Bike)
+    assert container.reflection_cache_overview["misses"] == misses
+
+
+def test_without_roots_everything_bound_to_the_container_is_warmed_up(
+    container: Container,
+):
+    @bind_to_container(container)
+    def handler(garage: Garage = injectable):
+        pass
+
+    def another_handler(bike: Bike):
+        pass
+
+    container.magic_partial(another_handler)
+    report = container.warm_up()
+    assert set(report.root_timings) == {Garage, Bike}
+
+
+def test_the_work_can_be_spread_across_threads(container: Container):
+    report = container.warm_up([Garage, Car, Bike, Engine], max_workers=4)
+    assert list(report.root_timings) == [Garage, Car, Bike, Engine]
+    assert set(report.timings) == {Garage, Car, Bike, Engine}
+    assert report.slowest(2)[0][1] >= report.slowest(2)[1][1]
+    assert not report.failures
+
+
+def test_failures_are_reported_rather_than_raised(container: Container):
+    report = container.warm_up([Chicken, Car])
+    assert isinstance(report.failures[Chicken], CircularDefinitionError)
+    assert list(report.failures) == [Chicken]
+
+
+def test_each_type_is_timed_once_without_the_types_it_needs(container: Container):
+    report = container.warm_up([Garage, Bike])
+
+    assert set(report.timings) == {Garage, Car, Engine, Bike}
+    assert report.root_timings[Garage] >= sum(
+        report.timings[dep_type] for dep_type in [Garage, Car, Engine]
+    )
+    assert report.timings[Bike] <= report.root_timings[Bike]
+    assert container.warm_up([Garage]).timings == {}
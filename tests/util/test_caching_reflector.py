@@ -0,0 +1,111 @@
+import gc
+import weakref
+
+from lagom import Container
+from lagom.util.reflection import CachingReflector
+
+
+class Engine:
+    def __init__(self, size: int = 4):
+        self.size = size
+
+    def start(self, speed: int) -> bool:
+        return True
+
+
+class Car:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+
+def test_hits_and_misses_are_counted():
+    reflector = CachingReflector()
+    first = reflector.get_function_spec(Engine.__init__)
+    second = reflector.get_function_spec(Engine.__init__)
+
+    assert first is second
+    overview = reflector.overview_of_cache
+    assert (overview["hits"], overview["misses"], overview["size"]) == (1, 1, 1)
+
+
+def test_the_least_recently_used_function_is_evicted():
+    reflector = CachingReflector(maxsize=2)
+    reflector.get_function_spec(Engine.__init__)
+    reflector.get_function_spec(Car.__init__)
+    reflector.get_function_spec(Engine.__init__)
+    reflector.get_function_spec(Engine.start)
+
+    overview = reflector.overview_of_cache
+    assert (overview["size"], overview["evictions"]) == (2, 1)
+    reflector.get_function_spec(Engine.__init__)
+    assert reflector.overview_of_cache["hits"] == 2
+
+
+def test_cached_functions_can_still_be_garbage_collected():
+    reflector = CachingReflector()
+
+    def _temporary(engine: Engine):
+        pass
+
+    reflector.get_function_spec(_temporary)
+    del _temporary
+    gc.collect()
+
+    overview = reflector.overview_of_cache
+    assert (overview["size"], overview["collected"]) == (0, 1)
+
+
+def test_bound_methods_share_the_entry_of_their_function():
+    reflector = CachingReflector()
+    reflector.get_function_spec(Engine().start)
+    spec = reflector.get_function_spec(Engine().start)
+
+    assert spec.annotations == {"speed": int}
+    assert reflector.overview_of_cache["hits"] == 1
+
+
+def test_builtins_can_be_cached():
+    reflector = CachingReflector()
+    reflector.get_function_spec(object.__init__)
+    reflector.get_function_spec(object.__init__)
+    assert reflector.overview_of_cache["hits"] == 1
+
+
+def test_each_container_family_has_its_own_reflection_cache():
+    container = Container(reflection_cache_size=10)
+    container.resolve(Car)
+    container.clone().resolve(Car)
+
+    overview = container.reflection_cache_overview
+    assert overview["maxsize"] == 10
+    assert overview["misses"] == 2
+    assert Container().reflection_cache_overview["size"] == 0
+
+
+def _plugin_classes(count: int):
+    return [type(f"Plugin{i}", (), {}) for i in range(count)]
+
+
+def test_types_are_released_once_the_plan_cache_is_full():
+    container = Container(reflection_cache_size=10)
+    plugins = _plugin_classes(20)
+    for plugin in plugins:
+        container.resolve(plugin)
+    refs = [weakref.ref(plugin) for plugin in plugins]
+    del plugins, plugin
+    gc.collect()
+
+    assert len(container._plans) == 10
+    assert all(ref() is None for ref in refs[:10])
+    assert all(ref() is not None for ref in refs[10:])
+
+
+def test_resolved_types_are_freed_with_their_container():
+    container = Container()
+    plugins = _plugin_classes(20)
+    for plugin in plugins:
+        container.clone().resolve(plugin)
+    refs = [weakref.ref(plugin) for plugin in plugins]
+    del plugins, plugin, container
+    gc.collect()
+    assert all(ref() is None for ref in refs)
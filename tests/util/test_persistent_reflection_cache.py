@@ -0,0 +1,144 @@
+import importlib.util
+import os
+from typing import Callable, List, Optional
+
+import pytest
+
+from lagom import Container, injectable
+from lagom.util import reflection
+from lagom.util.reflection import (
+    PersistentReflectionCache,
+    use_persistent_reflection_cache,
+    stop_using_persistent_reflection_cache,
+)
+
+
+class Engine:
+    pass
+
+
+class Car:
+    def __init__(self, engine: Engine, spare: Optional[Engine] = None, wheels=4):
+        self.engine = engine
+        self.spare = spare
+        self.wheels = wheels
+
+
+def bound_later(engine: Engine = injectable, *, name: str = "car"):
+    pass
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "reflection.cache")
+
+
+def _load_module(path, source: str):
+    with open(path, "w") as module_file:
+        module_file.write(source)
+    spec = importlib.util.spec_from_file_location("cached_module", path)
+    module = importlib.util.module_from_spec(spec)  # type: ignore
+    spec.loader.exec_module(module)  # type: ignore
+    return module
+
+
+def test_saved_specs_are_used_by_a_new_cache(cache_path, monkeypatch):
+    first = PersistentReflectionCache(cache_path)
+    original = first.get_function_spec(Car.__init__)
+    first.save()
+
+    monkeypatch.setattr(reflection, "reflect", None)
+    second = PersistentReflectionCache(cache_path)
+    loaded = second.get_function_spec(Car.__init__)
+
+    assert loaded.args == original.args
+    assert loaded.annotations == original.annotations
+    assert loaded.defaults == original.defaults
+    assert second.hits == 1
+
+
+def test_defaults_are_the_live_objects(cache_path):
+    first = PersistentReflectionCache(cache_path)
+    first.get_function_spec(bound_later)
+    first.save()
+
+    second = PersistentReflectionCache(cache_path)
+    spec = second.get_function_spec(bound_later)
+    assert second.hits == 1
+    assert spec.defaults["engine"] is injectable
+    assert spec.defaults["name"] == "car"
+
+
+def test_specs_are_reflected_again_when_the_source_changes(tmp_path, cache_path):
+    module_path = str(tmp_path / "cached_module.py")
+    module = _load_module(module_path, "def build(a: int): pass\n")
+    cache = PersistentReflectionCache(cache_path)
+    cache.get_function_spec(module.build)
+    cache.save()
+
+    module = _load_module(module_path, "def build(a: int, b: str): pass\n")
+    cache = PersistentReflectionCache(cache_path)
+    assert cache.get_function_spec(module.build).args == ["a", "b"]
+    assert cache.misses == 1
+
+
+def test_a_new_mtime_is_fine_if_the_content_is_the_same(tmp_path, cache_path):
+    module_path = str(tmp_path / "cached_module.py")
+    module = _load_module(module_path, "def build(a: int): pass\n")
+    cache = PersistentReflectionCache(cache_path)
+    cache.get_function_spec(module.build)
+    cache.save()
+
+    os.utime(module_path, ns=(0, 0))
+    cache = PersistentReflectionCache(cache_path)
+    assert cache.get_function_spec(module.build).args == ["a"]
+    assert cache.hits == 1
+
+
+def test_functions_without_a_stable_name_are_never_stored(cache_path):
+    def _local(engine: Engine):
+        pass
+
+    cache = PersistentReflectionCache(cache_path)
+    cache.get_function_spec(_local)
+    cache.get_function_spec(lambda engine: engine)
+    cache.save()
+
+    assert not os.path.exists(cache_path)
+
+
+def test_an_unreadable_cache_file_is_ignored(cache_path):
+    with open(cache_path, "wb") as cache_file:
+        cache_file.write(b"not a cache")
+    cache = PersistentReflectionCache(cache_path)
+    assert cache.get_function_spec(Car.__init__).args == [
+        "self",
+        "engine",
+        "spare",
+        "wheels",
+    ]
+
+
+def test_containers_use_the_persistent_cache_once_enabled(cache_path):
+    cache = use_persistent_reflection_cache(cache_path, save_at_exit=False)
+    try:
+        assert isinstance(Container().resolve(Car).engine, Engine)
+    finally:
+        stop_using_persistent_reflection_cache()
+    cache.save()
+
+    assert os.path.exists(cache_path)
+    assert cache.misses > 0
+
+
+def test_only_the_cache_in_use_is_saved_at_exit(tmp_path, monkeypatch):
+    registered: List[Callable] = []
+    monkeypatch.setattr(reflection.atexit, "register", registered.append)
+    monkeypatch.setattr(reflection.atexit, "unregister", registered.remove)
+
+    first = use_persistent_reflection_cache(str(tmp_path / "first.cache"))
+    second = use_persistent_reflection_cache(str(tmp_path / "second.cache"))
+    assert registered == [second.save] and first.save not in registered
+
+    stop_using_persistent_reflection_cache()
+    assert registered == []
@@ -1,6 +1,21 @@
-from typing import Awaitable
+import functools
+from typing import Awaitable, List, Optional, Any, Dict
 
-from lagom.util.reflection import remove_awaitable_type
+import pytest
+
+try:
+    from typing import Annotated
+except ImportError:
+    from typing_extensions import Annotated  # type: ignore
+
+from lagom.util.reflection import (
+    remove_awaitable_type,
+    reflect,
+    _reflect_with_inspect,
+    _reflect_plain_function,
+)
+from tests.benchmarking.postponed_domain import PostponedCar, PostponedDataclassCar
+from tests.benchmarking.reflection_domain import DataclassCar
 
 
 def test_awaitables_can_have_their_inner_type_revealed():
@@ -9,3 +24,69 @@ def test_awaitables_can_have_their_inner_type_revealed():
 
 def test_non_awaitables_dont_error_if_asked_about_awaitability():
     assert remove_awaitable_type(int) is None
+
+
+class Engine:
+    pass
+
+
+def plain(engine: Engine, size: int = 4, *, name: str = "car") -> Engine:
+    return engine
+
+
+def generics(
+    engines: List[Engine], spare: Optional[Engine] = None, extra: Any = None
+) -> Dict[str, Engine]:
+    return {}
+
+
+def annotated(engine: Annotated[Engine, "meta"], size: "int") -> None:
+    pass
+
+
+def forward_refs(engines: List["Engine"], other: "Optional[Engine]"):
+    pass
+
+
+async def asynchronous(engine: Engine, *args, **kwargs) -> Engine:
+    return engine
+
+
+def decorated(func):
+    @functools.wraps(func)
+    def _wrapper(*args, **kwargs):
+        return func(*args, **kwargs)
+
+    return _wrapper
+
+
+@pytest.mark.parametrize(
+    "func",
+    [
+        plain,
+        generics,
+        annotated,
+        forward_refs,
+        asynchronous,
+        decorated(plain),
+        Engine.__init__,
+        DataclassCar.__init__,
+        PostponedCar.__init__,
+        PostponedDataclassCar.__init__,
+        lambda engine, size=3: engine,
+    ],
+)
+def test_single_pass_reflection_matches_inspect(func):
+    expected = _reflect_with_inspect(func)
+    spec = reflect(func)
+    assert spec.args == expected.args
+    assert spec.annotations == expected.annotations
+    assert spec.defaults == expected.defaults
+    assert spec.return_type == expected.return_type
+
+
+@pytest.mark.parametrize(
+    "func", [plain, generics, PostponedCar.__init__, DataclassCar.__init__]
+)
+def test_common_functions_dont_need_inspect(func):
+    assert _reflect_plain_function(func) is not None